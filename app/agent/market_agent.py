@@ -1,9 +1,14 @@
-import yfinance as yf
+import asyncio
 from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 from typing import Dict, Any, List, Optional
-from datetime import datetime, timedelta
+from datetime import datetime
+import pandas as pd
+
+from app.tools.async_market_data import AsyncMarketDataClient, run_sync
+from app.tools.market_data import LOWERCASE_SYMBOLS, MARKET_INDICES, SECTOR_ETFS, MarketDataTool
+from app.tools.market_snapshot import market_snapshot
 
 
 class MarketAnalysisAgent:
@@ -13,35 +18,24 @@ class MarketAnalysisAgent:
 
     def __init__(self):
         self.llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
+        self.market_tool = MarketDataTool()
+        self.async_client = AsyncMarketDataClient(self.market_tool)
 
         # Major market indices
-        self.indices = {
-            "S&P 500": "^GSPC",
-            "Dow Jones": "^DJI",
-            "NASDAQ": "^IXIC",
-            "Russell 2000": "^RUT",
-            "VIX": "^VIX"
-        }
+        self.indices = dict(MARKET_INDICES)
 
         # Sector ETFs for sector analysis
-        self.sectors = {
-            "Technology": "XLK",
-            "Healthcare": "XLV",
-            "Financials": "XLF",
-            "Energy": "XLE",
-            "Consumer Discretionary": "XLY",
-            "Consumer Staples": "XLP",
-            "Industrials": "XLI",
-            "Materials": "XLB",
-            "Utilities": "XLU",
-            "Real Estate": "XLRE",
-            "Communication Services": "XLC"
-        }
+        self.sectors = dict(SECTOR_ETFS)
 
     def process_query(self, query: str) -> str:
         """
         Routes market queries to appropriate analysis functions.
         """
+        # Every lookup made while answering shares one snapshot, so no symbol is fetched twice
+        with market_snapshot():
+            return self._route_query(query)
+
+    def _route_query(self, query: str) -> str:
         query_lower = query.lower()
 
         # Market overview
@@ -49,15 +43,17 @@ class MarketAnalysisAgent:
             return self.get_market_overview()
 
         # Sector analysis
-        if any(k in query_lower for k in ["sector", "sectors", "industry", "industries"]):
+        if any(k in query_lower for k in ["sector", "sectors", "industry", "industries", "rotation", "relative strength"]):
             return self.get_sector_analysis()
 
         # Technical analysis for specific stock
         if any(k in query_lower for k in ["technical", "moving average", "rsi", "analysis"]):
-            # Try to extract ticker
-            ticker = self._extract_ticker(query)
-            if ticker:
-                return self.get_technical_analysis(ticker)
+            # Try to extract tickers; several are compared side by side
+            tickers = self._extract_tickers(query)
+            if len(tickers) > 1:
+                return self.get_multi_technical_analysis(tickers)
+            if tickers:
+                return self.get_technical_analysis(tickers[0])
             return "Please specify a stock symbol for technical analysis (e.g., 'technical analysis for AAPL')."
 
         # Market trends
@@ -72,14 +68,13 @@ class MarketAnalysisAgent:
         Returns current market indices performance.
         """
         report = ["**Market Overview**\n"]
+        quotes = self.market_tool.get_stock_prices(list(self.indices.values()))
 
         for name, symbol in self.indices.items():
             try:
-                ticker = yf.Ticker(symbol)
-                info = ticker.fast_info
-                price = info.last_price
-                prev_close = info.previous_close
-                change_pct = ((price - prev_close) / prev_close) * 100
+                quote = quotes[symbol]
+                price = quote["last_price"]
+                change_pct = quote["change_percent"]
 
                 # Format with arrow indicator
                 arrow = "▲" if change_pct >= 0 else "▼"
@@ -89,7 +84,7 @@ class MarketAnalysisAgent:
             except Exception as e:
                 report.append(f"**{name}**: Data unavailable")
 
-        report.append(f"\n*Data as of {datetime.now().strftime('%Y-%m-%d %H:%M')}*")
+        report.append(f"\n*Data as of {datetime.now().strftime('%Y-%m-%d %H:%M')} ({self.market_tool.calendar.status()})*")
         return "\n".join(report)
 
     def get_sector_analysis(self) -> str:
@@ -98,14 +93,11 @@ class MarketAnalysisAgent:
         """
         report = ["**Sector Performance**\n"]
         sector_data = []
+        quotes = self.market_tool.get_stock_prices(list(self.sectors.values()))
 
         for sector, symbol in self.sectors.items():
             try:
-                ticker = yf.Ticker(symbol)
-                info = ticker.fast_info
-                price = info.last_price
-                prev_close = info.previous_close
-                change_pct = ((price - prev_close) / prev_close) * 100
+                change_pct = quotes[symbol]["change_percent"]
                 sector_data.append((sector, change_pct))
             except Exception:
                 sector_data.append((sector, None))
@@ -121,7 +113,44 @@ class MarketAnalysisAgent:
             else:
                 report.append(f"- **{sector}**: Data unavailable")
 
-        report.append(f"\n*Data as of {datetime.now().strftime('%Y-%m-%d %H:%M')}*")
+        rotation = self.get_sector_rotation()
+        if rotation:
+            report.append(f"\n{rotation}")
+
+        report.append(f"\n*Data as of {datetime.now().strftime('%Y-%m-%d %H:%M')} ({self.market_tool.calendar.status()})*")
+        return "\n".join(report)
+
+    def get_sector_rotation(self) -> str:
+        """
+        Returns sector relative strength vs the S&P 500 over 1W/1M/3M/YTD and the
+        rotation quadrant of each sector, or "" if history is unavailable.
+        """
+        try:
+            # All sectors, horizons and the SPY benchmark come from one price matrix load
+            table = self.market_tool.get_sector_rotation(list(self.sectors.values()), benchmark="SPY")
+        except Exception as e:
+            print(f"Sector rotation unavailable: {e}")
+            return ""
+
+        names = {symbol: sector for sector, symbol in self.sectors.items()}
+        table = table.sort_values("rs_1m", ascending=False, na_position="last")
+
+        report = ["**Sector Rotation** (relative strength vs S&P 500)\n"]
+        report.append("| Sector | 1W | 1M | 3M | YTD | Phase |")
+        report.append("|---|---|---|---|---|---|")
+        for symbol, row in table.iterrows():
+            cells = [self._fmt(row[f"rs_{h}"], "{:+.1f}%") for h in ["1w", "1m", "3m", "ytd"]]
+            report.append(f"| {names.get(symbol, symbol)} ({symbol}) | {' | '.join(cells)} | {row['quadrant'] or 'n/a'} |")
+
+        for quadrant, meaning in [
+            ("Leading", "outperforming and still gaining"),
+            ("Improving", "lagging over 3 months but gaining lately"),
+            ("Weakening", "ahead over 3 months but losing steam"),
+        ]:
+            members = [names.get(symbol, symbol) for symbol in table.index[table["quadrant"] == quadrant]]
+            if members:
+                report.append(f"- **{quadrant}** ({meaning}): {', '.join(members)}")
+
         return "\n".join(report)
 
     def get_technical_analysis(self, symbol: str) -> str:
@@ -129,35 +158,14 @@ class MarketAnalysisAgent:
         Returns technical analysis for a specific stock.
         """
         try:
-            ticker = yf.Ticker(symbol)
-
-            # Get historical data for calculations
-            hist = ticker.history(period="3mo")
-            if hist.empty:
+            # One year of daily bars, computed by the vectorized indicator engine
+            row = self.market_tool.get_indicators([symbol], period="1y").iloc[0]
+            if pd.isna(row["price"]):
                 return f"Could not fetch historical data for {symbol}."
 
-            # Current price
-            current_price = hist['Close'].iloc[-1]
-
-            # Calculate moving averages
-            ma_20 = hist['Close'].rolling(window=20).mean().iloc[-1]
-            ma_50 = hist['Close'].rolling(window=50).mean().iloc[-1]
-
-            # Calculate RSI (14-day)
-            delta = hist['Close'].diff()
-            gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-            rs = gain / loss
-            rsi = 100 - (100 / (1 + rs))
-            current_rsi = rsi.iloc[-1]
-
-            # Calculate volatility (20-day standard deviation)
-            volatility = hist['Close'].pct_change().rolling(window=20).std().iloc[-1] * 100
-
-            # 52-week high/low
-            hist_1y = ticker.history(period="1y")
-            high_52w = hist_1y['High'].max() if not hist_1y.empty else None
-            low_52w = hist_1y['Low'].min() if not hist_1y.empty else None
+            current_price = row["price"]
+            ma_20, ma_50 = row["ma20"], row["ma50"]
+            current_rsi = row["rsi14"]
 
             # Build report
             report = [f"**Technical Analysis: {symbol.upper()}**\n"]
@@ -174,28 +182,97 @@ class MarketAnalysisAgent:
             else:
                 report.append("  → *Neutral zone*")
 
-            report.append(f"\n**Volatility (20-day)**: {volatility:.2f}%")
+            report.append(f"\n**MACD (12, 26, 9)**: {row['macd']:.2f} (signal {row['macd_signal']:.2f})")
+            report.append(f"  → *{'Bullish' if row['macd_hist'] >= 0 else 'Bearish'} momentum*")
+
+            report.append(f"\n**Bollinger Bands (20, 2)**: ${row['bb_lower']:.2f} - ${row['bb_upper']:.2f}")
+
+            report.append(f"\n**Volatility (20-day)**: {row['volatility20']:.2f}%")
 
+            high_52w, low_52w = row["high_52w"], row["low_52w"]
             if high_52w and low_52w:
                 report.append(f"\n**52-Week Range**: ${low_52w:.2f} - ${high_52w:.2f}")
-                position = ((current_price - low_52w) / (high_52w - low_52w)) * 100
-                report.append(f"  → Currently at {position:.0f}% of range")
+                report.append(f"  → Currently at {row['range_position']:.0f}% of range")
 
             return "\n".join(report)
 
         except Exception as e:
             return f"Error performing technical analysis for {symbol}: {e}"
 
+    def get_multi_technical_analysis(self, symbols: List[str]) -> str:
+        """
+        Returns a technical comparison table for several stocks.
+
+        History for all symbols is updated in one batch and the indicators are
+        computed in one vectorized pass.
+        """
+        try:
+            table = self.market_tool.get_indicators(symbols, period="1y")
+        except Exception as e:
+            return f"Error performing technical analysis for {', '.join(symbols)}: {e}"
+
+        report = [f"**Technical Comparison: {', '.join(table.index)}**\n"]
+        report.append("| Symbol | Price | vs 20-day MA | vs 50-day MA | RSI (14) | MACD | Volatility (20d) | 52W Position |")
+        report.append("|---|---|---|---|---|---|---|---|")
+
+        missing = []
+        for symbol, row in table.iterrows():
+            if pd.isna(row["price"]):
+                missing.append(symbol)
+                continue
+            report.append(
+                f"| {symbol} | ${row['price']:.2f} | {self._vs_average(row['price'], row['ma20'])} "
+                f"| {self._vs_average(row['price'], row['ma50'])} | {self._fmt(row['rsi14'], '{:.1f}')} "
+                f"| {self._fmt(row['macd_hist'], '{:+.2f}')} | {self._fmt(row['volatility20'], '{:.2f}%')} "
+                f"| {self._fmt(row['range_position'], '{:.0f}%')} |"
+            )
+
+        valid = table.dropna(subset=["price"])
+        if not valid.empty:
+            report.append("")
+            overbought = list(valid.index[valid["rsi14"] > 70])
+            oversold = list(valid.index[valid["rsi14"] < 30])
+            if overbought:
+                report.append(f"- *Potentially overbought*: {', '.join(overbought)}")
+            if oversold:
+                report.append(f"- *Potentially oversold*: {', '.join(oversold)}")
+            ranked = valid["range_position"].dropna()
+            if len(ranked) > 1:
+                report.append(f"- *Strongest in its 52-week range*: {ranked.idxmax()} ({ranked.max():.0f}%)")
+                report.append(f"- *Weakest in its 52-week range*: {ranked.idxmin()} ({ranked.min():.0f}%)")
+            bullish = list(valid.index[valid["macd_hist"] >= 0])
+            if bullish:
+                report.append(f"- *Bullish MACD momentum*: {', '.join(bullish)}")
+
+        if missing:
+            report.append(f"\nCould not fetch historical data for {', '.join(missing)}.")
+
+        return "\n".join(report)
+
+    @staticmethod
+    def _vs_average(price: float, average: float) -> str:
+        if pd.isna(average):
+            return "n/a"
+        return f"{(price / average - 1) * 100:+.1f}%"
+
+    @staticmethod
+    def _fmt(value: float, pattern: str) -> str:
+        return "n/a" if pd.isna(value) else pattern.format(value)
+
     def get_market_trends(self) -> str:
         """
         Analyzes current market trends based on index movements.
         """
         report = ["**Market Trends Analysis**\n"]
 
+        # SPY history and the VIX quote are independent, so fetch them together
+        spy_hist, vix_quote = run_sync(self._fetch_trend_inputs())
+
         # Get S&P 500 trend data
         try:
-            spy = yf.Ticker("SPY")
-            hist = spy.history(period="1mo")
+            if isinstance(spy_hist, BaseException):
+                raise spy_hist
+            hist = spy_hist
 
             if not hist.empty:
                 # Calculate trend
@@ -228,9 +305,7 @@ class MarketAnalysisAgent:
 
         # VIX (Fear index)
         try:
-            vix = yf.Ticker("^VIX")
-            vix_info = vix.fast_info
-            vix_level = vix_info.last_price
+            vix_level = vix_quote["last_price"]
 
             report.append(f"\n**VIX (Volatility Index)**: {vix_level:.2f}")
             if vix_level < 15:
@@ -246,13 +321,28 @@ class MarketAnalysisAgent:
 
         return "\n".join(report)
 
+    async def _fetch_trend_inputs(self):
+        """
+        Awaits the SPY month of history and the VIX quote concurrently.
+        """
+        results = await asyncio.gather(
+            self.async_client.get_history("SPY", period="1mo"),
+            self.async_client.get_stock_price("^VIX"),
+            return_exceptions=True,
+        )
+        return tuple(results)
+
     def get_market_overview_with_insights(self, query: str) -> str:
         """
         Combines market data with LLM insights.
         """
-        # Get raw market data
-        market_data = self.get_market_overview()
-        sector_data = self.get_sector_analysis()
+        with market_snapshot():
+            # One batch for every index and sector quote; both reports then read the snapshot
+            self.market_tool.get_stock_prices(list(self.indices.values()) + list(self.sectors.values()))
+
+            # Get raw market data
+            market_data = self.get_market_overview()
+            sector_data = self.get_sector_analysis()
 
         # Use LLM to provide insights
         prompt = ChatPromptTemplate.from_messages([
@@ -285,6 +375,13 @@ Provide a helpful analysis:""")
         """
         Extracts stock ticker from query.
         """
+        tickers = self._extract_tickers(query)
+        return tickers[0] if tickers else None
+
+    def _extract_tickers(self, query: str) -> List[str]:
+        """
+        Extracts every stock ticker from a query, in the order mentioned.
+        """
         import re
 
         # Common company to ticker mapping
@@ -293,15 +390,23 @@ Provide a helpful analysis:""")
             "AMAZON": "AMZN", "META": "META", "TESLA": "TSLA",
             "NETFLIX": "NFLX", "NVIDIA": "NVDA"
         }
+        common_words = {
+            "WHAT", "HOW", "IS", "THE", "FOR", "OF", "AND", "TECHNICAL", "ANALYSIS",
+            "VS", "OR", "WITH", "ON", "TO", "ME", "SHOW", "GIVE", "TELL", "ABOUT",
+            "STOCK", "RSI", "MA", "MACD", "I", "A",
+        }
 
-        query_upper = query.upper()
-        for company, ticker in company_mapping.items():
-            if company in query_upper:
-                return ticker
-
-        # Try to find ticker pattern
-        common_words = {"WHAT", "HOW", "IS", "THE", "FOR", "OF", "AND", "TECHNICAL", "ANALYSIS"}
-        potential = re.findall(r'\b[A-Z]{1,5}\b', query_upper)
-        tickers = [t for t in potential if t not in common_words]
-
-        return tickers[0] if tickers else None
+        # A ticker is a word typed in capitals, a $-prefixed word, or an unambiguous known symbol
+        # in any case; other lower-case words ("what is the price of apple") are never guessed at
+        tickers = []
+        for prefix, word in re.findall(r"(\$?)\b([A-Za-z]+)\b", query):
+            upper = word.upper()
+            if upper in company_mapping:
+                tickers.append(company_mapping[upper])
+            elif prefix and len(upper) <= 5:
+                tickers.append(upper)
+            elif upper in common_words:
+                continue
+            elif (word.isupper() and len(word) <= 5) or upper in LOWERCASE_SYMBOLS:
+                tickers.append(upper)
+        return list(dict.fromkeys(tickers))
@@ -1,4 +1,3 @@
-import yfinance as yf
 from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
@@ -6,6 +5,17 @@ from typing import List, Dict, Optional
 from datetime import datetime
 import re
 
+from app.tools.async_market_data import AsyncMarketDataClient, run_sync
+from app.tools.market_data import LOWERCASE_SYMBOLS, NEWS_TICKERS, SECTOR_CONSTITUENTS, MarketDataTool
+from app.tools.headline_sentiment import (
+    HeadlineSentimentStore,
+    get_sentiment_store,
+    parse_scores,
+    summarize_sentiment,
+)
+from app.tools.news_dedup import dedupe
+from app.tools.news_index import NewsIndex, extract_news_fields, get_news_index, topic_terms
+
 
 class NewsSynthesizerAgent:
     """
@@ -15,9 +25,27 @@ class NewsSynthesizerAgent:
 
     def __init__(self):
         self.llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
+        self.market_tool = MarketDataTool()
+        self.async_client = AsyncMarketDataClient(self.market_tool)
 
         # Major tickers to track for general market news
-        self.market_tickers = ["SPY", "QQQ", "DIA", "AAPL", "MSFT", "GOOGL", "AMZN", "NVDA"]
+        self.market_tickers = list(NEWS_TICKERS)
+        self._news_index: Optional[NewsIndex] = None
+        self._sentiment_store: Optional[HeadlineSentimentStore] = None
+
+    @property
+    def news_index(self) -> NewsIndex:
+        """
+        Full-text index filled by the background news ingestor (opened on first use).
+        """
+        return self._news_index or get_news_index()
+
+    @property
+    def sentiment_store(self) -> HeadlineSentimentStore:
+        """
+        Stored per-headline sentiment scores, shared by all users and turns.
+        """
+        return self._sentiment_store or get_sentiment_store()
 
     def process_query(self, query: str) -> str:
         """
@@ -38,6 +66,12 @@ class NewsSynthesizerAgent:
         if "sector" in query_lower:
             return self.get_sector_news(query)
 
+        # Topical news ("news about chip export rules") from the local index
+        if topic_terms(query):
+            response = self.search_news(query)
+            if response:
+                return response
+
         # Default: general market news
         return self.get_market_news()
 
@@ -45,57 +79,24 @@ class NewsSynthesizerAgent:
         """
         Extracts news fields handling both old and new yfinance formats.
         """
-        # Try new format first (yfinance >= 0.2.40)
-        if 'content' in item:
-            content = item.get('content', {})
-            title = content.get('title', 'No title')
-            provider = content.get('provider', {})
-            publisher = provider.get('displayName', 'Unknown')
-            link = content.get('canonicalUrl', {}).get('url', '')
-            pub_date_str = content.get('pubDate', '')
-
-            # Parse ISO date string
-            if pub_date_str:
-                try:
-                    pub_date = datetime.fromisoformat(pub_date_str.replace('Z', '+00:00'))
-                    timestamp = pub_date.timestamp()
-                except Exception:
-                    timestamp = 0
-            else:
-                timestamp = 0
-
-            return {
-                'title': title,
-                'publisher': publisher,
-                'link': link,
-                'timestamp': timestamp
-            }
-
-        # Fall back to old format
-        return {
-            'title': item.get('title', 'No title'),
-            'publisher': item.get('publisher', 'Unknown'),
-            'link': item.get('link', ''),
-            'timestamp': item.get('providerPublishTime', 0)
-        }
+        return extract_news_fields(item)
 
     def get_stock_news(self, symbol: str, limit: int = 5) -> str:
         """
         Fetches and summarizes news for a specific stock.
         """
         try:
-            ticker = yf.Ticker(symbol)
-            news = ticker.news
+            news = self.market_tool.get_news(symbol)
 
             if not news:
                 return f"No recent news found for {symbol.upper()}."
 
-            # Get top news items
-            news_items = news[:limit]
+            # Get top news items, skipping near-duplicate headlines
+            news_items = dedupe(news, key=lambda item: self._extract_news_fields(item)['title'])[:limit]
 
             report = [f"**Latest News for {symbol.upper()}**\n"]
 
-            articles_text = []
+            titles = []
             for i, item in enumerate(news_items, 1):
                 fields = self._extract_news_fields(item)
                 title = fields['title']
@@ -115,11 +116,16 @@ class NewsSynthesizerAgent:
                     report.append(f"   [Read more]({link})")
                 report.append("")
 
-                articles_text.append(f"- {title}")
+                titles.append(title)
 
-            # Add LLM synthesis
-            if articles_text:
-                synthesis = self._synthesize_news(symbol, articles_text)
+            # Sentiment from stored headline scores (only new headlines are scored)
+            sentiment = self._headline_sentiment(titles)
+            if sentiment:
+                report.append(f"**Sentiment**: {self._format_sentiment(sentiment)}\n")
+
+            # Add LLM synthesis (stored; rewritten only when the headlines change)
+            if titles:
+                synthesis = self._news_summary(symbol.upper(), titles)
                 if synthesis:
                     report.append("---")
                     report.append(f"\n**Summary**: {synthesis}")
@@ -134,20 +140,9 @@ class NewsSynthesizerAgent:
         Aggregates news from major market tickers for a market overview.
         """
         report = ["**Market News Summary**\n"]
-        all_news = []
 
-        # Collect news from major tickers
-        for symbol in self.market_tickers[:4]:  # Limit to avoid too many API calls
-            try:
-                ticker = yf.Ticker(symbol)
-                news = ticker.news
-                if news:
-                    for item in news[:2]:  # Top 2 from each
-                        fields = self._extract_news_fields(item)
-                        fields['related_symbol'] = symbol
-                        all_news.append(fields)
-            except Exception:
-                continue
+        # Collect the top 2 items from every major ticker, fetched concurrently
+        all_news = self._collect_news(self.market_tickers, per_symbol=2)
 
         if not all_news:
             return "Unable to fetch market news at this time."
@@ -155,14 +150,8 @@ class NewsSynthesizerAgent:
         # Sort by timestamp (most recent first)
         all_news.sort(key=lambda x: x.get('timestamp', 0), reverse=True)
 
-        # Deduplicate by title
-        seen_titles = set()
-        unique_news = []
-        for item in all_news:
-            title = item.get('title', '')
-            if title and title != 'No title' and title not in seen_titles:
-                seen_titles.add(title)
-                unique_news.append(item)
+        # Collapse syndicated near-duplicates, keeping the most recent copy
+        unique_news = dedupe([item for item in all_news if item.get('title') not in ('', 'No title', None)])
 
         # Display top news
         for i, item in enumerate(unique_news[:8], 1):
@@ -216,43 +205,19 @@ class NewsSynthesizerAgent:
 
         if selected_etf:
             # Get news for representative stocks in that sector
-            sector_stocks = {
-                "XLK": ["AAPL", "MSFT", "NVDA"],
-                "XLV": ["JNJ", "UNH", "PFE"],
-                "XLF": ["JPM", "BAC", "GS"],
-                "XLE": ["XOM", "CVX", "COP"],
-                "XLY": ["AMZN", "TSLA", "HD"],
-                "XLI": ["CAT", "BA", "HON"],
-                "XLRE": ["PLD", "AMT", "SPG"]
-            }
-
-            stocks = sector_stocks.get(selected_etf, [])
+            stocks = SECTOR_CONSTITUENTS.get(selected_etf, [])
             report = [f"**{sector_name} Sector News**\n"]
 
-            all_news = []
-            for stock in stocks:
-                try:
-                    ticker = yf.Ticker(stock)
-                    news = ticker.news
-                    if news:
-                        for item in news[:2]:
-                            fields = self._extract_news_fields(item)
-                            fields['related_symbol'] = stock
-                            all_news.append(fields)
-                except Exception:
-                    continue
+            all_news = self._collect_news(stocks, per_symbol=2)
 
             if not all_news:
                 return f"No recent news found for {sector_name} sector."
 
-            # Deduplicate and sort
-            seen = set()
-            unique = []
-            for item in sorted(all_news, key=lambda x: x.get('timestamp', 0), reverse=True):
-                title = item.get('title', '')
-                if title and title != 'No title' and title not in seen:
-                    seen.add(title)
-                    unique.append(item)
+            # Sort, then collapse near-duplicate headlines
+            unique = dedupe([
+                item for item in sorted(all_news, key=lambda x: x.get('timestamp', 0), reverse=True)
+                if item.get('title') not in ('', 'No title', None)
+            ])
 
             for i, item in enumerate(unique[:6], 1):
                 title = item.get('title', 'No title')
@@ -266,6 +231,57 @@ class NewsSynthesizerAgent:
 
         return "Please specify a sector (e.g., 'tech sector news', 'healthcare sector news')."
 
+    def search_news(self, query: str, limit: int = 6) -> Optional[str]:
+        """
+        Answers a topical news question from the full-text news index, without
+        network calls. Returns None when nothing stored matches.
+        """
+        try:
+            results = self.news_index.search(query, limit=limit * 3)
+        except Exception as e:
+            print(f"News index search failed: {e}")
+            return None
+
+        results = dedupe(results)[:limit]
+        if not results:
+            return None
+
+        topic = " ".join(topic_terms(query))
+        report = [f"**News about {topic}**\n"]
+        for i, item in enumerate(results, 1):
+            timestamp = item.get('timestamp', 0)
+            pub_date = datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M') if timestamp else 'Unknown date'
+            related = " ".join(f"${s}" for s in item.get('symbols', []))
+
+            report.append(f"**{i}. {item['title']}**")
+            report.append(f"   *{item.get('publisher', 'Unknown')} - {pub_date}* | {related}")
+            if item.get('link'):
+                report.append(f"   [Read more]({item['link']})")
+            report.append("")
+
+        synthesis = self._news_summary(topic, [item['title'] for item in results])
+        if synthesis:
+            report.append("---")
+            report.append(f"\n**Summary**: {synthesis}")
+
+        return "\n".join(report)
+
+    def _collect_news(self, symbols: List[str], per_symbol: int = 2) -> List[Dict]:
+        """
+        Fetches news for all symbols concurrently (bounded by the async client)
+        and returns the top items of each, tagged with their symbol.
+        A symbol whose fetch fails contributes nothing.
+        """
+        news_by_symbol = run_sync(self.async_client.get_news_many(symbols))
+
+        all_news = []
+        for symbol in symbols:
+            for item in (news_by_symbol.get(symbol) or [])[:per_symbol]:
+                fields = self._extract_news_fields(item)
+                fields['related_symbol'] = symbol
+                all_news.append(fields)
+        return all_news
+
     def _synthesize_news(self, symbol: str, articles: List[str]) -> Optional[str]:
         """
         Uses LLM to synthesize news headlines into a brief summary.
@@ -290,30 +306,79 @@ class NewsSynthesizerAgent:
         except Exception:
             return None
 
+    def _news_summary(self, subject: str, titles: List[str]) -> Optional[str]:
+        """
+        Summary of the headlines about `subject`, reused from the store while
+        the headline set is unchanged.
+        """
+        def summarize(headlines: List[str]) -> Optional[str]:
+            return self._synthesize_news(subject, [f"- {title}" for title in headlines])
+
+        try:
+            return self.sentiment_store.summary(subject, titles, summarize)
+        except Exception as e:
+            print(f"Stored news summaries unavailable: {e}")
+            return summarize(titles)
+
     def _analyze_market_sentiment(self, news_items: List[Dict]) -> Optional[str]:
         """
-        Analyzes overall market sentiment from news headlines.
+        Overall market sentiment from the stored scores of the headlines,
+        with the most positive and negative tickers.
         """
         if not news_items:
             return None
 
         headlines = [item.get('title', '') for item in news_items if item.get('title')]
-        if not headlines:
+        scores = self._headline_scores(headlines)
+        summary = summarize_sentiment(list(scores.values()))
+        if not summary:
             return None
 
+        # Per-ticker aggregate of the headlines each ticker's feed contributed
+        by_symbol: Dict[str, List[float]] = {}
+        for item in news_items:
+            if item.get('related_symbol') and item.get('title') in scores:
+                by_symbol.setdefault(item['related_symbol'], []).append(scores[item['title']])
+        means = {symbol: sum(values) / len(values) for symbol, values in by_symbol.items()}
+
+        text = self._format_sentiment(summary)
+        if len(means) > 1:
+            best = max(means, key=means.get)
+            worst = min(means, key=means.get)
+            if means[best] > means[worst]:
+                text += f" Most positive: ${best} ({means[best]:+.2f}); most negative: ${worst} ({means[worst]:+.2f})."
+        return text
+
+    def _headline_scores(self, headlines: List[str]) -> Dict[str, float]:
+        try:
+            return self.sentiment_store.scores(headlines, self._score_headlines)
+        except Exception as e:
+            print(f"Headline sentiment unavailable: {e}")
+            return {}
+
+    def _headline_sentiment(self, headlines: List[str]) -> Optional[Dict[str, float]]:
+        return summarize_sentiment(list(self._headline_scores(headlines).values()))
+
+    def _score_headlines(self, headlines: List[str]) -> List[float]:
+        """
+        Scores a batch of headlines in one LLM call, from -1 (very bearish) to 1 (very bullish).
+        """
         prompt = ChatPromptTemplate.from_messages([
-            ("system", """You are a market sentiment analyst. Based on these headlines,
-            provide a brief (1-2 sentence) assessment of the current market sentiment.
-            Categorize as Bullish, Bearish, or Mixed, then explain briefly."""),
+            ("system", """You are a market sentiment analyst. Score each numbered headline
+            from -1 (very bearish) to 1 (very bullish) for the companies or market it covers;
+            0 is neutral. Reply with only a JSON list of numbers, one per headline, in order."""),
             ("user", "Headlines:\n{headlines}")
         ])
 
         chain = prompt | self.llm | StrOutputParser()
+        numbered = "\n".join(f"{i}. {title}" for i, title in enumerate(headlines, 1))
+        return parse_scores(chain.invoke({"headlines": numbered}), len(headlines))
 
-        try:
-            return chain.invoke({"headlines": "\n".join(headlines)})
-        except Exception:
-            return None
+    def _format_sentiment(self, summary: Dict[str, float]) -> str:
+        return (
+            f"{summary['label']} (average {summary['score']:+.2f} across {summary['count']} headlines: "
+            f"{summary['positive']} positive, {summary['negative']} negative, {summary['neutral']} neutral)."
+        )
 
     def _extract_ticker(self, query: str) -> Optional[str]:
         """
@@ -331,12 +396,21 @@ class NewsSynthesizerAgent:
             if company in query_upper:
                 return ticker
 
-        # Try to find ticker pattern
+        # A ticker is a word typed in capitals, a $-prefixed word, or an unambiguous known
+        # symbol in any case ("news on aapl"); other lower-case topic words ("news about
+        # chip export rules", "cat videos") are not taken for tickers
         common_words = {
             "NEWS", "WHAT", "HOW", "IS", "THE", "FOR", "OF", "AND",
-            "LATEST", "RECENT", "TODAY", "ABOUT", "SHOW", "GET", "ME"
+            "LATEST", "RECENT", "TODAY", "ABOUT", "SHOW", "GET", "ME",
+            "I", "A", "ANY", "ON", "US", "AI", "CEO", "FED", "IPO", "ETF"
         }
-        potential = re.findall(r'\b[A-Z]{1,5}\b', query_upper)
-        tickers = [t for t in potential if t not in common_words]
+        for prefix, word in re.findall(r'(\$?)\b([A-Za-z]+)\b', query):
+            upper = word.upper()
+            if prefix and len(upper) <= 5:
+                return upper
+            if upper in common_words:
+                continue
+            if (word.isupper() and len(word) <= 5) or upper in LOWERCASE_SYMBOLS:
+                return upper
 
-        return tickers[0] if tickers else None
+        return None
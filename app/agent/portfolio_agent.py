@@ -1,4 +1,7 @@
 from app.tools.market_data import MarketDataTool
+from app.tools.holdings import HoldingsBook
+from app.tools.portfolio_risk import MIN_OBSERVATIONS
+from app.tools.tax_lots import METHODS
 from app.database import get_db, PortfolioItem, init_db
 import re
 from sqlalchemy.orm import Session
@@ -8,28 +11,52 @@ class PortfolioAgent:
         self.market_tool = MarketDataTool()
         # Ensure DB tables exist
         init_db()
+        self._book = None
+
+    @property
+    def book(self) -> HoldingsBook:
+        """Holdings and their tax lots (opened on first use)."""
+        if self._book is None:
+            self._book = HoldingsBook()
+        return self._book
         
     def process_query(self, query: str) -> str:
         """
         Analyzes the query for:
         1. "Price of X" (Market Data)
-        2. "Add X shares of Y" (Portfolio Write)
+        2. "Add X shares of Y" / "Sell X Y" (Portfolio Write)
         3. "My Portfolio" (Portfolio Read)
+        4. "How diversified is my portfolio?" (Portfolio Risk)
         """
         query_upper = query.upper()
         
-        # 1. ADD HOLDING Logic: "ADD 10 AAPL"
-        add_match = re.search(r"ADD\s+(\d+)\s+([A-Z]{1,5})", query_upper)
+        # 1. ADD / SELL HOLDING Logic: "ADD 10 AAPL", "ADD 10 AAPL AT 150", "SELL 5 AAPL USING HIFO"
+        add_match = re.search(r"ADD\s+(\d+)\s+(?:SHARES?\s+OF\s+)?([A-Z]{1,5})\b(?:\s+AT\s+\$?(\d+(?:\.\d+)?))?", query_upper)
         if add_match:
             qty = float(add_match.group(1))
             symbol = add_match.group(2)
-            return self.add_holding(symbol, qty)
+            price = float(add_match.group(3)) if add_match.group(3) else None
+            return self.add_holding(symbol, qty, price)
+
+        sell_match = re.search(r"SELL\s+(\d+)\s+(?:SHARES?\s+OF\s+)?([A-Z]{1,5})\b(?:\s+AT\s+\$?(\d+(?:\.\d+)?))?", query_upper)
+        if sell_match:
+            qty = float(sell_match.group(1))
+            symbol = sell_match.group(2)
+            price = float(sell_match.group(3)) if sell_match.group(3) else None
+            method = next((m for m in METHODS if m in query_upper), None)
+            return self.sell_holding(symbol, qty, price, method)
             
-        # 2. VIEW PORTFOLIO Logic: "MY PORTFOLIO"
+        # 2. PORTFOLIO RISK Logic: "HOW DIVERSIFIED IS MY PORTFOLIO"
+        if any(k in query_upper for k in ["DIVERSIF", "CORRELAT", "BETA"]) or (
+            "PORTFOLIO" in query_upper and any(k in query_upper for k in ["RISK", "VOLATIL"])
+        ):
+            return self.analyze_risk()
+
+        # 3. VIEW PORTFOLIO Logic: "MY PORTFOLIO"
         if "PORTFOLIO" in query_upper:
             return self.view_portfolio()
 
-        # 3. MARKET DATA Logic (Existing)
+        # 4. MARKET DATA Logic (Existing)
         # 0. Pre-process known company names to tickers
         COMPANY_MAPPING = {
             "GOOGLE": "GOOG",
@@ -60,9 +87,10 @@ class PortfolioAgent:
              return "I couldn't identify any commands or symbols. Try 'Price of AAPL', 'Add 10 AAPL', or 'My Portfolio'."
             
         responses = []
+        quotes = self.market_tool.get_stock_prices(tickers)
         for ticker in tickers:
-            data = self.market_tool.get_stock_price(ticker)
-            if data:
+            data = quotes.get(ticker)
+            if data and "error" not in data:
                 price = data['last_price']
                 change = data['change_percent']
                 responses.append(f"**{ticker}**: ${price:.2f} ({change:+.2f}%)")
@@ -71,25 +99,37 @@ class PortfolioAgent:
                 
         return "\n\n".join(responses)
 
-    def add_holding(self, symbol: str, quantity: float):
-        db = next(get_db())
+    def add_holding(self, symbol: str, quantity: float, price: float = None):
+        # The current price is the cost of the new lot unless one is given
+        price = price or self._quote_price(symbol)
+        if price is None:
+            return f"I couldn't get a price for {symbol}. Tell me what you paid, e.g. 'Add {quantity:g} {symbol} at 150'."
         try:
-            # Check if exists
-            item = db.query(PortfolioItem).filter(PortfolioItem.symbol == symbol).first()
-            if item:
-                item.quantity += quantity
-            else:
-                # Fetch current price for 'avg_price' (approximation)
-                price_data = self.market_tool.get_stock_price(symbol)
-                price = price_data['last_price'] if price_data else 0.0
-                item = PortfolioItem(symbol=symbol, quantity=quantity, avg_price=price)
-                db.add(item)
-            db.commit()
+            self.book.buy(symbol, quantity, price)
             return f"Successfully added {quantity} shares of {symbol} to your portfolio."
         except Exception as e:
             return f"Error adding to portfolio: {e}"
-        finally:
-            db.close()
+
+    def sell_holding(self, symbol: str, quantity: float, price: float = None, method: str = None):
+        # Sales relieve tax lots in the cost basis method asked for (TAX_LOT_METHOD otherwise)
+        # Shares without a tax lot can be sold without a price; the rest cannot
+        price = price or self._quote_price(symbol)
+        try:
+            left = self.book.sell(symbol, quantity, price, method=method)
+            at = f" at ${price:.2f}" if price else ""
+            return f"Sold {quantity} shares of {symbol}{at}; {left:g} shares left."
+        except ValueError as e:
+            if price is None and str(e).startswith("No price"):
+                return f"I couldn't get a price for {symbol}. Tell me the sale price, e.g. 'Sell {quantity:g} {symbol} at 150'."
+            return f"Error selling from portfolio: {e}"
+        except Exception as e:
+            return f"Error selling from portfolio: {e}"
+
+    def _quote_price(self, symbol: str):
+        price_data = self.market_tool.get_stock_price(symbol)
+        if price_data and "error" not in price_data and price_data.get('last_price'):
+            return price_data['last_price']
+        return None
 
     def view_portfolio(self):
         db = next(get_db())
@@ -100,10 +140,13 @@ class PortfolioAgent:
             
             report = ["**My Portfolio**"]
             total_value = 0.0
-            
+
+            # One batched quote request for every holding
+            quotes = self.market_tool.get_stock_prices([item.symbol for item in items])
+
             for item in items:
-                price_data = self.market_tool.get_stock_price(item.symbol)
-                current_price = price_data['last_price'] if price_data else 0.0
+                price_data = quotes.get(item.symbol.upper(), {})
+                current_price = price_data.get('last_price', 0.0)
                 value = current_price * item.quantity
                 total_value += value
                 
@@ -115,3 +158,65 @@ class PortfolioAgent:
             return f"Error viewing portfolio: {e}"
         finally:
             db.close()
+
+    def analyze_risk(self):
+        db = next(get_db())
+        try:
+            items = db.query(PortfolioItem).all()
+            if not items:
+                return "Your portfolio is empty. Add stocks with 'Add 10 AAPL'."
+
+            # Weights are market values; cost basis stands in for holdings without a quote
+            quotes = self.market_tool.get_stock_prices([item.symbol for item in items])
+            weights = {}
+            for item in items:
+                price = quotes.get(item.symbol.upper(), {}).get('last_price') or item.avg_price or 0.0
+                weights[item.symbol.upper()] = weights.get(item.symbol.upper(), 0.0) + price * item.quantity
+
+            risk = self.market_tool.get_risk_matrices(list(weights), benchmark="SPY", period="1y")
+            if not risk.symbols or risk.observations < MIN_OBSERVATIONS:
+                return "Not enough shared price history yet to measure your portfolio's risk."
+
+            # Holdings left out of the risk engine carry no weight here either
+            stats = risk.portfolio(weights)
+            total_value = sum(weights[symbol] for symbol in risk.symbols)
+
+            report = [f"**Portfolio Risk** ({risk.observations} trading days of daily returns)"]
+            if risk.excluded:
+                report.append(f"*Not enough price history to include: {', '.join(risk.excluded)}*")
+            report.append(f"- Beta vs S&P 500: {stats['beta']:.2f}")
+            report.append(
+                f"- Annualized volatility: {stats['volatility']:.1f}% "
+                f"(holdings average {stats['weighted_volatility']:.1f}%)"
+            )
+            if len(risk.symbols) > 1:
+                report.append(f"- Average correlation between holdings: {stats['average_correlation']:.2f}")
+                report.append(f"- Diversification ratio: {stats['diversification_ratio']:.2f} (1.00 = no diversification benefit)")
+
+            report.append("\n| Symbol | Weight | Beta | Volatility |")
+            report.append("|---|---|---|---|")
+            for symbol in risk.symbols:
+                weight = weights[symbol] / total_value * 100 if total_value else 0.0
+                report.append(
+                    f"| {symbol} | {weight:.1f}% | {risk.beta[symbol]:.2f} | {risk.volatility[symbol]:.1f}% |"
+                )
+
+            if len(risk.symbols) > 1:
+                pairs = ", ".join(f"{a}/{b} ({value:.2f})" for a, b, value in risk.most_correlated(3))
+                report.append(f"\n**Most correlated**: {pairs}")
+
+                average = stats['average_correlation']
+                if average > 0.7:
+                    report.append("*Your holdings tend to move together, so diversification is limited.*")
+                elif average > 0.4:
+                    report.append("*Your holdings are moderately diversified.*")
+                else:
+                    report.append("*Your holdings are well diversified against each other.*")
+            else:
+                report.append("\n*A single holding has no diversification; add positions in other sectors or asset classes.*")
+
+            return "\n".join(report)
+        except Exception as e:
+            return f"Error analyzing portfolio risk: {e}"
+        finally:
+            db.close()
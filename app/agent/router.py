@@ -17,6 +17,7 @@ from app.agent.goal_agent import GoalPlanningAgent
 from app.agent.market_agent import MarketAnalysisAgent
 from app.agent.news_agent import NewsSynthesizerAgent
 from app.agent.tax_agent import TaxEducationAgent
+from app.tools.market_snapshot import market_snapshot
 
 tracer = trace.get_tracer(__name__)
 
@@ -74,7 +75,8 @@ def route_and_process(user_input: str, context: str = None) -> str:
     Returns:
         Response string from the appropriate agent(s)
     """
-    with tracer.start_as_current_span("route_and_process") as span:
+    # Every agent answering this turn (including fallbacks) reads one market snapshot
+    with tracer.start_as_current_span("route_and_process") as span, market_snapshot():
         span.set_attribute("input.value", user_input)
 
         # Determine routing mode
@@ -163,7 +165,7 @@ def _keyword_based_routing(user_input: str) -> str:
     # Portfolio/trading keywords
     portfolio_keywords = [
         "price", "stock price", "quote", "add", "portfolio",
-        "buy", "shares", "my holdings", "how much is"
+        "buy", "shares", "my holdings", "how much is", "diversified"
     ]
 
     # Route based on intent priority
@@ -1,7 +1,12 @@
 from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
-from typing import Dict
+from typing import Dict, List, Optional, Tuple
+from datetime import date
+
+from app.tools.market_data import MarketDataTool
+from app.tools.tax_harvest import scan_harvest
+from app.tools.tax_lots import METHODS, Lots, Sale, TaxLotLedger, compute_gains, get_ledger
 
 
 class TaxEducationAgent:
@@ -12,6 +17,8 @@ class TaxEducationAgent:
 
     def __init__(self):
         self.llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
+        self._market_tool: Optional[MarketDataTool] = None
+        self._ledger: Optional[TaxLotLedger] = None
 
         # Tax knowledge base (embedded for quick reference)
         self.tax_knowledge = {
@@ -101,6 +108,21 @@ class TaxEducationAgent:
             "niit": "3.8% Net Investment Income Tax for high earners"
         }
 
+    @property
+    def market_tool(self) -> MarketDataTool:
+        if self._market_tool is None:
+            self._market_tool = MarketDataTool()
+        return self._market_tool
+
+    @property
+    def ledger(self) -> TaxLotLedger:
+        """
+        The user's tax lots and sales (opened on first use, with existing holdings backfilled).
+        """
+        if self._ledger is None:
+            self._ledger = get_ledger()
+        return self._ledger
+
     def process_query(self, query: str) -> str:
         """
         Routes tax-related queries to appropriate responses.
@@ -127,9 +149,12 @@ class TaxEducationAgent:
         if "529" in query_lower or "education" in query_lower:
             return self._format_account_info("529")
 
-        # Capital gains queries
-        if any(k in query_lower for k in ["capital gain", "gains tax", "selling stock"]):
-            return self._explain_capital_gains()
+        # Capital gains queries (with the user's own lots when there are any)
+        if any(k in query_lower for k in [
+            "capital gain", "gains tax", "selling stock", "my gains", "realized",
+            "cost basis", "tax lot", "fifo", "lifo", "hifo", "specific id"
+        ]):
+            return self._explain_capital_gains(query)
 
         # Tax-loss harvesting
         if any(k in query_lower for k in ["tax loss", "harvesting", "wash sale"]):
@@ -169,9 +194,10 @@ class TaxEducationAgent:
         report.append("\n*This is for educational purposes only. Consult a tax professional for personalized advice.*")
         return "\n".join(report)
 
-    def _explain_capital_gains(self) -> str:
+    def _explain_capital_gains(self, query: str = "") -> str:
         """
-        Explains capital gains tax rules.
+        Explains capital gains tax rules, followed by the user's own realized
+        and unrealized gains when tax lots are recorded.
         """
         report = ["**Capital Gains Tax Guide**\n"]
 
@@ -190,12 +216,135 @@ class TaxEducationAgent:
         report.append("- Use tax-advantaged accounts for frequent trading")
         report.append("- Gift appreciated stock to charity")
 
+        positions = self._lot_gains_report(query)
+        if positions:
+            report.append("\n---\n")
+            report.append(positions)
+
         report.append("\n*Tax rates are for 2024. Consult a tax professional for personalized advice.*")
         return "\n".join(report)
 
+    def _lot_gains_report(self, query: str = "") -> Optional[str]:
+        """
+        Realized (this year) and unrealized short- and long-term gains from the
+        recorded tax lots, under the cost basis method named in the query
+        (by default SPECIFIC: the lots each sale was recorded against), with a
+        comparison of this year's realized gains across methods. None when no
+        lots are recorded.
+        """
+        query_upper = query.upper()
+        method = next((m for m in METHODS if m in query_upper), "SPECIFIC")
+        year = date.today().year
+
+        try:
+            book = self._load_book()
+            if book is None:
+                return None
+            lots, sales, prices = book
+            gains = compute_gains(lots, sales, prices, method=method, year=year)
+            comparison = self._compare_methods(lots, sales, prices, year)
+        except ValueError as e:
+            return f"**Your Tax Lots**: the recorded sales do not match the lots ({e})."
+        except Exception as e:
+            print(f"Tax lot gains unavailable: {e}")
+            return None
+
+        totals = gains.totals()
+        report = [f"**Your Capital Gains ({gains.method})**\n"]
+        report.append(f"- Realized in {year}: short-term ${totals['realized_short']:+,.2f}, long-term ${totals['realized_long']:+,.2f}")
+        report.append(f"- Unrealized: short-term ${totals['unrealized_short']:+,.2f}, long-term ${totals['unrealized_long']:+,.2f}")
+
+        by_symbol = gains.by_symbol()
+        open_positions = by_symbol[by_symbol['remaining'] > 0]
+        if not open_positions.empty:
+            report.append("\n| Symbol | Shares | Cost Basis | Unrealized Short-Term | Unrealized Long-Term |")
+            report.append("|--------|--------|------------|-----------------------|----------------------|")
+            for symbol, row in open_positions.iterrows():
+                report.append(
+                    f"| {symbol} | {row['remaining']:g} | ${row['cost_basis']:,.2f} | "
+                    f"${row['unrealized_short']:+,.2f} | ${row['unrealized_long']:+,.2f} |"
+                )
+
+        if comparison:
+            report.append(comparison)
+
+        return "\n".join(report)
+
+    def _harvest_report(self, limit: int = 10) -> Optional[str]:
+        """
+        The user's open lots trading below cost, ranked by estimated tax saved,
+        with wash-sale conflicts flagged. None when no lots are recorded.
+        """
+        try:
+            book = self._load_book()
+            if book is None:
+                return None
+            lots, sales, prices = book
+            candidates = scan_harvest(lots, sales, prices)
+        except ValueError as e:
+            return f"**Your Tax Lots**: the recorded sales do not match the lots ({e})."
+        except Exception as e:
+            print(f"Tax-loss harvesting scan unavailable: {e}")
+            return None
+
+        if candidates.empty:
+            return "**Your Harvesting Opportunities**: none of your lots are trading below cost right now."
+
+        report = ["**Your Harvesting Opportunities**\n"]
+        report.append("| Symbol | Bought | Shares | Loss | Term | Est. Tax Saved | Wash Sale |")
+        report.append("|--------|--------|--------|------|------|----------------|-----------|")
+        for _, row in candidates.head(limit).iterrows():
+            term = "Long" if row['long_term'] else "Short"
+            wash = f"⚠️ repurchase in window, wait until {row['clear_on']}" if row['wash_sale'] else "Clear"
+            report.append(
+                f"| {row['symbol']} | {row['acquired'].date()} | {row['remaining']:g} | "
+                f"${row['loss']:,.2f} | {term} | ${row['tax_saved']:,.2f} | {wash} |"
+            )
+
+        clear = candidates[~candidates['wash_sale']]
+        report.append(
+            f"\n**Total harvestable now**: ${-clear['loss'].sum():,.2f} of losses, "
+            f"about ${clear['tax_saved'].sum():,.2f} in tax saved "
+            f"({len(candidates) - len(clear)} lot(s) blocked by wash-sale windows)."
+        )
+        report.append("- Avoid buying the same shares for 30 days after harvesting")
+        return "\n".join(report)
+
+    def _load_book(self) -> Optional[Tuple[Lots, List[Sale], Dict[str, float]]]:
+        """
+        Recorded lots and sales plus current prices for their symbols (one batched quote request).
+        """
+        lots = self.ledger.lots()
+        if not len(lots):
+            return None
+        sales = self.ledger.sales()
+        quotes = self.market_tool.get_stock_prices(sorted(set(lots.symbols.tolist())))
+        prices = {s: q['last_price'] for s, q in quotes.items() if q and 'last_price' in q}
+        return lots, sales, prices
+
+    def _compare_methods(self, lots: Lots, sales: List[Sale], prices: Dict[str, float], year: int) -> Optional[str]:
+        """
+        This year's realized gains under each cost basis method, if anything was sold.
+        """
+        rows = []
+        for method in ("FIFO", "LIFO", "HIFO"):
+            totals = compute_gains(lots, sales, prices, method=method, year=year).totals()
+            rows.append((method, totals['realized_short'], totals['realized_long']))
+
+        if all(short == 0 and long == 0 for _, short, long in rows):
+            return None
+
+        report = [f"\n**{year} Realized Gains by Cost Basis Method**\n"]
+        report.append("| Method | Short-Term | Long-Term |")
+        report.append("|--------|------------|-----------|")
+        for method, short, long in rows:
+            report.append(f"| {method} | ${short:+,.2f} | ${long:+,.2f} |")
+        return "\n".join(report)
+
     def _explain_tax_loss_harvesting(self) -> str:
         """
-        Explains tax-loss harvesting strategy.
+        Explains tax-loss harvesting strategy, followed by the user's
+        harvestable lots when tax lots are recorded.
         """
         report = ["**Tax-Loss Harvesting**\n"]
 
@@ -223,6 +372,11 @@ class TaxEducationAgent:
         report.append("- Replace sold investments with similar (not identical) funds")
         report.append("- Keep records of all transactions")
 
+        candidates = self._harvest_report()
+        if candidates:
+            report.append("\n---\n")
+            report.append(candidates)
+
         report.append("\n*This is for educational purposes only. Consult a tax professional for personalized advice.*")
         return "\n".join(report)
 
@@ -1,8 +1,10 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, Date
+import os
+from sqlalchemy import create_engine, Column, Integer, String, Float, Date, DateTime, Text
 from sqlalchemy.orm import declarative_base, sessionmaker
 from datetime import date
 
-DATABASE_URL = "sqlite:///./data/portfolio.db"
+DATABASE_PATH = os.getenv("DATABASE_PATH", "./data/portfolio.db")
+DATABASE_URL = f"sqlite:///{DATABASE_PATH}"
 
 engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -27,6 +29,56 @@ class FinancialGoal(Base):
     target_date = Column(Date)
     category = Column(String)  # retirement, house, education, emergency, other
 
+class CompanyProfile(Base):
+    __tablename__ = "company_profiles"
+
+    symbol = Column(String, primary_key=True)
+    summary = Column(Text)
+    info_json = Column(Text)  # full provider profile, JSON-encoded
+    fetched_at = Column(DateTime, index=True)
+
+class NewsFeed(Base):
+    __tablename__ = "news_feeds"
+
+    symbol = Column(String, primary_key=True)
+    items_json = Column(Text)  # raw provider news items, JSON-encoded
+    fetched_at = Column(DateTime, index=True)
+
+class HeadlineSentiment(Base):
+    __tablename__ = "headline_sentiments"
+
+    headline_hash = Column(String, primary_key=True)  # sha1 of the normalized headline
+    title = Column(Text)
+    score = Column(Float)  # -1 (very bearish) to 1 (very bullish)
+    scored_at = Column(DateTime, index=True)
+
+class NewsSummary(Base):
+    __tablename__ = "news_summaries"
+
+    summary_key = Column(String, primary_key=True)  # sha1 of the subject and its headline hashes
+    subject = Column(String, index=True)
+    summary = Column(Text)
+    created_at = Column(DateTime, index=True)
+
+class TaxLot(Base):
+    __tablename__ = "tax_lots"
+
+    id = Column(Integer, primary_key=True, index=True)
+    symbol = Column(String, index=True)
+    acquired_on = Column(Date)
+    quantity = Column(Float)  # shares bought in this lot
+    price = Column(Float)  # cost per share
+
+class LotSale(Base):
+    __tablename__ = "tax_lot_sales"
+
+    id = Column(Integer, primary_key=True, index=True)
+    symbol = Column(String, index=True)
+    sold_on = Column(Date)
+    quantity = Column(Float)
+    price = Column(Float)  # proceeds per share
+    lot_id = Column(Integer, nullable=True)  # set for specific-ID sales
+
 def init_db():
     Base.metadata.create_all(bind=engine)
 
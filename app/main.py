@@ -15,10 +15,18 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.observability import setup_observability
 from app.agent.router import route_and_process
+from app.tools.prewarmer import start_prewarmer
+from app.tools.news_index import start_news_ingestor
 
 # Initialize Tracing
 tracer = setup_observability()
 
+# Keep index, sector and portfolio quotes warm in the background
+start_prewarmer()
+
+# Index news for the tracked tickers so topical news questions are answered locally
+start_news_ingestor()
+
 # Page Configuration
 st.set_page_config(
     page_title="FinnIE - Financial Advisor",
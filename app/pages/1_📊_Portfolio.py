@@ -14,7 +14,11 @@ import pandas as pd
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from app.database import get_db, PortfolioItem, init_db
+from app.tools.holdings import HoldingsBook
 from app.tools.market_data import MarketDataTool
+from app.tools.portfolio_risk import MIN_OBSERVATIONS
+from app.tools.rate_limiter import Priority, request_priority
+from app.tools.tax_lots import METHODS, default_method
 
 # Page configuration
 st.set_page_config(
@@ -26,6 +30,18 @@ st.set_page_config(
 # Initialize
 init_db()
 market_tool = MarketDataTool()
+book = HoldingsBook()
+
+
+def trade_price(symbol, entered):
+    """The price entered on the form, or the current quote (None if neither)."""
+    if entered:
+        return entered
+    price_data = market_tool.get_stock_price(symbol)
+    if price_data and 'error' not in price_data and price_data.get('last_price'):
+        return price_data['last_price']
+    return None
+
 
 st.title("📊 Portfolio Dashboard")
 st.markdown("View and manage your investment portfolio")
@@ -40,28 +56,21 @@ with st.sidebar:
     with st.form("add_stock"):
         symbol = st.text_input("Symbol", placeholder="AAPL").upper()
         shares = st.number_input("Shares", min_value=0.0, step=1.0)
+        cost = st.number_input("Cost per share (0 = current price)", min_value=0.0, step=0.01)
         submitted = st.form_submit_button("Add to Portfolio", use_container_width=True)
 
         if submitted and symbol and shares > 0:
             try:
-                db = next(get_db())
-                existing = db.query(PortfolioItem).filter(PortfolioItem.symbol == symbol).first()
-
-                if existing:
-                    existing.quantity += shares
+                # Each purchase is its own tax lot
+                price = trade_price(symbol, cost)
+                if price is None:
+                    st.error(f"No price available for {symbol}. Enter the cost per share.")
                 else:
-                    price_data = market_tool.get_stock_price(symbol)
-                    price = price_data['last_price'] if price_data else 0.0
-                    new_item = PortfolioItem(symbol=symbol, quantity=shares, avg_price=price)
-                    db.add(new_item)
-
-                db.commit()
-                st.success(f"Added {shares} shares of {symbol}")
-                st.rerun()
+                    book.buy(symbol, shares, price)
+                    st.success(f"Added {shares} shares of {symbol}")
+                    st.rerun()
             except Exception as e:
                 st.error(f"Error: {e}")
-            finally:
-                db.close()
 
 
 def get_portfolio_data():
@@ -72,11 +81,13 @@ def get_portfolio_data():
         if not items:
             return None
 
+        quotes = market_tool.get_stock_prices([item.symbol for item in items])
+
         data = []
         for item in items:
-            price_data = market_tool.get_stock_price(item.symbol)
-            current_price = price_data['last_price'] if price_data else 0.0
-            change_pct = price_data['change_percent'] if price_data else 0.0
+            price_data = quotes.get(item.symbol.upper(), {})
+            current_price = price_data.get('last_price', 0.0)
+            change_pct = price_data.get('change_percent', 0.0)
 
             value = current_price * item.quantity
             cost_basis = item.avg_price * item.quantity
@@ -100,7 +111,8 @@ def get_portfolio_data():
 
 
 # Main content
-portfolio_df = get_portfolio_data()
+with request_priority(Priority.PAGE):
+    portfolio_df = get_portfolio_data()
 
 if portfolio_df is None or portfolio_df.empty:
     st.info("📭 Your portfolio is empty. Add stocks using the sidebar or chat with FinnIE!")
@@ -201,10 +213,63 @@ else:
 
     st.dataframe(display_df, use_container_width=True, hide_index=True)
 
+    # Risk and diversification
+    st.divider()
+    st.markdown("### Risk & Diversification")
+
+    try:
+        with st.spinner("Computing correlations..."), request_priority(Priority.PAGE):
+            risk = market_tool.get_risk_matrices(portfolio_df['Symbol'].tolist(), benchmark="SPY", period="1y")
+    except Exception as e:
+        risk = None
+        print(f"Portfolio risk unavailable: {e}")
+
+    if risk is not None and risk.symbols and risk.observations >= MIN_OBSERVATIONS:
+        weights = portfolio_df.groupby(portfolio_df['Symbol'].str.upper())['Value'].sum().to_dict()
+        stats = risk.portfolio(weights)
+
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Beta vs S&P 500", f"{stats['beta']:.2f}")
+        with col2:
+            st.metric("Annualized Volatility", f"{stats['volatility']:.1f}%")
+        with col3:
+            st.metric("Avg Correlation", "n/a" if pd.isna(stats['average_correlation']) else f"{stats['average_correlation']:.2f}")
+        with col4:
+            st.metric("Diversification Ratio", "n/a" if pd.isna(stats['diversification_ratio']) else f"{stats['diversification_ratio']:.2f}")
+
+        if len(risk.symbols) > 1:
+            fig_corr = px.imshow(
+                risk.correlation,
+                text_auto=".2f",
+                color_continuous_scale="RdBu_r",
+                zmin=-1,
+                zmax=1,
+                title="Correlation of Daily Returns"
+            )
+            fig_corr.update_layout(height=450)
+            st.plotly_chart(fig_corr, use_container_width=True)
+
+        st.caption(f"Based on {risk.observations} trading days of daily returns, benchmarked against SPY.")
+        if risk.excluded:
+            st.caption(f"Not enough price history to include: {', '.join(risk.excluded)}")
+    else:
+        st.info("Not enough shared price history yet to measure portfolio risk.")
+
     # Actions
     st.divider()
     st.markdown("### Manage Holdings")
 
+    # Sales relieve tax lots in this order
+    relief_methods = [m for m in METHODS if m != "SPECIFIC"]
+    method = st.selectbox(
+        "Cost basis method for sales",
+        options=relief_methods,
+        index=relief_methods.index(default_method()) if default_method() in relief_methods else 0,
+        help="FIFO sells the oldest lots first, LIFO the newest, HIFO the highest-cost."
+    )
+    sale_price = st.number_input("Price per share (0 = current price)", min_value=0.0, step=0.01)
+
     col1, col2 = st.columns(2)
 
     with col1:
@@ -215,17 +280,13 @@ else:
             )
             if st.button("Remove", type="primary"):
                 try:
-                    db = next(get_db())
-                    item = db.query(PortfolioItem).filter(PortfolioItem.symbol == remove_symbol).first()
-                    if item:
-                        db.delete(item)
-                        db.commit()
-                        st.success(f"Removed {remove_symbol}")
-                        st.rerun()
+                    # Without a price, only shares no tax lot covers can be sold
+                    price = trade_price(remove_symbol, sale_price)
+                    book.remove(remove_symbol, price, method=method)
+                    st.success(f"Removed {remove_symbol}")
+                    st.rerun()
                 except Exception as e:
                     st.error(f"Error: {e}")
-                finally:
-                    db.close()
 
     with col2:
         with st.expander("✏️ Update Shares"):
@@ -237,17 +298,10 @@ else:
             new_shares = st.number_input("New share count", min_value=0.0, step=1.0)
             if st.button("Update", type="primary"):
                 try:
-                    db = next(get_db())
-                    item = db.query(PortfolioItem).filter(PortfolioItem.symbol == update_symbol).first()
-                    if item:
-                        if new_shares == 0:
-                            db.delete(item)
-                        else:
-                            item.quantity = new_shares
-                        db.commit()
-                        st.success(f"Updated {update_symbol}")
-                        st.rerun()
+                    # More shares is a purchase (a new lot), fewer is a sale
+                    price = trade_price(update_symbol, sale_price)
+                    book.set_quantity(update_symbol, new_shares, price, method=method)
+                    st.success(f"Updated {update_symbol}")
+                    st.rerun()
                 except Exception as e:
                     st.error(f"Error: {e}")
-                finally:
-                    db.close()
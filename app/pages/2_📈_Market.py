@@ -13,7 +13,8 @@ import pandas as pd
 # Add project root to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from app.tools.market_data import MarketDataTool
+from app.tools.market_data import SECTOR_ETFS, MarketDataTool
+from app.tools.rate_limiter import Priority, request_priority
 
 # Page configuration
 st.set_page_config(
@@ -27,6 +28,7 @@ market_tool = MarketDataTool()
 
 st.title("📈 Market Dashboard")
 st.markdown("Track major indices, sectors, and market trends")
+st.caption(market_tool.calendar.status())
 
 # Sidebar
 with st.sidebar:
@@ -60,10 +62,12 @@ def get_index_data():
         "VIX": "^VIX"
     }
 
+    quotes = market_tool.get_stock_prices(list(indices.values()))
+
     data = []
     for name, symbol in indices.items():
-        price_data = market_tool.get_stock_price(symbol)
-        if price_data:
+        price_data = quotes.get(symbol)
+        if price_data and "error" not in price_data:
             data.append({
                 'Index': name,
                 'Symbol': symbol,
@@ -90,10 +94,12 @@ def get_sector_data():
         "Communication": "XLC"
     }
 
+    quotes = market_tool.get_stock_prices(list(sectors.values()))
+
     data = []
     for name, symbol in sectors.items():
-        price_data = market_tool.get_stock_price(symbol)
-        if price_data:
+        price_data = quotes.get(symbol)
+        if price_data and "error" not in price_data:
             data.append({
                 'Sector': name,
                 'ETF': symbol,
@@ -104,10 +110,38 @@ def get_sector_data():
     return pd.DataFrame(data) if data else None
 
 
+def get_rotation_data():
+    """Relative strength vs SPY for every sector ETF, from one price matrix load."""
+    names = {symbol: sector for sector, symbol in SECTOR_ETFS.items()}
+    try:
+        table = market_tool.get_sector_rotation(list(SECTOR_ETFS.values()), benchmark="SPY")
+    except Exception as e:
+        print(f"Sector rotation unavailable: {e}")
+        return None
+
+    table = table.reset_index()
+    table.insert(0, 'Sector', table['symbol'].map(names))
+    return table.dropna(subset=['rs_1m', 'rs_3m'])
+
+
+def get_technicals_data():
+    """Sector ETF indicators from the incremental indicator state; only bars added since the last load are applied."""
+    names = {symbol: sector for sector, symbol in SECTOR_ETFS.items()}
+    try:
+        table = market_tool.get_live_indicators(list(SECTOR_ETFS.values()))
+    except Exception as e:
+        print(f"Sector technicals unavailable: {e}")
+        return None
+
+    table = table.reset_index()
+    table.insert(0, 'Sector', table['symbol'].map(names))
+    return table.dropna(subset=['price'])
+
+
 # Main content
 st.markdown("### Major Indices")
 
-with st.spinner("Loading market data..."):
+with st.spinner("Loading market data..."), request_priority(Priority.PAGE):
     index_df = get_index_data()
 
 if index_df is not None and not index_df.empty:
@@ -159,7 +193,7 @@ st.divider()
 # Sector Performance
 st.markdown("### Sector Performance")
 
-with st.spinner("Loading sector data..."):
+with st.spinner("Loading sector data..."), request_priority(Priority.PAGE):
     sector_df = get_sector_data()
 
 if sector_df is not None and not sector_df.empty:
@@ -244,6 +278,82 @@ if sector_df is not None and not sector_df.empty:
 else:
     st.warning("Unable to load sector data. Please check your connection.")
 
+st.divider()
+
+# Sector Rotation
+st.markdown("### Sector Rotation")
+st.caption("Relative strength vs the S&P 500 (SPY). Sectors right of center led over 3 months; above center, over the last month.")
+
+with st.spinner("Loading sector history..."), request_priority(Priority.PAGE):
+    rotation_df = get_rotation_data()
+
+if rotation_df is not None and not rotation_df.empty:
+    col1, col2 = st.columns(2)
+
+    with col1:
+        fig_rotation = px.scatter(
+            rotation_df,
+            x='rs_3m',
+            y='rs_1m',
+            color='quadrant',
+            text='symbol',
+            hover_name='Sector',
+            color_discrete_map={
+                'Leading': 'green', 'Weakening': 'orange', 'Improving': 'royalblue', 'Lagging': 'red'
+            },
+            title="Rotation Map"
+        )
+        fig_rotation.add_hline(y=0, line_dash="dot", line_color="gray")
+        fig_rotation.add_vline(x=0, line_dash="dot", line_color="gray")
+        fig_rotation.update_traces(textposition='top center')
+        fig_rotation.update_layout(
+            xaxis_title="3M relative strength %",
+            yaxis_title="1M relative strength %",
+            height=450
+        )
+        st.plotly_chart(fig_rotation, use_container_width=True)
+
+    with col2:
+        horizons = {'rs_1w': '1W', 'rs_1m': '1M', 'rs_3m': '3M', 'rs_ytd': 'YTD'}
+        ranking_df = rotation_df.sort_values('rank_1m')[['Sector', 'symbol', *horizons, 'quadrant']]
+        ranking_df = ranking_df.rename(columns={'symbol': 'ETF', 'quadrant': 'Phase', **horizons})
+        for column in horizons.values():
+            ranking_df[column] = ranking_df[column].apply(lambda x: "n/a" if pd.isna(x) else f"{x:+.1f}%")
+        st.markdown("#### Relative Strength Ranking")
+        st.dataframe(ranking_df, use_container_width=True, hide_index=True)
+else:
+    st.info("Sector history is not available yet.")
+
+st.divider()
+
+# Sector Technicals
+st.markdown("### Sector Technicals")
+
+with st.spinner("Updating indicators..."), request_priority(Priority.PAGE):
+    technicals_df = get_technicals_data()
+
+if technicals_df is not None and not technicals_df.empty:
+    display_df = pd.DataFrame({
+        'Sector': technicals_df['Sector'],
+        'ETF': technicals_df['symbol'],
+        'Price': technicals_df['price'],
+        'vs 20D MA': (technicals_df['price'] / technicals_df['ma20'] - 1) * 100,
+        'vs 50D MA': (technicals_df['price'] / technicals_df['ma50'] - 1) * 100,
+        'RSI (14)': technicals_df['rsi14'],
+        'MACD Hist': technicals_df['macd_hist'],
+        'Volatility (20d)': technicals_df['volatility20'],
+    })
+    formats = {
+        'Price': "${:.2f}", 'vs 20D MA': "{:+.1f}%", 'vs 50D MA': "{:+.1f}%",
+        'RSI (14)': "{:.1f}", 'MACD Hist': "{:+.2f}", 'Volatility (20d)': "{:.2f}%",
+    }
+    for column, fmt in formats.items():
+        display_df[column] = display_df[column].apply(lambda x, fmt=fmt: "n/a" if pd.isna(x) else fmt.format(x))
+    st.dataframe(display_df, use_container_width=True, hide_index=True)
+    st.caption("RSI above 70 is often read as overbought, below 30 as oversold.")
+else:
+    st.info("Sector indicators are not available yet.")
+
 # Market info section
 st.divider()
 st.markdown("### About Market Indicators")
@@ -0,0 +1,116 @@
+"""
+Asyncio front end for the market data layer.
+
+yfinance is blocking, so every call runs in a worker thread. A per-event-loop
+semaphore bounds how many of those calls are in flight at once. Lookups still
+go through MarketDataTool, so they share its quote cache, history store and
+single-flight group.
+
+Configuration (environment variables):
+    MARKET_DATA_CONCURRENCY    Maximum concurrent fetches per event loop (default 8)
+"""
+
+import asyncio
+import os
+import threading
+import weakref
+from typing import Any, Callable, Coroutine, Dict, List, Optional
+
+import pandas as pd
+
+from app.tools.market_data import MarketDataTool
+
+
+def run_sync(coro: Coroutine) -> Any:
+    """
+    Runs a coroutine from synchronous code (agent nodes run on worker threads).
+
+    Raises RuntimeError if the calling thread already runs an event loop:
+    waiting here would block that loop, so async code must await the
+    AsyncMarketDataClient coroutine directly.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    coro.close()
+    raise RuntimeError("run_sync() called from a running event loop; await the coroutine instead")
+
+
+class AsyncMarketDataClient:
+    """Awaitable quote, history and news lookups with bounded concurrency."""
+
+    def __init__(self, market_tool: Optional[MarketDataTool] = None, max_concurrency: Optional[int] = None):
+        self.market_tool = market_tool or MarketDataTool()
+        self.max_concurrency = (
+            max_concurrency
+            if max_concurrency is not None
+            else int(os.getenv("MARKET_DATA_CONCURRENCY", "8"))
+        )
+        # asyncio primitives are bound to one loop, so keep one semaphore per loop
+        self._semaphores: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphores[loop] = semaphore
+        return semaphore
+
+    async def _run(self, fn: Callable, *args) -> Any:
+        async with self._semaphore():
+            return await asyncio.to_thread(fn, *args)
+
+    # --- Quotes ---
+
+    async def get_stock_price(self, symbol: str) -> Optional[Dict[str, Any]]:
+        return await self._run(self.market_tool.get_stock_price, symbol)
+
+    async def get_stock_prices(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetches many quotes. The batch is already a single round trip, so it
+        occupies one concurrency slot.
+        """
+        return await self._run(self.market_tool.get_stock_prices, symbols)
+
+    # --- History ---
+
+    async def get_history(self, symbol: str, period: str = "1mo") -> pd.DataFrame:
+        return await self._run(self.market_tool.get_history, symbol, period)
+
+    async def get_histories(self, symbols: List[str], period: str = "1mo") -> Dict[str, pd.DataFrame]:
+        return await self._run(self.market_tool.get_histories, symbols, period)
+
+    # --- News ---
+
+    async def get_news(self, symbol: str) -> List[Dict]:
+        return await self._run(self.market_tool.get_news, symbol)
+
+    async def get_news_many(self, symbols: List[str]) -> Dict[str, List[Dict]]:
+        """
+        Fetches news for every symbol concurrently. A symbol whose fetch fails
+        maps to an empty list.
+        """
+        unique = list(dict.fromkeys(symbols))
+        results = await asyncio.gather(*(self.get_news(s) for s in unique), return_exceptions=True)
+        return {
+            symbol: [] if isinstance(result, BaseException) else result
+            for symbol, result in zip(unique, results)
+        }
+
+
+# Global client instance (lazy initialization)
+_async_client = None
+_async_client_lock = threading.Lock()
+
+
+def get_async_market_data_client() -> AsyncMarketDataClient:
+    """Get or create the process-wide async market data client."""
+    global _async_client
+    if _async_client is None:
+        with _async_client_lock:
+            if _async_client is None:
+                _async_client = AsyncMarketDataClient()
+    return _async_client
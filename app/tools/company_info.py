@@ -0,0 +1,143 @@
+"""
+Persistent company profile cache.
+
+Company profiles (business summary, sector, industry, ...) come from the
+slowest yfinance endpoint and rarely change. Profiles are stored in the
+company_profiles table with the time they were fetched and served from
+there until they are older than the TTL. If a refresh fails, the stored
+profile is served anyway.
+
+Configuration (environment variables):
+    COMPANY_INFO_TTL    Seconds before a stored profile is refetched (default 604800, one week)
+"""
+
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from app.database import Base, CompanyProfile, SessionLocal, engine
+from app.tools.providers import MarketDataProvider, get_provider
+from app.tools.rate_limiter import Priority, request_priority
+from app.tools.singleflight import SingleFlight, get_single_flight
+
+
+class CompanyInfoCache:
+    """Company profiles persisted in the app database with a long TTL."""
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable] = None,
+        ttl: Optional[float] = None,
+        flights: Optional[SingleFlight] = None,
+        provider: Optional[MarketDataProvider] = None,
+    ):
+        self.session_factory = session_factory or SessionLocal
+        self.ttl = ttl if ttl is not None else float(os.getenv("COMPANY_INFO_TTL", str(7 * 24 * 3600)))
+        self.flights = flights or get_single_flight()
+        self._provider = provider
+        if session_factory is None:
+            Base.metadata.create_all(bind=engine, tables=[CompanyProfile.__table__])
+
+    @property
+    def provider(self) -> MarketDataProvider:
+        return self._provider or get_provider()
+
+    def get_info(self, symbol: str) -> Dict[str, Any]:
+        """
+        Returns the company profile for a symbol, fetching it only if the stored copy is missing or expired.
+        """
+        symbol = symbol.upper()
+        stored = self._load(symbol)
+        if stored is not None and not self._expired(stored):
+            return json.loads(stored.info_json)
+
+        try:
+            return self.flights.do(("info", symbol), lambda: self._fetch_and_store(symbol))
+        except Exception as e:
+            if stored is None:
+                raise
+            print(f"Error refreshing company info for {symbol}, serving stored profile: {e}")
+            return json.loads(stored.info_json)
+
+    def get_summary(self, symbol: str) -> str:
+        return self.get_info(symbol).get("longBusinessSummary", "No summary available.")
+
+    def warm(self, symbols: List[str], max_workers: int = 8, force: bool = False) -> Dict[str, bool]:
+        """
+        Fetches and stores profiles for many symbols concurrently.
+
+        Symbols with a fresh stored profile are skipped unless force=True.
+        Returns {symbol: True/False} for whether a profile is now stored.
+        """
+        unique = list(dict.fromkeys(s.upper() for s in symbols if s))
+        results = {}
+        todo = []
+        for symbol in unique:
+            stored = self._load(symbol)
+            if stored is not None and not force and not self._expired(stored):
+                results[symbol] = True
+            else:
+                todo.append(symbol)
+
+        def fetch(symbol):
+            try:
+                # Runs in a worker thread, so the priority has to be set here
+                with request_priority(Priority.BACKGROUND):
+                    self.flights.do(("info", symbol), lambda: self._fetch_and_store(symbol))
+                return True
+            except Exception as e:
+                print(f"Error fetching company info for {symbol}: {e}")
+                return False
+
+        if todo:
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                results.update(zip(todo, pool.map(fetch, todo)))
+        return results
+
+    # --- Internals ---
+
+    def _expired(self, row: CompanyProfile) -> bool:
+        return row.fetched_at is None or datetime.utcnow() - row.fetched_at > timedelta(seconds=self.ttl)
+
+    def _load(self, symbol: str) -> Optional[CompanyProfile]:
+        db = self.session_factory()
+        try:
+            return db.get(CompanyProfile, symbol)
+        finally:
+            db.close()
+
+    def _fetch_and_store(self, symbol: str) -> Dict[str, Any]:
+        info = self.provider.get_info(symbol)
+        if not info:
+            raise LookupError(f"No company info for {symbol}")
+
+        db = self.session_factory()
+        try:
+            db.merge(CompanyProfile(
+                symbol=symbol,
+                summary=info.get("longBusinessSummary"),
+                info_json=json.dumps(info, default=str),
+                fetched_at=datetime.utcnow(),
+            ))
+            db.commit()
+        finally:
+            db.close()
+        return info
+
+
+# Global cache instance (lazy initialization)
+_company_info_cache = None
+_company_info_cache_lock = threading.Lock()
+
+
+def get_company_info_cache() -> CompanyInfoCache:
+    """Get or create the process-wide company info cache."""
+    global _company_info_cache
+    if _company_info_cache is None:
+        with _company_info_cache_lock:
+            if _company_info_cache is None:
+                _company_info_cache = CompanyInfoCache()
+    return _company_info_cache
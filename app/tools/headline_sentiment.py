@@ -0,0 +1,208 @@
+"""
+Headline-level sentiment scores, cached in the app database.
+
+A headline's sentiment does not change, and the same headlines reach many
+users and turns. Each headline is scored once, from -1 (very bearish) to 1
+(very bullish), and stored in the headline_sentiments table keyed by a hash
+of its normalized text. Headlines without a stored score are sent to the
+scorer in batches (one LLM call per batch), so only new headlines cost a
+call. Sentiment for a ticker or the whole market is then an aggregate of
+stored scores.
+
+News summaries are stored the same way, in the news_summaries table keyed by
+the subject and the set of headlines summarized: a summary is only written
+(one LLM call) when a subject's headline set changes.
+
+Configuration (environment variables):
+    SENTIMENT_BATCH_SIZE    Headlines scored per LLM call (default 25)
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Sequence
+
+from app.database import Base, HeadlineSentiment, NewsSummary, SessionLocal, engine
+from app.tools.news_dedup import normalize
+
+# Scores a batch of headlines, returning one score per headline in order
+Scorer = Callable[[List[str]], Sequence[float]]
+
+# Summarizes a subject's headlines; None when no summary could be written
+Summarizer = Callable[[List[str]], Optional[str]]
+
+# Mean scores beyond these read as a clear lean; individual headlines use the same cut-off
+BULLISH = 0.15
+BEARISH = -0.15
+
+_NUMBER = re.compile(r"-?\d+(?:\.\d+)?")
+_LIST_MARKER = re.compile(r"(?m)^\s*\d+[.)]\s+")
+
+
+def headline_hash(title: str) -> str:
+    return hashlib.sha1(normalize(title).encode()).hexdigest()
+
+
+def summary_key(subject: str, titles: Sequence[str]) -> str:
+    """Key of a subject's headline set; order and near-identical rewordings do not change it."""
+    hashes = sorted({headline_hash(title) for title in titles if title})
+    return hashlib.sha1("\n".join([subject.upper()] + hashes).encode()).hexdigest()
+
+
+def parse_scores(text: str, expected: int) -> List[float]:
+    """
+    Reads a model reply holding one score per headline, as a JSON list or as
+    plain numbers. Scores are clipped to [-1, 1].
+
+    Raises ValueError if the reply does not hold exactly `expected` scores.
+    """
+    try:
+        values = json.loads(text)
+        if not isinstance(values, list):
+            raise ValueError
+        scores = [float(v) for v in values]
+    except (ValueError, TypeError):
+        # "1. 0.4" style replies: drop the list numbering, keep the scores
+        scores = [float(v) for v in _NUMBER.findall(_LIST_MARKER.sub("", str(text)))]
+    if len(scores) != expected:
+        raise ValueError(f"expected {expected} scores, got {len(scores)}")
+    return [min(1.0, max(-1.0, s)) for s in scores]
+
+
+def summarize_sentiment(scores: Sequence[float]) -> Optional[Dict[str, float]]:
+    """Mean score, overall label and positive / negative / neutral counts; None without scores."""
+    if not scores:
+        return None
+    mean = sum(scores) / len(scores)
+    return {
+        "score": mean,
+        "label": "Bullish" if mean >= BULLISH else "Bearish" if mean <= BEARISH else "Mixed",
+        "positive": sum(1 for s in scores if s >= BULLISH),
+        "negative": sum(1 for s in scores if s <= BEARISH),
+        "neutral": sum(1 for s in scores if BEARISH < s < BULLISH),
+        "count": len(scores),
+    }
+
+
+class HeadlineSentimentStore:
+    """Sentiment score per headline, persisted in the app database."""
+
+    def __init__(self, session_factory: Optional[Callable] = None, batch_size: Optional[int] = None):
+        self.session_factory = session_factory or SessionLocal
+        self.batch_size = batch_size or int(os.getenv("SENTIMENT_BATCH_SIZE", "25"))
+        self.scored = 0  # headlines sent to a scorer by this store
+        self.summarized = 0  # summaries written by a summarizer for this store
+        if session_factory is None:
+            Base.metadata.create_all(bind=engine, tables=[HeadlineSentiment.__table__, NewsSummary.__table__])
+
+    def scores(self, titles: Sequence[str], scorer: Scorer) -> Dict[str, float]:
+        """
+        Sentiment for each headline, scoring only the ones not stored yet.
+
+        A batch the scorer fails on is left unscored (and retried next time);
+        its headlines are missing from the result.
+        """
+        hashes = {title: headline_hash(title) for title in titles if title}
+        stored = self._load(set(hashes.values()))
+
+        missing: Dict[str, str] = {}
+        for title, key in hashes.items():
+            if key not in stored:
+                missing.setdefault(key, title)
+
+        pending = list(missing.items())
+        for start in range(0, len(pending), self.batch_size):
+            batch = pending[start:start + self.batch_size]
+            try:
+                batch_scores = list(scorer([title for _, title in batch]))
+                if len(batch_scores) != len(batch):
+                    raise ValueError(f"expected {len(batch)} scores, got {len(batch_scores)}")
+            except Exception as e:
+                print(f"Error scoring {len(batch)} headlines: {e}")
+                continue
+            self.scored += len(batch)
+            new = {key: float(score) for (key, _), score in zip(batch, batch_scores)}
+            self._store({key: (missing[key], score) for key, score in new.items()})
+            stored.update(new)
+
+        return {title: stored[key] for title, key in hashes.items() if key in stored}
+
+    def sentiment(self, titles: Sequence[str], scorer: Scorer) -> Optional[Dict[str, float]]:
+        """Aggregate sentiment of a set of headlines (see summarize_sentiment)."""
+        return summarize_sentiment(list(self.scores(titles, scorer).values()))
+
+    def summary(self, subject: str, titles: Sequence[str], summarizer: Summarizer) -> Optional[str]:
+        """
+        The stored summary of these headlines about `subject`, written by the
+        summarizer only when this headline set has not been summarized before.
+        A failed or empty summary is not stored.
+        """
+        titles = [title for title in titles if title]
+        if not titles:
+            return None
+        key = summary_key(subject, titles)
+
+        db = self.session_factory()
+        try:
+            row = db.query(NewsSummary).filter(NewsSummary.summary_key == key).first()
+            if row:
+                return row.summary
+        finally:
+            db.close()
+
+        try:
+            text = summarizer(titles)
+        except Exception as e:
+            print(f"Error summarizing {len(titles)} headlines: {e}")
+            return None
+        if not text:
+            return None
+        self.summarized += 1
+
+        db = self.session_factory()
+        try:
+            db.merge(NewsSummary(summary_key=key, subject=subject.upper(), summary=text, created_at=datetime.utcnow()))
+            db.commit()
+        finally:
+            db.close()
+        return text
+
+    # --- Internals ---
+
+    def _load(self, keys: set) -> Dict[str, float]:
+        if not keys:
+            return {}
+        db = self.session_factory()
+        try:
+            rows = db.query(HeadlineSentiment).filter(HeadlineSentiment.headline_hash.in_(keys)).all()
+            return {row.headline_hash: row.score for row in rows}
+        finally:
+            db.close()
+
+    def _store(self, entries: Dict[str, tuple]) -> None:
+        db = self.session_factory()
+        try:
+            now = datetime.utcnow()
+            for key, (title, score) in entries.items():
+                db.merge(HeadlineSentiment(headline_hash=key, title=title, score=score, scored_at=now))
+            db.commit()
+        finally:
+            db.close()
+
+
+# Global store instance (lazy initialization)
+_sentiment_store = None
+_sentiment_store_lock = threading.Lock()
+
+
+def get_sentiment_store() -> HeadlineSentimentStore:
+    """Get or create the process-wide headline sentiment store."""
+    global _sentiment_store
+    if _sentiment_store is None:
+        with _sentiment_store_lock:
+            if _sentiment_store is None:
+                _sentiment_store = HeadlineSentimentStore()
+    return _sentiment_store
@@ -0,0 +1,204 @@
+"""
+Local columnar store for daily OHLCV history.
+
+Each symbol's daily bars live in their own Parquet file. A lookup returns
+bars straight from disk and only downloads what is missing: bars newer than
+the last stored date (the last stored bar is re-fetched too, since it may be
+an intraday partial bar) and, once, any older range a caller asks for that
+was never stored. A small manifest records how far back each symbol has
+been downloaded.
+
+Configuration (environment variables):
+    HISTORY_STORE_DIR          Directory for the Parquet files (default ./data/history)
+    HISTORY_REFRESH_SECONDS    Minimum seconds between tail updates per symbol (default 900)
+
+Outside trading hours, a file written after the last close settled already
+holds the final bar, so no tail update is made until the next session.
+"""
+
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+from urllib.parse import quote
+
+import pandas as pd
+
+from app.tools.market_calendar import MarketCalendar, get_market_calendar
+from app.tools.providers import (
+    OHLCV_COLUMNS,
+    MarketDataProvider,
+    get_provider,
+    period_start,
+    split_download,
+)
+from app.tools.singleflight import SingleFlight, get_single_flight
+
+__all__ = ["HistoryStore", "get_history_store", "period_start", "split_download"]
+
+
+class HistoryStore:
+    """Per-symbol Parquet files of daily bars with incremental updates."""
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        refresh_seconds: Optional[float] = None,
+        flights: Optional[SingleFlight] = None,
+        provider: Optional[MarketDataProvider] = None,
+        calendar: Optional[MarketCalendar] = None,
+    ):
+        self._provider = provider
+        self.calendar = calendar or get_market_calendar()
+        self.directory = directory or os.getenv("HISTORY_STORE_DIR", "./data/history")
+        self.refresh_seconds = (
+            refresh_seconds
+            if refresh_seconds is not None
+            else float(os.getenv("HISTORY_REFRESH_SECONDS", "900"))
+        )
+        self.flights = flights or get_single_flight()
+        self._write_lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+        self._manifest_path = os.path.join(self.directory, "manifest.json")
+        self._coverage = self._load_manifest()
+
+    @property
+    def provider(self) -> MarketDataProvider:
+        return self._provider or get_provider()
+
+    # --- Public API ---
+
+    def get_history(self, symbol: str, period: str = "1y") -> pd.DataFrame:
+        """
+        Returns daily bars for the requested period, updating the store first if needed.
+        """
+        return self.get_histories([symbol], period)[symbol.upper()]
+
+    def get_histories(self, symbols: List[str], period: str = "1y") -> Dict[str, pd.DataFrame]:
+        """
+        Returns daily bars for many symbols, keyed by upper-cased symbol.
+
+        All symbols that need new bars are updated with at most two batched
+        downloads: one for symbols with no stored data, one for tail updates.
+        """
+        unique = list(dict.fromkeys(s.upper() for s in symbols if s))
+        start = pd.Timestamp(period_start(period))
+
+        stale = [s for s in unique if self._needs_update(s, start)]
+        if stale:
+            self.flights.do_many(
+                [("history_store", s) for s in stale],
+                lambda keys: self._update([s for _, s in keys], start),
+            )
+
+        return {s: self.read(s).loc[lambda df: df.index >= start] for s in unique}
+
+    def read(self, symbol: str) -> pd.DataFrame:
+        """
+        Returns every stored bar for a symbol without touching the network.
+        """
+        path = self._path(symbol)
+        if not os.path.exists(path):
+            return pd.DataFrame(columns=OHLCV_COLUMNS, index=pd.DatetimeIndex([]))
+        return pd.read_parquet(path)
+
+    def last_date(self, symbol: str) -> Optional[pd.Timestamp]:
+        bars = self.read(symbol)
+        return bars.index[-1] if not bars.empty else None
+
+    # --- Internals ---
+
+    def _path(self, symbol: str) -> str:
+        return os.path.join(self.directory, f"{quote(symbol.upper(), safe='')}.parquet")
+
+    def _needs_backfill(self, symbol: str, start: pd.Timestamp) -> bool:
+        covered_from = self._coverage.get(symbol.upper())
+        return covered_from is None or pd.Timestamp(covered_from) > start
+
+    def _needs_update(self, symbol: str, start: pd.Timestamp) -> bool:
+        path = self._path(symbol)
+        if not os.path.exists(path) or self._needs_backfill(symbol, start):
+            return True
+
+        # Tail refresh, rate-limited by the last time the file was written
+        written_at = os.path.getmtime(path)
+        if self.calendar.is_current(datetime.fromtimestamp(written_at)):
+            return False
+        return time.time() - written_at > self.refresh_seconds
+
+    def _update(self, symbols: List[str], start: pd.Timestamp) -> Dict[tuple, None]:
+        full, tails = [], {}
+        for symbol in symbols:
+            stored = self.read(symbol)
+            if stored.empty or self._needs_backfill(symbol, start):
+                full.append(symbol)
+            else:
+                tails[symbol] = stored.index[-1]
+
+        if full and self._download_and_merge(full, start):
+            self._record_coverage(full, start)
+        if tails:
+            self._download_and_merge(list(tails), min(tails.values()))
+
+        return {("history_store", s): None for s in symbols}
+
+    def _download_and_merge(self, symbols: List[str], start: pd.Timestamp) -> bool:
+        try:
+            frame = self.provider.download(symbols, start=start.strftime("%Y-%m-%d"))
+        except Exception as e:
+            print(f"Error downloading history for {', '.join(symbols)}: {e}")
+            return False
+
+        for symbol, bars in split_download(frame, symbols).items():
+            self._merge(symbol, bars)
+        return True
+
+    def _merge(self, symbol: str, new_bars: pd.DataFrame) -> None:
+        with self._write_lock:
+            stored = self.read(symbol)
+            if new_bars.empty and stored.empty:
+                return
+            if stored.empty:
+                merged = new_bars
+            else:
+                # New bars win, so a partial intraday bar gets replaced
+                merged = pd.concat([stored[~stored.index.isin(new_bars.index)], new_bars]).sort_index()
+
+            path = self._path(symbol)
+            tmp_path = f"{path}.tmp"
+            merged.to_parquet(tmp_path)
+            os.replace(tmp_path, path)
+
+    def _load_manifest(self) -> Dict[str, str]:
+        try:
+            with open(self._manifest_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _record_coverage(self, symbols: List[str], start: pd.Timestamp) -> None:
+        with self._write_lock:
+            for symbol in symbols:
+                if os.path.exists(self._path(symbol)):
+                    self._coverage[symbol] = start.strftime("%Y-%m-%d")
+            tmp_path = f"{self._manifest_path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self._coverage, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self._manifest_path)
+
+
+# Global store instance (lazy initialization)
+_history_store = None
+_history_store_lock = threading.Lock()
+
+
+def get_history_store() -> HistoryStore:
+    """Get or create the process-wide history store."""
+    global _history_store
+    if _history_store is None:
+        with _history_store_lock:
+            if _history_store is None:
+                _history_store = HistoryStore()
+    return _history_store
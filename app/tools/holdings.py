@@ -0,0 +1,130 @@
+"""
+Portfolio holdings edits that keep the tax-lot ledger in step.
+
+The Portfolio page and the portfolio agent both change holdings through
+HoldingsBook: a purchase adds its tax lot, a sale (including removing a
+holding or lowering its share count) records the sale against the open lots
+under the chosen cost basis method. A purchase or sale without a price is
+refused rather than recorded at $0.
+
+Holdings saved without a cost (avg_price 0) have no tax lot, as their basis
+is unknown. Selling or removing those shares only updates portfolio_items;
+the ledger records the part of a sale that open lots cover.
+"""
+
+from datetime import date
+from typing import Optional
+
+from app.database import PortfolioItem
+from app.tools.tax_lots import TaxLotLedger, get_ledger
+
+# Share counts closer than this are equal (float dust)
+_EPSILON = 1e-9
+
+
+class HoldingsBook:
+    """portfolio_items plus the tax lots and sales behind them."""
+
+    def __init__(self, ledger: Optional[TaxLotLedger] = None):
+        self.ledger = ledger or get_ledger()
+
+    def buy(self, symbol: str, quantity: float, price: Optional[float], acquired_on: Optional[date] = None) -> float:
+        """Adds shares at `price` per share as a new lot; returns the shares now held."""
+        symbol = symbol.upper()
+        _require_price(symbol, price)
+        if quantity <= 0:
+            raise ValueError(f"Cannot buy {quantity:g} shares of {symbol}")
+
+        db = self.ledger.session_factory()
+        try:
+            item = db.query(PortfolioItem).filter(PortfolioItem.symbol == symbol).first()
+            if item:
+                cost = item.avg_price * item.quantity + price * quantity
+                item.quantity += quantity
+                item.avg_price = cost / item.quantity
+            else:
+                item = PortfolioItem(symbol=symbol, quantity=quantity, avg_price=price)
+                db.add(item)
+            db.commit()
+            held = item.quantity
+        finally:
+            db.close()
+
+        self.ledger.add_lot(symbol, quantity, price, acquired_on)
+        return held
+
+    def sell(
+        self,
+        symbol: str,
+        quantity: float,
+        price: Optional[float],
+        method: Optional[str] = None,
+        sold_on: Optional[date] = None,
+    ) -> float:
+        """
+        Sells shares at `price`, relieving lots in `method` order (TAX_LOT_METHOD
+        by default). Shares no open lot covers are sold without a ledger sale
+        (and need no price). Selling every share removes the holding. Returns
+        the shares left.
+        """
+        symbol = symbol.upper()
+
+        db = self.ledger.session_factory()
+        try:
+            item = db.query(PortfolioItem).filter(PortfolioItem.symbol == symbol).first()
+            held = item.quantity if item else 0.0
+            if quantity <= 0 or quantity > held + _EPSILON:
+                raise ValueError(f"Cannot sell {quantity:g} shares of {symbol}; {held:g} held")
+
+            covered = min(quantity, self.ledger.open_quantity(symbol))
+            if covered > _EPSILON:
+                _require_price(symbol, price)
+                self.ledger.record_sale(symbol, covered, price, sold_on, method=method)
+            if quantity - covered > _EPSILON:
+                print(f"Sold {quantity - covered:g} {symbol} shares without a tax lot (unknown cost basis)")
+            if held - quantity <= _EPSILON:
+                db.delete(item)
+                left = 0.0
+            else:
+                item.quantity = left = held - quantity
+            db.commit()
+            return left
+        finally:
+            db.close()
+
+    def set_quantity(
+        self,
+        symbol: str,
+        quantity: float,
+        price: Optional[float],
+        method: Optional[str] = None,
+    ) -> float:
+        """Buys or sells the difference to hold `quantity` shares; returns the shares held."""
+        symbol = symbol.upper()
+        db = self.ledger.session_factory()
+        try:
+            item = db.query(PortfolioItem).filter(PortfolioItem.symbol == symbol).first()
+            held = item.quantity if item else 0.0
+        finally:
+            db.close()
+
+        if quantity > held + _EPSILON:
+            return self.buy(symbol, quantity - held, price)
+        if quantity < held - _EPSILON:
+            return self.sell(symbol, held - quantity, price, method=method)
+        return held
+
+    def remove(self, symbol: str, price: Optional[float], method: Optional[str] = None) -> None:
+        """Sells every share of the holding."""
+        db = self.ledger.session_factory()
+        try:
+            item = db.query(PortfolioItem).filter(PortfolioItem.symbol == symbol.upper()).first()
+            held = item.quantity if item else 0.0
+        finally:
+            db.close()
+        self.sell(symbol, held, price, method=method)
+
+
+def _require_price(symbol: str, price: Optional[float]) -> None:
+    if price is None or price <= 0:
+        raise ValueError(f"No price for {symbol}; enter the price per share")
@@ -0,0 +1,178 @@
+"""
+Vectorized technical indicators over many symbols at once.
+
+Every function takes a [dates, symbols] float array (the layout of
+PriceMatrix) and works on all columns in one NumPy pass, so a watchlist or
+the whole sector set costs about the same as a single ticker.
+
+Columns may have NaN where a symbol has no bar. compute_indicators() first
+right-aligns each column on its own bars (NaNs moved to the top, order kept),
+so windows always cover a symbol's last N real bars, exactly like a per-ticker
+``series.dropna().rolling(N)``.
+
+Indicators in the result table:
+    price                         Last close
+    ma20, ma50                    Simple moving averages
+    ema12, ema26                  Exponential moving averages (span, adjust=False)
+    macd, macd_signal, macd_hist  MACD(12, 26, 9)
+    rsi14                         14-day RSI with Wilder smoothing
+    volatility20                  Std of the last 20 daily returns, in percent
+    bb_upper, bb_lower, bb_pct_b  Bollinger bands (20, 2) and %B
+    high_52w, low_52w             Range over the whole window (one year by default)
+    range_position                Last close within that range, in percent
+"""
+
+import warnings
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+INDICATOR_COLUMNS = [
+    "price",
+    "ma20",
+    "ma50",
+    "ema12",
+    "ema26",
+    "macd",
+    "macd_signal",
+    "macd_hist",
+    "rsi14",
+    "volatility20",
+    "bb_upper",
+    "bb_lower",
+    "bb_pct_b",
+    "high_52w",
+    "low_52w",
+    "range_position",
+]
+
+
+def right_align(values: np.ndarray) -> np.ndarray:
+    """
+    Moves each column's NaNs to the top while keeping the order of its values.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    order = np.argsort(~np.isnan(values), axis=0, kind="stable")
+    return np.take_along_axis(values, order, axis=0)
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Trailing mean over ``window`` rows; NaN until a full window of values exists.
+    """
+    out = np.full(values.shape, np.nan)
+    if len(values) >= window:
+        out[window - 1:] = sliding_window_view(values, window, axis=0).mean(axis=-1)
+    return out
+
+
+def rolling_std(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing sample standard deviation (ddof=1, like pandas)."""
+    out = np.full(values.shape, np.nan)
+    if len(values) >= window:
+        out[window - 1:] = sliding_window_view(values, window, axis=0).std(axis=-1, ddof=1)
+    return out
+
+
+def ema(values: np.ndarray, span: int) -> np.ndarray:
+    """
+    Exponential moving average with alpha = 2 / (span + 1), seeded with each
+    column's first value (pandas ewm(span, adjust=False)).
+    """
+    alpha = 2.0 / (span + 1)
+    out = np.empty(values.shape)
+    prev = np.full(values.shape[1:], np.nan)
+    # The recursion runs over dates; each step updates every symbol at once
+    for t in range(len(values)):
+        current = values[t]
+        prev = np.where(np.isnan(prev), current, alpha * current + (1 - alpha) * prev)
+        out[t] = prev
+    return out
+
+
+def pct_change(values: np.ndarray) -> np.ndarray:
+    out = np.full(values.shape, np.nan)
+    out[1:] = values[1:] / values[:-1] - 1
+    return out
+
+
+def rsi(values: np.ndarray, window: int = 14) -> np.ndarray:
+    """
+    RSI with Wilder smoothing: the first ``window`` changes are averaged, then
+    avg = (avg * (window - 1) + change) / window. The same definition as
+    streaming_indicators.WilderRSI, so both engines report the same value.
+    """
+    out = np.full(values.shape, np.nan)
+    avg_gain = np.zeros(values.shape[1:])
+    avg_loss = np.zeros(values.shape[1:])
+    count = np.zeros(values.shape[1:], dtype=np.int64)
+    # The recursion runs over dates; each step updates every symbol at once
+    for t in range(1, len(values)):
+        change = values[t] - values[t - 1]
+        valid = ~np.isnan(change)
+        count = count + valid
+        # Running mean while seeding, Wilder smoothing afterwards
+        weight = np.where(count <= window, 1.0 / np.maximum(count, 1), 1.0 / window)
+        avg_gain = np.where(valid, avg_gain + (np.maximum(change, 0.0) - avg_gain) * weight, avg_gain)
+        avg_loss = np.where(valid, avg_loss + (np.maximum(-change, 0.0) - avg_loss) * weight, avg_loss)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out[t] = np.where(count >= window, 100 - 100 / (1 + avg_gain / avg_loss), np.nan)
+    return out
+
+
+def compute_indicators(
+    close: np.ndarray,
+    symbols: List[str],
+    high: Optional[np.ndarray] = None,
+    low: Optional[np.ndarray] = None,
+) -> pd.DataFrame:
+    """
+    Computes the indicator table for every column of a [dates, symbols] close array.
+
+    high/low default to the closes. Returns one row per symbol (in order) with
+    INDICATOR_COLUMNS; values that need more bars than a symbol has are NaN.
+    """
+    index = pd.Index([s.upper() for s in symbols], name="symbol")
+    close = right_align(close)
+    if len(close) == 0:
+        return pd.DataFrame(np.nan, index=index, columns=INDICATOR_COLUMNS)
+
+    ema12 = ema(close, 12)
+    ema26 = ema(close, 26)
+    macd = ema12 - ema26
+    macd_signal = ema(macd, 9)
+    ma20 = rolling_mean(close, 20)[-1]
+    std20 = rolling_std(close, 20)[-1]
+    last = close[-1]
+
+    with warnings.catch_warnings():
+        # Symbols with no bars at all give all-NaN columns
+        warnings.simplefilter("ignore", RuntimeWarning)
+        high_52w = np.nanmax(close if high is None else high, axis=0)
+        low_52w = np.nanmin(close if low is None else low, axis=0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        bb_upper = ma20 + 2 * std20
+        bb_lower = ma20 - 2 * std20
+        table = {
+            "price": last,
+            "ma20": ma20,
+            "ma50": rolling_mean(close, 50)[-1],
+            "ema12": ema12[-1],
+            "ema26": ema26[-1],
+            "macd": macd[-1],
+            "macd_signal": macd_signal[-1],
+            "macd_hist": macd[-1] - macd_signal[-1],
+            "rsi14": rsi(close, 14)[-1],
+            "volatility20": rolling_std(pct_change(close), 20)[-1] * 100,
+            "bb_upper": bb_upper,
+            "bb_lower": bb_lower,
+            "bb_pct_b": (last - bb_lower) / (bb_upper - bb_lower),
+            "high_52w": high_52w,
+            "low_52w": low_52w,
+            "range_position": (last - low_52w) / (high_52w - low_52w) * 100,
+        }
+
+    return pd.DataFrame(table, index=index, columns=INDICATOR_COLUMNS)
@@ -0,0 +1,209 @@
+"""
+US equity market calendar.
+
+Knows the NYSE trading sessions: weekends, exchange holidays and the 13:00
+early closes. The market data layer uses it to decide how long data stays
+current. While the market is open, quotes expire after the normal cache TTL.
+Once the session has closed (plus a short settle period for the final prints),
+closing values cannot change until the next open, so they are cached until
+then and history is not re-downloaded.
+
+Configuration (environment variables):
+    MARKET_CLOSE_SETTLE_SECONDS    Seconds after the close before values are treated as final (default 1200)
+"""
+
+import os
+import threading
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from typing import Optional, Set, Tuple
+from zoneinfo import ZoneInfo
+
+MARKET_TIMEZONE = ZoneInfo("America/New_York")
+MARKET_OPEN = time(9, 30)
+MARKET_CLOSE = time(16, 0)
+EARLY_CLOSE = time(13, 0)
+
+
+def _easter(year: int) -> date:
+    """Gregorian Easter Sunday (anonymous Gregorian algorithm)."""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    weekday_shift = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * weekday_shift) // 451
+    month, day = divmod(h + weekday_shift - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    """n-th given weekday of a month (n=-1 for the last one)."""
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = date(year, month + 1, 1) - timedelta(days=1) if month < 12 else date(year, 12, 31)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _observed(day: date) -> date:
+    """Saturday holidays are observed on Friday, Sunday holidays on Monday."""
+    if day.weekday() == 5:
+        return day - timedelta(days=1)
+    if day.weekday() == 6:
+        return day + timedelta(days=1)
+    return day
+
+
+@lru_cache(maxsize=32)
+def nyse_holidays(year: int) -> Set[date]:
+    """
+    Full-day NYSE closures for a year.
+    """
+    holidays = {
+        _nth_weekday(year, 1, 0, 3),   # Martin Luther King Jr. Day
+        _nth_weekday(year, 2, 0, 3),   # Washington's Birthday
+        _easter(year) - timedelta(days=2),  # Good Friday
+        _nth_weekday(year, 5, 0, -1),  # Memorial Day
+        _observed(date(year, 7, 4)),   # Independence Day
+        _nth_weekday(year, 9, 0, 1),   # Labor Day
+        _nth_weekday(year, 11, 3, 4),  # Thanksgiving
+        _observed(date(year, 12, 25)),  # Christmas
+    }
+    # New Year's Day falling on a Saturday is not observed on the previous Friday
+    new_year = date(year, 1, 1)
+    if new_year.weekday() != 5:
+        holidays.add(_observed(new_year))
+    if year >= 2022:
+        holidays.add(_observed(date(year, 6, 19)))  # Juneteenth
+    return holidays
+
+
+@lru_cache(maxsize=32)
+def nyse_early_closes(year: int) -> Set[date]:
+    """
+    Days the NYSE closes at 13:00.
+    """
+    candidates = [
+        date(year, 7, 3),                                   # Day before Independence Day
+        _nth_weekday(year, 11, 3, 4) + timedelta(days=1),   # Day after Thanksgiving
+        date(year, 12, 24),                                 # Christmas Eve
+    ]
+    # July 3 and Christmas Eve on a Friday are the observed holiday instead (and weekends never trade)
+    return {day for day in candidates if day.weekday() < 4 or day.month == 11}
+
+
+class MarketCalendar:
+    """Trading sessions and data freshness for the US equity market."""
+
+    def __init__(self, settle_seconds: Optional[float] = None):
+        self.settle = timedelta(
+            seconds=settle_seconds
+            if settle_seconds is not None
+            else float(os.getenv("MARKET_CLOSE_SETTLE_SECONDS", "1200"))
+        )
+
+    # --- Sessions ---
+
+    def is_trading_day(self, day: date) -> bool:
+        return day.weekday() < 5 and day not in nyse_holidays(day.year)
+
+    def session(self, day: date) -> Optional[Tuple[datetime, datetime]]:
+        """
+        Returns the (open, close) datetimes in New York time, or None if the market is closed all day.
+        """
+        if not self.is_trading_day(day):
+            return None
+        close = EARLY_CLOSE if day in nyse_early_closes(day.year) else MARKET_CLOSE
+        return (
+            datetime.combine(day, MARKET_OPEN, MARKET_TIMEZONE),
+            datetime.combine(day, close, MARKET_TIMEZONE),
+        )
+
+    def is_open(self, now: Optional[datetime] = None) -> bool:
+        """True during a regular trading session."""
+        now = self._now(now)
+        session = self.session(now.date())
+        return session is not None and session[0] <= now < session[1]
+
+    def next_open(self, now: Optional[datetime] = None) -> datetime:
+        """The next session open strictly after now."""
+        now = self._now(now)
+        day = now.date()
+        while True:
+            session = self.session(day)
+            if session is not None and session[0] > now:
+                return session[0]
+            day += timedelta(days=1)
+
+    def last_close(self, now: Optional[datetime] = None) -> datetime:
+        """The most recent session close at or before now."""
+        now = self._now(now)
+        day = now.date()
+        while True:
+            session = self.session(day)
+            if session is not None and session[1] <= now:
+                return session[1]
+            day -= timedelta(days=1)
+
+    # --- Freshness ---
+
+    def is_settled(self, now: Optional[datetime] = None) -> bool:
+        """
+        True once the market has closed and the closing values are final.
+        """
+        now = self._now(now)
+        return not self.is_open(now) and now >= self.last_close(now) + self.settle
+
+    def quote_ttl(self, default_ttl: float, now: Optional[datetime] = None) -> float:
+        """
+        How long a quote fetched now stays current: default_ttl during the
+        session, otherwise until the next open.
+        """
+        now = self._now(now)
+        if not self.is_settled(now):
+            return default_ttl
+        return max(default_ttl, (self.next_open(now) - now).total_seconds())
+
+    def is_current(self, fetched_at: datetime, now: Optional[datetime] = None) -> bool:
+        """
+        True if data fetched at fetched_at cannot have changed since, because
+        it was fetched after the last close settled and the market has not
+        opened again.
+        """
+        now = self._now(now)
+        return self.is_settled(now) and self._now(fetched_at) >= self.last_close(now) + self.settle
+
+    def status(self, now: Optional[datetime] = None) -> str:
+        """Short human-readable market state for reports and pages."""
+        now = self._now(now)
+        if self.is_open(now):
+            return "Market open"
+        close = self.last_close(now)
+        return f"Market closed, prices as of the {close.strftime('%Y-%m-%d')} close"
+
+    def _now(self, now: Optional[datetime]) -> datetime:
+        if now is None:
+            return datetime.now(MARKET_TIMEZONE)
+        if now.tzinfo is None:
+            # Naive datetimes are local time, like datetime.fromtimestamp()
+            now = now.astimezone()
+        return now.astimezone(MARKET_TIMEZONE)
+
+
+# Global calendar instance (lazy initialization)
+_market_calendar = None
+_market_calendar_lock = threading.Lock()
+
+
+def get_market_calendar() -> MarketCalendar:
+    """Get or create the process-wide market calendar."""
+    global _market_calendar
+    if _market_calendar is None:
+        with _market_calendar_lock:
+            if _market_calendar is None:
+                _market_calendar = MarketCalendar()
+    return _market_calendar
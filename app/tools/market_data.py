@@ -1,34 +1,385 @@
-import yfinance as yf
-from typing import Dict, Any, Optional
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.tools.company_info import CompanyInfoCache, get_company_info_cache
+from app.tools.history_store import HistoryStore, get_history_store
+from app.tools.indicators import compute_indicators
+from app.tools.market_calendar import MarketCalendar, get_market_calendar
+from app.tools.market_snapshot import current_snapshot
+from app.tools.news_cache import NewsCache, get_news_cache
+from app.tools.portfolio_risk import RiskMatrices, compute_risk_matrices, get_risk_matrix_cache
+from app.tools.price_matrix import MatrixSnapshot, get_price_matrix
+from app.tools.providers import MarketDataProvider, get_provider, period_start, split_download
+from app.tools.quote_cache import QuoteCache, get_quote_cache
+from app.tools.sector_rotation import compute_sector_rotation
+from app.tools.singleflight import SingleFlight, get_single_flight
+from app.tools.streaming_indicators import get_indicator_state_store
+
+# Major market indices and sector ETFs shown on the Market page and by the market agent
+MARKET_INDICES = {
+    "S&P 500": "^GSPC",
+    "Dow Jones": "^DJI",
+    "NASDAQ": "^IXIC",
+    "Russell 2000": "^RUT",
+    "VIX": "^VIX"
+}
+
+SECTOR_ETFS = {
+    "Technology": "XLK",
+    "Healthcare": "XLV",
+    "Financials": "XLF",
+    "Energy": "XLE",
+    "Consumer Discretionary": "XLY",
+    "Consumer Staples": "XLP",
+    "Industrials": "XLI",
+    "Materials": "XLB",
+    "Utilities": "XLU",
+    "Real Estate": "XLRE",
+    "Communication Services": "XLC"
+}
+
+# Tickers whose news feeds cover the broad market, and representative
+# constituents whose feeds stand in for a sector ETF's news
+NEWS_TICKERS = ["SPY", "QQQ", "DIA", "AAPL", "MSFT", "GOOGL", "AMZN", "NVDA"]
+
+SECTOR_CONSTITUENTS = {
+    "XLK": ["AAPL", "MSFT", "NVDA", "AVGO", "ORCL", "AMD"],
+    "XLV": ["JNJ", "UNH", "PFE", "LLY", "MRK", "ABBV"],
+    "XLF": ["JPM", "BAC", "GS", "WFC", "MS", "BRK-B"],
+    "XLE": ["XOM", "CVX", "COP", "SLB", "EOG", "OXY"],
+    "XLY": ["AMZN", "TSLA", "HD", "MCD", "NKE", "SBUX"],
+    "XLI": ["CAT", "BA", "HON", "GE", "UNP", "RTX"],
+    "XLRE": ["PLD", "AMT", "SPG", "EQIX", "O", "CCI"]
+}
+
+# Symbols the app tracks
+KNOWN_SYMBOLS = frozenset(
+    list(MARKET_INDICES.values())
+    + list(SECTOR_ETFS.values())
+    + NEWS_TICKERS
+    + [symbol for constituents in SECTOR_CONSTITUENTS.values() for symbol in constituents]
+    + ["GOOG", "META", "TSLA", "NFLX"]
+)
+
+# Known symbols a chat query may name in lower case. One- and two-letter
+# tickers ("o", "ms") and everyday words ("cat", "cop") only count in capitals or with a $
+_WORD_TICKERS = {"AMT", "CAT", "COP", "HON"}
+LOWERCASE_SYMBOLS = frozenset(s for s in KNOWN_SYMBOLS if len(s) > 2 and s not in _WORD_TICKERS)
+
+
+def _is_quote(data: Optional[Dict[str, Any]]) -> bool:
+    """Whether a quote lookup succeeded (failed ones are None or carry an "error")."""
+    return data is not None and "error" not in data
+
 
 class MarketDataTool:
+    def __init__(
+        self,
+        cache: Optional[QuoteCache] = None,
+        flights: Optional[SingleFlight] = None,
+        history_store: Optional[HistoryStore] = None,
+        provider: Optional[MarketDataProvider] = None,
+        company_info: Optional[CompanyInfoCache] = None,
+        calendar: Optional[MarketCalendar] = None,
+        news_cache: Optional[NewsCache] = None,
+    ):
+        # Quotes, history and in-flight requests are shared across agents, pages and sessions
+        self.cache = cache or get_quote_cache()
+        self.flights = flights or get_single_flight()
+        self.history_store = history_store or get_history_store()
+        self._provider = provider
+        self._company_info = company_info
+        self.calendar = calendar or get_market_calendar()
+        self._news_cache = news_cache
+
+    @property
+    def provider(self) -> MarketDataProvider:
+        """
+        The market data backend (yfinance unless MARKET_DATA_PROVIDER says otherwise).
+        """
+        return self._provider or get_provider()
+
+    @property
+    def company_info(self) -> CompanyInfoCache:
+        """
+        Persistent company profile cache (created on first use, since it opens the database).
+        """
+        return self._company_info or get_company_info_cache()
+
+    @property
+    def news_cache(self) -> NewsCache:
+        """
+        Persistent per-ticker news cache (created on first use, since it opens the database).
+        """
+        return self._news_cache or get_news_cache()
+
+    def quote_ttl(self) -> float:
+        """
+        Seconds a quote fetched now stays fresh. After the close has settled,
+        quotes cannot change until the next open, so they are kept until then.
+        """
+        return self.calendar.quote_ttl(self.cache.ttl)
+
     def get_stock_price(self, symbol: str) -> Optional[Dict[str, Any]]:
         """
         Fetches real-time stock price and basic info for a given symbol.
         """
+        snapshot = current_snapshot()
+        if snapshot is None:
+            return self._get_stock_price(symbol)
+        # A failed lookup is retried rather than repeated from the snapshot
+        return snapshot.get(("quote", symbol.upper()), lambda: self._get_stock_price(symbol), reuse=_is_quote)
+
+    def _get_stock_price(self, symbol: str) -> Optional[Dict[str, Any]]:
+        key = ("quote", symbol.upper())
+        data = self.cache.get_or_fetch(
+            key, lambda: self.flights.do(key, lambda: self._fetch_stock_price(symbol)), ttl=self.quote_ttl()
+        )
+        return data if data is not None else self._last_known(symbol)
+
+    def get_stock_prices(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetches prices for many symbols with one batched download.
+
+        Returns a dict keyed by upper-cased symbol. Successful entries have the
+        same shape as get_stock_price(); failed ones are
+        {"symbol": ..., "error": "..."} so one bad ticker never hides the rest.
+        Cached symbols are served locally; only the misses are downloaded.
+        """
+        unique = list(dict.fromkeys(s.upper() for s in symbols if s))
+        if not unique:
+            return {}
+
+        snapshot = current_snapshot()
+        if snapshot is None:
+            return self._get_stock_prices(unique)
+        # Symbols already looked up in this request are answered from the snapshot; failed ones are retried
+        found = snapshot.get_many(
+            [("quote", s) for s in unique],
+            lambda keys: {("quote", s): data for s, data in self._get_stock_prices([s for _, s in keys]).items()},
+            reuse=_is_quote,
+        )
+        return {symbol: data for (_, symbol), data in found.items()}
+
+    def _get_stock_prices(self, unique: List[str]) -> Dict[str, Dict[str, Any]]:
+        def download(keys):
+            fetched = self._download_quotes([symbol for _, symbol in keys])
+            return {("quote", symbol): data for symbol, data in fetched.items()}
+
+        def fetch_many(keys):
+            # Symbols another session is already downloading are awaited, not refetched
+            return self.flights.do_many(keys, download)
+
+        cached = self.cache.get_many_or_fetch([("quote", s) for s in unique], fetch_many, ttl=self.quote_ttl())
+        results = {}
+        for (_, symbol), data in cached.items():
+            if data is None or "error" in data:
+                data = self._last_known(symbol) or data
+            results[symbol] = data
+        return results
+
+    def refresh_stock_prices(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Downloads fresh prices for symbols regardless of cache state and stores them.
+
+        Used by the background pre-warmer. Failed symbols keep whatever the
+        cache already holds.
+        """
+        unique = list(dict.fromkeys(s.upper() for s in symbols if s))
+        if not unique:
+            return {}
+
+        def download(keys):
+            fetched = self._download_quotes([symbol for _, symbol in keys])
+            return {("quote", symbol): data for symbol, data in fetched.items()}
+
+        fetched = self.flights.do_many([("quote", s) for s in unique], download)
+        ttl = self.quote_ttl()
+        results = {}
+        for (_, symbol), data in fetched.items():
+            if data and "error" not in data:
+                self.cache.set(("quote", symbol), data, ttl)
+            results[symbol] = data
+        return results
+
+    def get_history(self, symbol: str, period: str = "1mo") -> pd.DataFrame:
+        """
+        Returns daily OHLCV history for a symbol from the local history store.
+
+        Only bars newer than the last stored date are downloaded.
+        """
+        snapshot = current_snapshot()
+        if snapshot is None:
+            return self.history_store.get_history(symbol, period)
+        return snapshot.get(("history", symbol.upper(), period), lambda: self.history_store.get_history(symbol, period))
+
+    def get_histories(self, symbols: List[str], period: str = "1mo") -> Dict[str, pd.DataFrame]:
+        """
+        Returns daily OHLCV history for many symbols, keyed by upper-cased symbol.
+        """
+        snapshot = current_snapshot()
+        if snapshot is None:
+            return self.history_store.get_histories(symbols, period)
+        unique = list(dict.fromkeys(s.upper() for s in symbols if s))
+        found = snapshot.get_many(
+            [("history", s, period) for s in unique],
+            lambda keys: {
+                ("history", s, period): bars
+                for s, bars in self.history_store.get_histories([s for _, s, _ in keys], period).items()
+            },
+            reuse=lambda bars: bars is not None,
+        )
+        return {symbol: bars for (_, symbol, _), bars in found.items() if bars is not None}
+
+    def get_price_matrix(self, symbols: List[str], period: str = "1y") -> MatrixSnapshot:
+        """
+        Returns the shared date x symbol close/volume matrix, rebuilt from the
+        history store if it does not cover these symbols and period yet.
+        """
+        return get_price_matrix().ensure(symbols, period)
+
+    def get_indicators(self, symbols: List[str], period: str = "1y") -> pd.DataFrame:
+        """
+        Returns one row of technical indicators per symbol (see app.tools.indicators),
+        computed in one vectorized pass over the price matrix.
+        """
+        wanted = list(dict.fromkeys(s.upper() for s in symbols if s))
+        if not wanted:
+            return compute_indicators(np.empty((0, 0)), [])
+
+        matrix = self.get_price_matrix(wanted, period)
+        start = period_start(period).isoformat()
+        return compute_indicators(
+            matrix.matrix("close", wanted, start=start),
+            wanted,
+            high=matrix.matrix("high", wanted, start=start),
+            low=matrix.matrix("low", wanted, start=start),
+        )
+
+    def get_live_indicators(self, symbols: List[str], period: str = "1y") -> pd.DataFrame:
+        """
+        Returns indicators from the persisted incremental state (see
+        app.tools.streaming_indicators): only bars added since the last call
+        are applied, instead of recomputing every window. Used for the
+        fixed sector universe the Market page refreshes on every load.
+        """
+        wanted = list(dict.fromkeys(s.upper() for s in symbols if s))
+        matrix = self.get_price_matrix(wanted, period)
+        return get_indicator_state_store().sync(matrix, wanted).table().reindex(wanted)
+
+    def get_sector_rotation(self, symbols: List[str], benchmark: str = "SPY") -> pd.DataFrame:
+        """
+        Returns 1-week, 1-month, 3-month and YTD returns, relative strength vs
+        the benchmark, ranks and rotation quadrant per symbol (see
+        app.tools.sector_rotation). All symbols come from one price matrix load.
+        """
+        wanted = list(dict.fromkeys(s.upper() for s in symbols if s))
+        benchmark = benchmark.upper()
+        # A year of bars covers every horizon, including YTD
+        matrix = self.get_price_matrix(wanted + [benchmark], period="1y")
+        return compute_sector_rotation(
+            matrix.matrix("close", wanted),
+            matrix.dates,
+            wanted,
+            matrix.column(benchmark),
+        )
+
+    def get_risk_matrices(self, symbols: List[str], benchmark: str = "SPY", period: str = "1y") -> RiskMatrices:
+        """
+        Returns correlation, covariance, volatility and beta vs the benchmark
+        from daily returns (see app.tools.portfolio_risk).
+
+        Results are cached until the symbol set changes or the price matrix is
+        rebuilt with newer bars.
+        """
+        wanted = sorted(dict.fromkeys(s.upper() for s in symbols if s))
+        benchmark = benchmark.upper()
+        matrix = self.get_price_matrix(wanted + [benchmark], period)
+        start = period_start(period).isoformat()
+        key = (tuple(wanted), benchmark, period, matrix.built_at)
+        return get_risk_matrix_cache().get_or_compute(
+            key,
+            lambda: compute_risk_matrices(
+                matrix.matrix("close", wanted, start=start),
+                wanted,
+                matrix.column(benchmark, start=start),
+                benchmark_symbol=benchmark,
+            ),
+        )
+
+    def get_news(self, symbol: str) -> List[Dict[str, Any]]:
+        """
+        Fetches raw yfinance news items for a symbol.
+
+        Items are served from the persistent news cache while fresh; concurrent
+        misses for the same symbol share one call. Errors are raised so callers
+        can decide how to report them.
+        """
+        return self.news_cache.get_news(symbol)
+
+    def _last_known(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """
+        Last cached quote for a symbol, however old, marked as stale.
+
+        Served when a live fetch fails, times out or is rejected by the circuit breaker.
+        """
+        data = self.cache.peek(("quote", symbol.upper()))
+        if data is None or "error" in data:
+            return None
+        return {**data, "stale": True}
+
+    def _fetch_stock_price(self, symbol: str) -> Optional[Dict[str, Any]]:
         try:
-            ticker = yf.Ticker(symbol)
-            # fast_info is suitable for realtime prices
-            info = ticker.fast_info
-            
+            quote = self.provider.get_quote(symbol)
+            last_price = quote["last_price"]
+            previous_close = quote["previous_close"]
+
             # Create a simplified dictionary
             data = {
                 "symbol": symbol.upper(),
-                "last_price": info.last_price,
-                "previous_close": info.previous_close,
-                "change_percent": ((info.last_price - info.previous_close) / info.previous_close) * 100
+                "last_price": last_price,
+                "previous_close": previous_close,
+                "change_percent": ((last_price - previous_close) / previous_close) * 100
             }
             return data
         except Exception as e:
             print(f"Error fetching data for {symbol}: {e}")
             return None
 
+    def _download_quotes(self, unique: List[str]) -> Dict[str, Dict[str, Any]]:
+        try:
+            frame = self.provider.download(unique, period="5d")
+        except Exception as e:
+            print(f"Error fetching batch data for {', '.join(unique)}: {e}")
+            return {symbol: {"symbol": symbol, "error": str(e)} for symbol in unique}
+
+        if frame is None or frame.empty:
+            return {symbol: {"symbol": symbol, "error": "No data returned"} for symbol in unique}
+
+        results = {}
+        for symbol, bars in split_download(frame, unique).items():
+            closes = bars["Close"]
+            if len(closes) < 2:
+                results[symbol] = {"symbol": symbol, "error": "Not enough price history"}
+                continue
+
+            last_price = float(closes.iloc[-1])
+            previous_close = float(closes.iloc[-2])
+            results[symbol] = {
+                "symbol": symbol,
+                "last_price": last_price,
+                "previous_close": previous_close,
+                "change_percent": ((last_price - previous_close) / previous_close) * 100
+            }
+        return results
+
     def get_company_info(self, symbol: str) -> str:
         """
-        Fetches company summary.
+        Fetches company summary from the persistent profile cache.
         """
         try:
-            ticker = yf.Ticker(symbol)
-            return ticker.info.get("longBusinessSummary", "No summary available.")
+            return self.company_info.get_summary(symbol)
         except Exception as e:
             return f"Error fetching info: {e}"
@@ -0,0 +1,107 @@
+"""
+Per-request market snapshot.
+
+One chat turn can ask several agents and methods for the same data: the
+market overview and the sector report, the trends report re-reading ^VIX, or
+the orchestrator running the portfolio and market agents side by side.
+Inside a ``market_snapshot()`` block, MarketDataTool answers every quote and
+history lookup it has already made from the snapshot, so each symbol is
+fetched at most once per turn and every agent sees the same values.
+
+The active snapshot is a context variable, so it follows LangGraph nodes,
+asyncio tasks and asyncio.to_thread. Nested blocks reuse the outer snapshot.
+"""
+
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional
+
+_current_snapshot: contextvars.ContextVar = contextvars.ContextVar("market_snapshot", default=None)
+
+
+class MarketSnapshot:
+    """Thread-safe memo of the market data already looked up in one request."""
+
+    def __init__(self, max_age: Optional[float] = None):
+        self.max_age = max_age
+        self.created_at = time.monotonic()
+        self._values: Dict[Hashable, Any] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.fetches = 0
+
+    def get(self, key: Hashable, fetch: Callable[[], Any], reuse: Callable[[Any], bool] = lambda v: True) -> Any:
+        """
+        Returns the value recorded for key, or calls fetch() once and records it.
+
+        Values for which reuse(value) is False are fetched again.
+        """
+        with self._lock:
+            if key in self._values and reuse(self._values[key]):
+                self.hits += 1
+                return self._values[key]
+        value = fetch()
+        with self._lock:
+            self.fetches += 1
+            self._values[key] = value
+        return value
+
+    def get_many(
+        self,
+        keys: List[Hashable],
+        fetch_many: Callable[[List[Hashable]], Dict[Hashable, Any]],
+        reuse: Callable[[Any], bool] = lambda v: True,
+    ) -> Dict[Hashable, Any]:
+        """
+        Resolves many keys; all keys not yet recorded go to one fetch_many() call.
+
+        Recorded values for which reuse(value) is False are fetched again.
+        """
+        with self._lock:
+            known = {k: self._values[k] for k in keys if k in self._values and reuse(self._values[k])}
+            self.hits += len(known)
+        missing = [k for k in keys if k not in known]
+        if missing:
+            fetched = fetch_many(missing)
+            with self._lock:
+                self.fetches += 1
+                for key in missing:
+                    self._values[key] = fetched.get(key)
+            known.update({k: fetched.get(k) for k in missing})
+        return {k: known[k] for k in keys}
+
+    def peek(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            return self._values.get(key)
+
+    def expired(self) -> bool:
+        return self.max_age is not None and time.monotonic() - self.created_at > self.max_age
+
+
+def current_snapshot() -> Optional[MarketSnapshot]:
+    """The snapshot of the enclosing market_snapshot() block, if any."""
+    snapshot = _current_snapshot.get()
+    return None if snapshot is None or snapshot.expired() else snapshot
+
+
+@contextmanager
+def market_snapshot(max_age: Optional[float] = None) -> Iterator[MarketSnapshot]:
+    """
+    Shares one MarketSnapshot across every market data lookup in the block.
+
+    An enclosing block's snapshot is reused. max_age bounds how long a snapshot
+    serves values, for long-running blocks.
+    """
+    snapshot = current_snapshot()
+    if snapshot is not None:
+        yield snapshot
+        return
+
+    snapshot = MarketSnapshot(max_age=max_age)
+    token = _current_snapshot.set(snapshot)
+    try:
+        yield snapshot
+    finally:
+        _current_snapshot.reset(token)
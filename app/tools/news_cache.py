@@ -0,0 +1,107 @@
+"""
+Persistent per-ticker news cache.
+
+Headlines for a ticker are the same for every user for a few minutes, so the
+raw provider news items are stored in the news_feeds table with the time they
+were fetched and served from there until they are older than the TTL. The
+table lives in the app database, so a restart does not start cold. If a
+refresh fails, the stored items are served anyway.
+
+Configuration (environment variables):
+    NEWS_CACHE_TTL    Seconds before a ticker's stored news is refetched (default 300)
+"""
+
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from app.database import Base, NewsFeed, SessionLocal, engine
+from app.tools.providers import MarketDataProvider, get_provider
+from app.tools.singleflight import SingleFlight, get_single_flight
+
+
+class NewsCache:
+    """Raw news items per ticker, persisted in the app database with a short TTL."""
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable] = None,
+        ttl: Optional[float] = None,
+        flights: Optional[SingleFlight] = None,
+        provider: Optional[MarketDataProvider] = None,
+    ):
+        self.session_factory = session_factory or SessionLocal
+        self.ttl = ttl if ttl is not None else float(os.getenv("NEWS_CACHE_TTL", "300"))
+        self.flights = flights or get_single_flight()
+        self._provider = provider
+        if session_factory is None:
+            Base.metadata.create_all(bind=engine, tables=[NewsFeed.__table__])
+
+    @property
+    def provider(self) -> MarketDataProvider:
+        return self._provider or get_provider()
+
+    def get_news(self, symbol: str) -> List[Dict[str, Any]]:
+        """
+        Returns news items for a symbol, fetching them only if the stored copy is missing or expired.
+
+        Errors are raised only when nothing is stored for the symbol.
+        """
+        symbol = symbol.upper()
+        stored = self._load(symbol)
+        if stored is not None and not self._expired(stored):
+            return json.loads(stored.items_json)
+
+        try:
+            # Concurrent requests for the same symbol share one call
+            return self.flights.do(("news", symbol), lambda: self._fetch_and_store(symbol))
+        except Exception as e:
+            if stored is None:
+                raise
+            print(f"Error refreshing news for {symbol}, serving stored items: {e}")
+            return json.loads(stored.items_json)
+
+    # --- Internals ---
+
+    def _expired(self, row: NewsFeed) -> bool:
+        return row.fetched_at is None or datetime.utcnow() - row.fetched_at > timedelta(seconds=self.ttl)
+
+    def _load(self, symbol: str) -> Optional[NewsFeed]:
+        db = self.session_factory()
+        try:
+            return db.get(NewsFeed, symbol)
+        finally:
+            db.close()
+
+    def _fetch_and_store(self, symbol: str) -> List[Dict[str, Any]]:
+        # An empty list is stored too: a ticker without news is not asked again until the TTL passes
+        items = list(self.provider.get_news(symbol) or [])
+
+        db = self.session_factory()
+        try:
+            db.merge(NewsFeed(
+                symbol=symbol,
+                items_json=json.dumps(items, default=str),
+                fetched_at=datetime.utcnow(),
+            ))
+            db.commit()
+        finally:
+            db.close()
+        return items
+
+
+# Global cache instance (lazy initialization)
+_news_cache = None
+_news_cache_lock = threading.Lock()
+
+
+def get_news_cache() -> NewsCache:
+    """Get or create the process-wide news cache."""
+    global _news_cache
+    if _news_cache is None:
+        with _news_cache_lock:
+            if _news_cache is None:
+                _news_cache = NewsCache()
+    return _news_cache
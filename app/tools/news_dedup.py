@@ -0,0 +1,110 @@
+"""
+Near-duplicate headline detection.
+
+Syndicated stories reach several tickers' feeds with slightly different titles
+("Apple beats estimates as iPhone sales jump" vs "Apple Beats Estimates As
+iPhone Sales Jump - Reuters"). Exact title comparison keeps all of them.
+
+Each title is normalized (lower case, punctuation dropped) and turned into
+a shingle set of its words and adjacent word pairs. Word pairs keep titles
+that differ in their subject ("Tesla recalls ..." vs "Ford recalls ...")
+apart better than character shingles do. A MinHash signature of NUM_PERM values
+estimates the Jaccard similarity of two shingle sets by the fraction of equal
+values. Signatures are split into bands for locality-sensitive hashing:
+only titles that share a whole band with an earlier title are compared, so
+checking a title costs a few dict lookups rather than a pass over every
+title seen so far.
+"""
+
+import hashlib
+import re
+from typing import Any, Callable, Dict, List, Optional, Set
+
+import numpy as np
+
+NUM_PERM = 128
+BANDS = 32
+DEFAULT_THRESHOLD = 0.75
+
+# Universal hashing (a * x + b) mod p over 32-bit shingle hashes; a, b < 2**31
+# keep every intermediate below 2**64
+_PRIME = np.uint64(4294967311)
+_rng = np.random.default_rng(20240101)
+_A = _rng.integers(1, 2**31, size=NUM_PERM, dtype=np.uint64)
+_B = _rng.integers(0, 2**31, size=NUM_PERM, dtype=np.uint64)
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize(text: str) -> str:
+    return _WHITESPACE.sub(" ", _PUNCTUATION.sub(" ", text.lower())).strip()
+
+
+def shingles(text: str) -> Set[str]:
+    """Words and adjacent word pairs of the normalized text."""
+    words = normalize(text).split()
+    return set(words) | {f"{a} {b}" for a, b in zip(words, words[1:])}
+
+
+def minhash(text: str) -> np.ndarray:
+    """MinHash signature (NUM_PERM uint64 values) of a text's shingles."""
+    hashes = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(s.encode(), digest_size=4).digest(), "little") for s in shingles(text)),
+        dtype=np.uint64,
+    )
+    if hashes.size == 0:
+        return np.full(NUM_PERM, np.iinfo(np.uint64).max, dtype=np.uint64)
+    # All permutations of all shingles in one [NUM_PERM, n_shingles] pass
+    return ((_A[:, None] * hashes[None, :] + _B[:, None]) % _PRIME).min(axis=1)
+
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    return float(np.mean(a == b))
+
+
+class NearDuplicateDetector:
+    """Remembers signatures of seen texts and flags new ones that are near duplicates."""
+
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD, bands: int = BANDS):
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = NUM_PERM // bands
+        self._buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(bands)]
+        self._signatures: List[np.ndarray] = []
+
+    def add(self, text: str) -> Optional[int]:
+        """
+        Records a text. Returns the index of the earlier text it duplicates,
+        or None if it is new (in which case it joins the index).
+        """
+        signature = minhash(text)
+        keys = [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+        candidates = set()
+        for band, key in enumerate(keys):
+            candidates.update(self._buckets[band].get(key, ()))
+        for index in sorted(candidates):
+            if similarity(signature, self._signatures[index]) >= self.threshold:
+                return index
+
+        index = len(self._signatures)
+        self._signatures.append(signature)
+        for band, key in enumerate(keys):
+            self._buckets[band].setdefault(key, []).append(index)
+        return None
+
+
+def dedupe(
+    items: List[Any],
+    key: Callable[[Any], str] = lambda item: item["title"],
+    threshold: float = DEFAULT_THRESHOLD,
+) -> List[Any]:
+    """
+    Drops items whose key text is a near duplicate of an earlier item's.
+
+    Order is kept, so sort first (e.g. most recent first) to choose which copy survives.
+    """
+    detector = NearDuplicateDetector(threshold=threshold)
+    return [item for item in items if detector.add(key(item)) is None]
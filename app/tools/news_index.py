@@ -0,0 +1,359 @@
+"""
+Full-text news index and background ingestor.
+
+A daemon thread polls news for the tracked tickers (the broad-market news
+tickers, the sector constituents and the portfolio holdings) and stores each
+story once in the news_items table of the app database, normalized to
+title / publisher / link / published time plus the tickers it was seen under.
+An FTS5 virtual table over the titles and tickers, kept in sync by triggers,
+lets topical questions ("news about chip export rules") be answered with one
+indexed query instead of a fan-out of network calls.
+
+Configuration (environment variables):
+    NEWS_INGEST_ENABLED     Set to "false" to disable the ingestor (default true)
+    NEWS_INGEST_INTERVAL    Seconds between polls (default 600)
+    NEWS_INDEX_RETENTION    Seconds stories are kept in the index (default 1209600, two weeks)
+"""
+
+import hashlib
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from app.database import engine as app_engine
+from app.tools.market_data import NEWS_TICKERS, SECTOR_CONSTITUENTS, MarketDataTool
+from app.tools.news_dedup import normalize
+from app.tools.rate_limiter import Priority, request_priority
+
+_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS news_items (
+        id INTEGER PRIMARY KEY,
+        uid TEXT UNIQUE NOT NULL,
+        title TEXT NOT NULL,
+        publisher TEXT,
+        link TEXT,
+        published_at REAL,
+        symbols TEXT NOT NULL DEFAULT '',
+        ingested_at REAL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_news_items_published_at ON news_items (published_at)",
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS news_fts USING fts5(
+        title, symbols, content='news_items', content_rowid='id', tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS news_items_ai AFTER INSERT ON news_items BEGIN
+        INSERT INTO news_fts(rowid, title, symbols) VALUES (new.id, new.title, new.symbols);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS news_items_ad AFTER DELETE ON news_items BEGIN
+        INSERT INTO news_fts(news_fts, rowid, title, symbols) VALUES ('delete', old.id, old.title, old.symbols);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS news_items_au AFTER UPDATE ON news_items BEGIN
+        INSERT INTO news_fts(news_fts, rowid, title, symbols) VALUES ('delete', old.id, old.title, old.symbols);
+        INSERT INTO news_fts(rowid, title, symbols) VALUES (new.id, new.title, new.symbols);
+    END
+    """,
+]
+
+# Words that say "I want news" rather than what the news is about
+_STOPWORDS = {
+    "a", "an", "the", "and", "or", "of", "on", "in", "for", "to", "with", "about", "regarding",
+    "around", "any", "anything", "is", "are", "was", "were", "be", "been", "what", "whats", "what's",
+    "how", "why", "who", "when", "where", "which", "there", "me", "my", "i", "we", "us", "you",
+    "show", "give", "tell", "get", "find", "search", "look", "up", "please", "can", "could",
+    "would", "do", "does", "did", "have", "has", "new", "news", "latest", "recent", "recently",
+    "today", "todays", "today's", "headline", "headlines", "story", "stories", "article",
+    "articles", "update", "updates", "happening", "going", "some", "this", "that", "week",
+    "market", "markets", "stock", "stocks", "financial", "finance", "economy",
+}
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9\-]*")
+
+
+def extract_news_fields(item: Dict) -> Dict:
+    """
+    Extracts title, publisher, link and timestamp from a provider news item,
+    handling both old and new yfinance formats.
+    """
+    # Try new format first (yfinance >= 0.2.40)
+    if 'content' in item:
+        content = item.get('content', {})
+        title = content.get('title', 'No title')
+        provider = content.get('provider', {})
+        publisher = provider.get('displayName', 'Unknown')
+        link = content.get('canonicalUrl', {}).get('url', '')
+        pub_date_str = content.get('pubDate', '')
+
+        # Parse ISO date string
+        if pub_date_str:
+            try:
+                pub_date = datetime.fromisoformat(pub_date_str.replace('Z', '+00:00'))
+                timestamp = pub_date.timestamp()
+            except Exception:
+                timestamp = 0
+        else:
+            timestamp = 0
+
+        return {
+            'title': title,
+            'publisher': publisher,
+            'link': link,
+            'timestamp': timestamp
+        }
+
+    # Fall back to old format
+    return {
+        'title': item.get('title', 'No title'),
+        'publisher': item.get('publisher', 'Unknown'),
+        'link': item.get('link', ''),
+        'timestamp': item.get('providerPublishTime', 0)
+    }
+
+
+def topic_terms(query: str) -> List[str]:
+    """The words of a query that describe a topic (news boilerplate removed)."""
+    return [t for t in _TOKEN.findall(query.lower()) if t not in _STOPWORDS and len(t) > 1]
+
+
+class NewsIndex:
+    """Normalized news stories in the app database with an FTS5 index over titles and tickers."""
+
+    def __init__(self, engine: Optional[Engine] = None, retention: Optional[float] = None):
+        self.engine = engine or app_engine
+        self.retention = (
+            retention
+            if retention is not None
+            else float(os.getenv("NEWS_INDEX_RETENTION", str(14 * 24 * 3600)))
+        )
+        with self.engine.begin() as conn:
+            for statement in _SCHEMA:
+                conn.execute(text(statement))
+
+    def add(self, symbol: str, items: List[Dict[str, Any]]) -> int:
+        """
+        Stores provider news items seen under a symbol. A story already stored
+        (same link, or same normalized title) only gains the symbol.
+        Returns the number of new stories.
+        """
+        symbol = symbol.upper()
+        added = 0
+        now = time.time()
+        with self.engine.begin() as conn:
+            for item in items:
+                fields = extract_news_fields(item)
+                title = fields['title']
+                if not title or title == 'No title':
+                    continue
+                uid = hashlib.sha1((fields['link'] or normalize(title)).encode()).hexdigest()
+
+                row = conn.execute(text("SELECT symbols FROM news_items WHERE uid = :uid"), {"uid": uid}).first()
+                if row is None:
+                    conn.execute(
+                        text(
+                            "INSERT INTO news_items (uid, title, publisher, link, published_at, symbols, ingested_at) "
+                            "VALUES (:uid, :title, :publisher, :link, :published_at, :symbols, :ingested_at)"
+                        ),
+                        {
+                            "uid": uid,
+                            "title": title,
+                            "publisher": fields['publisher'],
+                            "link": fields['link'],
+                            "published_at": fields['timestamp'] or now,
+                            "symbols": symbol,
+                            "ingested_at": now,
+                        },
+                    )
+                    added += 1
+                elif symbol not in row[0].split():
+                    conn.execute(
+                        text("UPDATE news_items SET symbols = :symbols WHERE uid = :uid"),
+                        {"uid": uid, "symbols": f"{row[0]} {symbol}".strip()},
+                    )
+        return added
+
+    def search(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Full-text search over stored stories, best matches first (BM25, then newest).
+
+        Every topic word is optional, so stories matching more of them rank higher.
+        Returns dicts shaped like extract_news_fields() plus "symbols".
+        """
+        terms = topic_terms(query)
+        if not terms:
+            return []
+        # Quoted terms keep FTS5 query syntax characters in user text inert
+        match = " OR ".join(f'"{term}"' for term in terms)
+        with self.engine.connect() as conn:
+            rows = conn.execute(
+                text(
+                    "SELECT n.title, n.publisher, n.link, n.published_at, n.symbols "
+                    "FROM news_fts JOIN news_items n ON n.id = news_fts.rowid "
+                    "WHERE news_fts MATCH :match "
+                    "ORDER BY bm25(news_fts), n.published_at DESC LIMIT :limit"
+                ),
+                {"match": match, "limit": limit},
+            ).fetchall()
+        return [
+            {
+                "title": title,
+                "publisher": publisher,
+                "link": link,
+                "timestamp": published_at,
+                "symbols": symbols.split(),
+            }
+            for title, publisher, link, published_at, symbols in rows
+        ]
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """Deletes stories published before the retention window. Returns how many."""
+        cutoff = (now if now is not None else time.time()) - self.retention
+        with self.engine.begin() as conn:
+            return conn.execute(text("DELETE FROM news_items WHERE published_at < :cutoff"), {"cutoff": cutoff}).rowcount
+
+    def count(self) -> int:
+        with self.engine.connect() as conn:
+            return conn.execute(text("SELECT COUNT(*) FROM news_items")).scalar()
+
+
+def tracked_news_symbols() -> List[str]:
+    """Broad-market news tickers, sector constituents and portfolio holdings."""
+    from app.tools.prewarmer import portfolio_symbols
+
+    symbols = list(NEWS_TICKERS)
+    for constituents in SECTOR_CONSTITUENTS.values():
+        symbols.extend(constituents)
+    symbols.extend(portfolio_symbols())
+    return list(dict.fromkeys(s.upper() for s in symbols))
+
+
+class NewsIngestor:
+    """Polls news for the tracked tickers into the NewsIndex from a daemon thread."""
+
+    def __init__(
+        self,
+        index: Optional[NewsIndex] = None,
+        market_tool: Optional[MarketDataTool] = None,
+        interval: Optional[float] = None,
+        symbols: Callable[[], List[str]] = tracked_news_symbols,
+        max_workers: int = 8,
+    ):
+        self._index = index
+        self.market_tool = market_tool or MarketDataTool()
+        self.interval = (
+            interval
+            if interval is not None
+            else float(os.getenv("NEWS_INGEST_INTERVAL", "600"))
+        )
+        self.symbols = symbols
+        self.max_workers = max_workers
+        self.runs = 0
+        self.last_run: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def index(self) -> NewsIndex:
+        return self._index or get_news_index()
+
+    def ingest(self) -> int:
+        """
+        Polls every tracked symbol once and stores new stories. Returns how many were new.
+        """
+        symbols = self.symbols()
+
+        def fetch(symbol):
+            try:
+                # Runs in a worker thread, so the priority has to be set here
+                with request_priority(Priority.BACKGROUND):
+                    return symbol, self.market_tool.get_news(symbol)
+            except Exception as e:
+                print(f"Error ingesting news for {symbol}: {e}")
+                return symbol, []
+
+        added = 0
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            for symbol, items in pool.map(fetch, symbols):
+                if items:
+                    added += self.index.add(symbol, items)
+        self.index.prune()
+        self.runs += 1
+        self.last_run = time.time()
+        return added
+
+    def start(self) -> None:
+        """Starts the background thread (no-op if it is already running)."""
+        with self._lock:
+            if self.is_running():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="news-ingestor", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.ingest()
+            except Exception as e:
+                print(f"Error ingesting news: {e}")
+            self._stop.wait(self.interval)
+
+
+# Global index and ingestor instances (lazy initialization)
+_news_index = None
+_news_ingestor = None
+_news_index_lock = threading.Lock()
+
+
+def get_news_index() -> NewsIndex:
+    """Get or create the process-wide news index."""
+    global _news_index
+    if _news_index is None:
+        with _news_index_lock:
+            if _news_index is None:
+                _news_index = NewsIndex()
+    return _news_index
+
+
+def get_news_ingestor() -> NewsIngestor:
+    """Get or create the process-wide news ingestor."""
+    global _news_ingestor
+    if _news_ingestor is None:
+        with _news_index_lock:
+            if _news_ingestor is None:
+                _news_ingestor = NewsIngestor()
+    return _news_ingestor
+
+
+def start_news_ingestor() -> Optional[NewsIngestor]:
+    """
+    Starts the process-wide news ingestor unless NEWS_INGEST_ENABLED is false.
+
+    Safe to call on every Streamlit rerun; the thread is only started once.
+    """
+    if os.getenv("NEWS_INGEST_ENABLED", "true").lower() in ("false", "0", "no"):
+        return None
+    ingestor = get_news_ingestor()
+    ingestor.start()
+    return ingestor
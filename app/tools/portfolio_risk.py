@@ -0,0 +1,175 @@
+"""
+Correlation, covariance and beta for portfolio holdings.
+
+Daily returns come from the price matrix (backed by the local history store),
+so no extra downloads are made. All statistics are computed in one pass of
+matrix algebra over the [days, symbols] return array: one covariance matrix,
+from which correlation, volatility and beta against the benchmark follow.
+
+Only days on which every holding and the benchmark traded are used, which
+keeps the covariance matrix consistent (positive semi-definite). The closes
+are reduced to those common days before returns are taken, so a day that
+only other matrix symbols traded (a weekend crypto bar, a foreign holiday)
+does not cost the holdings the following day's return.
+
+A holding with fewer than MIN_OBSERVATIONS + 1 bars (an unknown or delisted
+ticker, a recent IPO) would shrink those common days to nothing, so it is
+left out of the matrices and listed in RiskMatrices.excluded instead.
+
+The matrices depend only on which symbols are held and on the price data, so
+RiskMatrixCache keeps them until the set of symbols changes or the price
+matrix is rebuilt with new bars. Position weights are applied per call.
+"""
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Hashable, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.tools.indicators import pct_change
+
+TRADING_DAYS = 252
+
+# Daily returns needed for meaningful statistics (about a trading month)
+MIN_OBSERVATIONS = 20
+
+
+@dataclass
+class RiskMatrices:
+    """Annualized risk statistics for a set of symbols."""
+
+    symbols: List[str]
+    benchmark: str
+    correlation: pd.DataFrame
+    covariance: pd.DataFrame   # annualized
+    beta: pd.Series
+    volatility: pd.Series      # annualized, in percent
+    observations: int
+    excluded: List[str] = field(default_factory=list)  # holdings without enough history
+
+    def portfolio(self, weights: Dict[str, float]) -> Dict[str, float]:
+        """
+        Portfolio beta, volatility (percent), diversification ratio and average
+        pairwise correlation for position weights (normalized to sum to one).
+        """
+        w = pd.Series(weights, dtype=np.float64).reindex(self.symbols).fillna(0.0).to_numpy()
+        total = w.sum()
+        w = w / total if total > 0 else w
+
+        cov = self.covariance.to_numpy()
+        variance = float(w @ cov @ w)
+        volatility = np.sqrt(variance) * 100 if variance >= 0 else np.nan
+        weighted_volatility = float(w @ self.volatility.to_numpy())
+
+        corr = self.correlation.to_numpy()
+        off_diagonal = corr[~np.eye(len(corr), dtype=bool)]
+        return {
+            "beta": float(w @ self.beta.to_numpy()),
+            "volatility": volatility,
+            "weighted_volatility": weighted_volatility,
+            # Weighted average volatility over portfolio volatility; 1.0 means no diversification benefit
+            "diversification_ratio": weighted_volatility / volatility if volatility else np.nan,
+            "average_correlation": float(off_diagonal.mean()) if off_diagonal.size else np.nan,
+        }
+
+    def most_correlated(self, n: int = 3) -> List[Tuple[str, str, float]]:
+        """The n most correlated pairs of distinct symbols, highest first."""
+        corr = self.correlation.to_numpy()
+        i, j = np.triu_indices(len(corr), k=1)
+        values = corr[i, j]
+        order = np.argsort(-np.nan_to_num(values, nan=-np.inf))[:n]
+        return [(self.symbols[i[k]], self.symbols[j[k]], float(values[k])) for k in order]
+
+
+def compute_risk_matrices(
+    close: np.ndarray,
+    symbols: List[str],
+    benchmark: np.ndarray,
+    benchmark_symbol: str = "SPY",
+    min_bars: int = MIN_OBSERVATIONS + 1,
+) -> RiskMatrices:
+    """
+    Builds the risk matrices from a [dates, symbols] close array and the
+    benchmark's closes on the same dates. Symbols with fewer than
+    `min_bars` closes are excluded.
+    """
+    close = np.asarray(close, dtype=np.float64).reshape(len(benchmark), len(symbols))
+    enough = np.isfinite(close).sum(axis=0) >= min_bars
+    excluded = [s.upper() for s, ok in zip(symbols, enough) if not ok]
+    symbols = [s.upper() for s, ok in zip(symbols, enough) if ok]
+    closes = np.column_stack([close[:, enough], np.asarray(benchmark, dtype=np.float64)])
+    # Returns between consecutive common trading days
+    closes = closes[np.isfinite(closes).all(axis=1)]
+    returns = pct_change(closes)[1:]
+    n = len(returns)
+
+    if n < 2:
+        cov = np.full((len(symbols) + 1, len(symbols) + 1), np.nan)
+    else:
+        demeaned = returns - returns.mean(axis=0)
+        cov = demeaned.T @ demeaned / (n - 1)
+
+    std = np.sqrt(np.diag(cov))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        corr = cov / np.outer(std, std)
+        beta = cov[:-1, -1] / cov[-1, -1]
+
+    return RiskMatrices(
+        symbols=symbols,
+        benchmark=benchmark_symbol.upper(),
+        correlation=pd.DataFrame(corr[:-1, :-1], index=symbols, columns=symbols),
+        covariance=pd.DataFrame(cov[:-1, :-1] * TRADING_DAYS, index=symbols, columns=symbols),
+        beta=pd.Series(beta, index=symbols),
+        volatility=pd.Series(std[:-1] * np.sqrt(TRADING_DAYS) * 100, index=symbols),
+        observations=n,
+        excluded=excluded,
+    )
+
+
+class RiskMatrixCache:
+    """Bounded LRU of RiskMatrices keyed by symbol set, benchmark, period and price data version."""
+
+    def __init__(self, max_size: int = 32):
+        self.max_size = max_size
+        self._entries: "OrderedDict[Hashable, RiskMatrices]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, key: Hashable, compute) -> RiskMatrices:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        value = compute()
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# Global cache instance (lazy initialization)
+_risk_matrix_cache = None
+_risk_matrix_cache_lock = threading.Lock()
+
+
+def get_risk_matrix_cache() -> RiskMatrixCache:
+    """Get or create the process-wide risk matrix cache."""
+    global _risk_matrix_cache
+    if _risk_matrix_cache is None:
+        with _risk_matrix_cache_lock:
+            if _risk_matrix_cache is None:
+                _risk_matrix_cache = RiskMatrixCache()
+    return _risk_matrix_cache
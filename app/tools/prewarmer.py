@@ -0,0 +1,148 @@
+"""
+Background quote pre-warmer.
+
+The Market page, the market agent and the portfolio views keep asking for the
+same symbols: the major indices, the sector ETFs and whatever the user holds.
+A daemon thread refreshes that working set in one batched download on a fixed
+interval while the market is open, so user-facing requests are served from
+the quote cache instead of waiting on the network.
+
+Configuration (environment variables):
+    QUOTE_PREWARM_ENABLED     Set to "false" to disable the pre-warmer (default true)
+    QUOTE_PREWARM_INTERVAL    Seconds between refreshes (default 30)
+"""
+
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Callable, List, Optional
+
+from app.tools.market_calendar import get_market_calendar
+from app.tools.market_data import MARKET_INDICES, SECTOR_ETFS, MarketDataTool
+from app.tools.rate_limiter import Priority, request_priority
+
+
+def is_market_open(now: Optional[datetime] = None) -> bool:
+    """
+    True during a regular NYSE session (holidays and early closes included).
+    """
+    return get_market_calendar().is_open(now)
+
+
+def portfolio_symbols() -> List[str]:
+    """
+    Returns the distinct symbols currently held in the portfolio.
+    """
+    from app.database import PortfolioItem, SessionLocal
+
+    db = SessionLocal()
+    try:
+        return [row[0] for row in db.query(PortfolioItem.symbol).distinct() if row[0]]
+    except Exception as e:
+        print(f"Error loading portfolio symbols for pre-warming: {e}")
+        return []
+    finally:
+        db.close()
+
+
+def default_working_set() -> List[str]:
+    """Indices, sector ETFs and held symbols."""
+    symbols = list(MARKET_INDICES.values()) + list(SECTOR_ETFS.values()) + portfolio_symbols()
+    return list(dict.fromkeys(s.upper() for s in symbols))
+
+
+class QuotePrewarmer:
+    """Refreshes a working set of quotes on an interval from a daemon thread."""
+
+    def __init__(
+        self,
+        market_tool: Optional[MarketDataTool] = None,
+        interval: Optional[float] = None,
+        working_set: Callable[[], List[str]] = default_working_set,
+        market_open: Callable[[], bool] = is_market_open,
+    ):
+        self.market_tool = market_tool or MarketDataTool()
+        self.interval = (
+            interval
+            if interval is not None
+            else float(os.getenv("QUOTE_PREWARM_INTERVAL", "30"))
+        )
+        self.working_set = working_set
+        self.market_open = market_open
+        self.runs = 0
+        self.last_run: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def warm(self) -> int:
+        """
+        Refreshes the working set once. Returns the number of symbols refreshed.
+        """
+        symbols = self.working_set()
+        if not symbols:
+            return 0
+        # Chat turns and page loads get ahead of the pre-warmer when requests are throttled
+        with request_priority(Priority.BACKGROUND):
+            results = self.market_tool.refresh_stock_prices(symbols)
+        self.runs += 1
+        self.last_run = time.time()
+        return sum(1 for data in results.values() if data and "error" not in data)
+
+    def start(self) -> None:
+        """Starts the background thread (no-op if it is already running)."""
+        with self._lock:
+            if self.is_running():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="quote-prewarmer", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _loop(self) -> None:
+        # Always warm once on startup so the first page load after a restart is fast
+        first = True
+        while not self._stop.is_set():
+            if first or self.market_open():
+                try:
+                    self.warm()
+                except Exception as e:
+                    print(f"Error pre-warming quotes: {e}")
+            first = False
+            self._stop.wait(self.interval)
+
+
+# Global pre-warmer instance (lazy initialization)
+_prewarmer = None
+_prewarmer_lock = threading.Lock()
+
+
+def get_prewarmer() -> QuotePrewarmer:
+    """Get or create the process-wide quote pre-warmer."""
+    global _prewarmer
+    if _prewarmer is None:
+        with _prewarmer_lock:
+            if _prewarmer is None:
+                _prewarmer = QuotePrewarmer()
+    return _prewarmer
+
+
+def start_prewarmer() -> Optional[QuotePrewarmer]:
+    """
+    Starts the process-wide pre-warmer unless QUOTE_PREWARM_ENABLED is false.
+
+    Safe to call on every Streamlit rerun; the thread is only started once.
+    """
+    if os.getenv("QUOTE_PREWARM_ENABLED", "true").lower() in ("false", "0", "no"):
+        return None
+    prewarmer = get_prewarmer()
+    prewarmer.start()
+    return prewarmer
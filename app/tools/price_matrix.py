@@ -0,0 +1,343 @@
+"""
+Memory-mapped date x symbol price matrix.
+
+Cross-sectional analytics (sector comparisons, screens, correlations) want
+every symbol's closes on one shared calendar. PriceMatrix builds dense close,
+volume, high and low matrices from the local history store and writes them as .npy
+files. The files are then opened with mmap_mode="r", so reading a date range
+or a symbol's column is a slice of the mapped file rather than a per-ticker
+DataFrame load.
+
+Each build is published as an immutable MatrixSnapshot (arrays, symbols and
+dates that belong together). ensure() returns the snapshot, so a caller that
+reads several slices never sees half of a concurrent rebuild. A rebuild
+downloads outside the lock and runs at most once at a time.
+
+The universe is bounded: symbols that are not valid tickers or have no
+history are left out (and not retried until the refresh interval passes),
+and beyond PRICE_MATRIX_MAX_SYMBOLS the least recently requested symbols are
+dropped at the next rebuild.
+
+Layout under the matrix directory:
+    close.npy     float64 [n_dates, n_symbols], NaN where a symbol has no bar
+    volume.npy    float64 [n_dates, n_symbols]
+    high.npy      float64 [n_dates, n_symbols]
+    low.npy       float64 [n_dates, n_symbols]
+    index.json    {"symbols": [...], "dates": ["YYYY-MM-DD", ...], "period": ..., "built_at": ...}
+
+Configuration (environment variables):
+    PRICE_MATRIX_DIR            Directory for the matrix files (default ./data/history/matrix)
+    PRICE_MATRIX_MAX_SYMBOLS    Most symbols kept in the matrix (default 256)
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.tools.history_store import HistoryStore, get_history_store
+from app.tools.providers import period_start
+from app.tools.singleflight import SingleFlight
+
+FIELDS = {"close": "Close", "volume": "Volume", "high": "High", "low": "Low"}
+
+# Tickers, index symbols (^VIX), share classes (BRK-B), crypto and FX pairs
+_SYMBOL = re.compile(r"^\^?[A-Z0-9][A-Z0-9.\-=]{0,14}$")
+
+
+class MatrixSnapshot:
+    """One build of the matrix. Never changes after it is published."""
+
+    def __init__(
+        self,
+        arrays: Dict[str, np.ndarray],
+        symbols: List[str],
+        dates: pd.DatetimeIndex,
+        period: Optional[str] = None,
+        built_at: float = 0.0,
+    ):
+        self._arrays = arrays
+        self.symbols = list(symbols)
+        self.dates = dates
+        self.period = period
+        self.built_at = built_at
+        self._columns = {symbol: j for j, symbol in enumerate(self.symbols)}
+
+    def matrix(
+        self,
+        field: str = "close",
+        symbols: Optional[List[str]] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+    ) -> np.ndarray:
+        """
+        Returns a [dates, symbols] array for the date range.
+
+        With symbols=None the result is a view into the mapped file. Selecting
+        specific symbols gathers their columns into a new array (in order);
+        symbols the matrix does not hold are all-NaN columns.
+        """
+        rows = self._row_slice(start, end)
+        if not self._arrays:
+            return np.full((0, len(self.symbols) if symbols is None else len(symbols)), np.nan)
+        array = self._arrays[field][rows]
+        if symbols is None:
+            return array
+        out = np.full((array.shape[0], len(symbols)), np.nan)
+        present = [(k, self._columns[s.upper()]) for k, s in enumerate(symbols) if s.upper() in self._columns]
+        if present:
+            targets, columns = zip(*present)
+            out[:, list(targets)] = array[:, list(columns)]
+        return out
+
+    def column(self, symbol: str, field: str = "close", start: Optional[str] = None, end: Optional[str] = None) -> np.ndarray:
+        """Returns one symbol's series as a strided view into the mapped file (all NaN if not held)."""
+        rows = self._row_slice(start, end)
+        if symbol.upper() not in self._columns:
+            return np.full(len(self.dates[rows]), np.nan)
+        return self._arrays[field][rows, self._columns[symbol.upper()]]
+
+    def frame(
+        self,
+        field: str = "close",
+        symbols: Optional[List[str]] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+    ) -> pd.DataFrame:
+        """Labelled DataFrame over matrix(); dates as index, symbols as columns."""
+        rows = self._row_slice(start, end)
+        columns = [s.upper() for s in symbols] if symbols is not None else self.symbols
+        return pd.DataFrame(self.matrix(field, symbols, start, end), index=self.dates[rows], columns=columns, copy=False)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol.upper() in self._columns
+
+    def _row_slice(self, start: Optional[str], end: Optional[str]) -> slice:
+        # Dates are sorted, so a range is a contiguous block of rows
+        lo = self.dates.searchsorted(pd.Timestamp(start), side="left") if start else 0
+        hi = self.dates.searchsorted(pd.Timestamp(end), side="right") if end else len(self.dates)
+        return slice(lo, hi)
+
+
+class PriceMatrix:
+    """Dense close/volume/high/low matrices for a symbol universe, backed by memory-mapped files."""
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        history_store: Optional[HistoryStore] = None,
+        refresh_seconds: Optional[float] = None,
+        max_symbols: Optional[int] = None,
+    ):
+        self.directory = directory or os.getenv("PRICE_MATRIX_DIR", "./data/history/matrix")
+        self._history_store = history_store
+        self.refresh_seconds = (
+            refresh_seconds
+            if refresh_seconds is not None
+            else float(os.getenv("HISTORY_REFRESH_SECONDS", "900"))
+        )
+        self.max_symbols = max_symbols or int(os.getenv("PRICE_MATRIX_MAX_SYMBOLS", "256"))
+        self._lock = threading.RLock()
+        self._snapshot = MatrixSnapshot({}, [], pd.DatetimeIndex([]))
+        self._flights = SingleFlight()
+        self._last_used: Dict[str, float] = {}
+        self._rejected: Dict[str, float] = {}
+        os.makedirs(self.directory, exist_ok=True)
+        self._index_path = os.path.join(self.directory, "index.json")
+        self.load()
+
+    @property
+    def history_store(self) -> HistoryStore:
+        return self._history_store or get_history_store()
+
+    def snapshot(self) -> MatrixSnapshot:
+        """The matrix as of the last build (a rebuild swaps in a new snapshot, so readers never wait)."""
+        return self._snapshot
+
+    @property
+    def symbols(self) -> List[str]:
+        return self.snapshot().symbols
+
+    @property
+    def dates(self) -> pd.DatetimeIndex:
+        return self.snapshot().dates
+
+    @property
+    def period(self) -> Optional[str]:
+        return self.snapshot().period
+
+    @property
+    def built_at(self) -> float:
+        return self.snapshot().built_at
+
+    # --- Building ---
+
+    def ensure(self, symbols: List[str], period: str = "1y") -> MatrixSnapshot:
+        """
+        Rebuilds the matrix if it is missing a symbol, does not reach back to
+        the period start, or is older than the refresh interval, and returns
+        the current snapshot. Invalid symbols and symbols that recently had no
+        history are ignored.
+
+        Only one rebuild runs at a time, and its downloads happen outside the
+        lock. A caller whose symbols are all present gets the current snapshot
+        while a refresh is in flight; a caller missing symbols waits for it.
+        """
+        while True:
+            now = time.time()
+            with self._lock:
+                wanted = [
+                    s for s in dict.fromkeys(s.upper() for s in symbols if s)
+                    if _SYMBOL.match(s) and now - self._rejected.get(s, float("-inf")) > self.refresh_seconds
+                ]
+                snapshot = self._snapshot
+                self._last_used.update((s, now) for s in wanted)
+                missing = [s for s in wanted if s not in snapshot]
+                too_short = snapshot.dates.empty or snapshot.dates[0] > pd.Timestamp(period_start(period)) + pd.Timedelta(days=7)
+                expired = now - snapshot.built_at > self.refresh_seconds
+                if not (missing or too_short or expired):
+                    return snapshot
+                if not (missing or too_short) and self._flights.in_flight():
+                    return snapshot
+                # Keep the longest period already tracked, so one caller never
+                # shrinks the matrix for another
+                build_period = period
+                if snapshot.period and period_start(snapshot.period) < period_start(period):
+                    build_period = snapshot.period
+                universe = self._universe(wanted, snapshot)
+
+            ran = []
+
+            def rebuild():
+                ran.append(True)
+                self.build(universe, build_period)
+
+            self._flights.do("build", rebuild)
+            if ran:
+                return self._snapshot
+            # Waited on another caller's build; check whether it covered these symbols
+
+    def _universe(self, wanted: List[str], snapshot: MatrixSnapshot) -> List[str]:
+        """
+        The wanted symbols plus the most recently used others, up to
+        max_symbols. Kept symbols stay in their current column order.
+        """
+        others = [s for s in snapshot.symbols if s not in wanted]
+        others.sort(key=lambda s: self._last_used.get(s, snapshot.built_at), reverse=True)
+        keep = set(wanted) | set(others[:max(self.max_symbols - len(wanted), 0)])
+        return [s for s in snapshot.symbols if s in keep] + [s for s in wanted if s not in snapshot]
+
+    def build(self, symbols: List[str], period: str = "1y") -> None:
+        """
+        Loads history for every symbol (one batched store update) and rewrites
+        the matrix files. Only the file writes and the snapshot swap hold the lock.
+        """
+        requested = list(dict.fromkeys(s.upper() for s in symbols if s))
+        histories = self.history_store.get_histories(requested, period)
+
+        # Symbols without any bars (unknown tickers) are left out
+        unique = [s for s in requested if histories.get(s) is not None and not histories[s].empty]
+        rejected_at = time.time()
+
+        dates = pd.DatetimeIndex([])
+        for bars in histories.values():
+            dates = dates.union(pd.DatetimeIndex(bars.index))
+
+        with self._lock:
+            for field, column in FIELDS.items():
+                path = self._array_path(field)
+                tmp_path = f"{path}.tmp.npy"
+                out = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float64, shape=(len(dates), len(unique)))
+                out[:] = np.nan
+                for j, symbol in enumerate(unique):
+                    bars = histories.get(symbol)
+                    if bars is not None and not bars.empty and column in bars.columns:
+                        out[:, j] = bars[column].reindex(dates).to_numpy(dtype=np.float64)
+                out.flush()
+                del out
+                os.replace(tmp_path, path)
+
+            index = {
+                "symbols": unique,
+                "dates": [d.strftime("%Y-%m-%d") for d in dates],
+                "period": period,
+                "built_at": time.time(),
+            }
+            tmp_path = f"{self._index_path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(index, f)
+            os.replace(tmp_path, self._index_path)
+            self._rejected.update((s, rejected_at) for s in requested if s not in unique)
+            self.load()
+
+    def load(self) -> bool:
+        """
+        Maps the matrix files written by the last build. Returns False if there are none.
+        """
+        with self._lock:
+            try:
+                with open(self._index_path) as f:
+                    index = json.load(f)
+                arrays = {field: np.load(self._array_path(field), mmap_mode="r") for field in FIELDS}
+            except (OSError, ValueError):
+                return False
+
+            self._snapshot = MatrixSnapshot(
+                arrays,
+                index["symbols"],
+                pd.DatetimeIndex(pd.to_datetime(index["dates"])),
+                period=index.get("period"),
+                built_at=index.get("built_at", 0.0),
+            )
+            return True
+
+    # --- Access (on the current snapshot) ---
+
+    def matrix(
+        self,
+        field: str = "close",
+        symbols: Optional[List[str]] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+    ) -> np.ndarray:
+        return self.snapshot().matrix(field, symbols, start, end)
+
+    def column(self, symbol: str, field: str = "close", start: Optional[str] = None, end: Optional[str] = None) -> np.ndarray:
+        return self.snapshot().column(symbol, field, start, end)
+
+    def frame(
+        self,
+        field: str = "close",
+        symbols: Optional[List[str]] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+    ) -> pd.DataFrame:
+        return self.snapshot().frame(field, symbols, start, end)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self.snapshot()
+
+    # --- Internals ---
+
+    def _array_path(self, field: str) -> str:
+        return os.path.join(self.directory, f"{field}.npy")
+
+
+# Global matrix instance (lazy initialization)
+_price_matrix = None
+_price_matrix_lock = threading.Lock()
+
+
+def get_price_matrix() -> PriceMatrix:
+    """Get or create the process-wide price matrix."""
+    global _price_matrix
+    if _price_matrix is None:
+        with _price_matrix_lock:
+            if _price_matrix is None:
+                _price_matrix = PriceMatrix()
+    return _price_matrix
@@ -0,0 +1,312 @@
+"""
+Market data providers.
+
+Every network call for quotes, daily bars, news and company info goes through
+a MarketDataProvider. Two backends are available:
+
+- YFinanceProvider: live Yahoo Finance data (the default).
+- ReplayProvider: serves the same endpoints from local fixture files. In record
+  mode it proxies to another provider and saves each response as a fixture,
+  so a live session can be captured once and replayed offline for
+  deterministic benchmarks and CI runs.
+
+Configuration (environment variables):
+    MARKET_DATA_PROVIDER       "yfinance" (default), "replay" or "record"
+    MARKET_DATA_FIXTURES_DIR   Fixture directory for replay/record (default ./data/fixtures/market)
+"""
+
+import json
+import os
+import re
+import threading
+from abc import ABC, abstractmethod
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+from urllib.parse import quote
+
+import pandas as pd
+import yfinance as yf
+
+OHLCV_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+_PERIOD_PATTERN = re.compile(r"^(\d+)(d|wk|mo|y)$")
+
+
+def period_start(period: str, today: Optional[date] = None) -> date:
+    """
+    Converts a yfinance-style period ("5d", "1mo", "3mo", "1y", "ytd") to a start date.
+    """
+    today = today or date.today()
+    if period == "ytd":
+        return date(today.year, 1, 1)
+    if period == "max":
+        return date(1970, 1, 1)
+
+    match = _PERIOD_PATTERN.match(period)
+    if not match:
+        raise ValueError(f"Unsupported period: {period}")
+
+    count, unit = int(match.group(1)), match.group(2)
+    days = {"d": 1, "wk": 7, "mo": 31, "y": 366}[unit] * count
+    return today - timedelta(days=days)
+
+
+def split_download(frame: Optional[pd.DataFrame], symbols: List[str]) -> Dict[str, pd.DataFrame]:
+    """
+    Splits a yf.download(..., group_by="ticker") frame into one frame per symbol.
+
+    Rows with no close are dropped and the index is normalized to tz-naive dates.
+    Symbols missing from the frame map to an empty frame.
+    """
+    result = {}
+    for symbol in symbols:
+        if frame is None or frame.empty:
+            bars = pd.DataFrame(columns=OHLCV_COLUMNS)
+        elif isinstance(frame.columns, pd.MultiIndex):
+            if symbol in frame.columns.get_level_values(0):
+                bars = frame[symbol]
+            else:
+                bars = pd.DataFrame(columns=OHLCV_COLUMNS)
+        else:
+            # Flat columns only happen for single-ticker downloads
+            bars = frame if len(symbols) == 1 else pd.DataFrame(columns=OHLCV_COLUMNS)
+
+        bars = bars.reindex(columns=OHLCV_COLUMNS).dropna(subset=["Close"])
+        index = pd.DatetimeIndex(bars.index)
+        if index.tz is not None:
+            index = index.tz_localize(None)
+        bars.index = index.normalize()
+        result[symbol] = bars.astype(float)
+    return result
+
+
+class FixtureNotFoundError(LookupError):
+    """Raised by ReplayProvider when no fixture exists for a request."""
+
+
+class MarketDataProvider(ABC):
+    """Interface for everything the app fetches from a market data source."""
+
+    name = "base"
+
+    @abstractmethod
+    def get_quote(self, symbol: str) -> Dict[str, float]:
+        """
+        Returns {"last_price": ..., "previous_close": ...} for one symbol.
+        """
+
+    @abstractmethod
+    def download(
+        self,
+        symbols: List[str],
+        period: Optional[str] = None,
+        start: Optional[str] = None,
+    ) -> pd.DataFrame:
+        """
+        Returns daily OHLCV bars shaped like yf.download(..., group_by="ticker").
+        """
+
+    @abstractmethod
+    def get_news(self, symbol: str) -> List[Dict[str, Any]]:
+        """
+        Returns raw news items for a symbol.
+        """
+
+    @abstractmethod
+    def get_info(self, symbol: str) -> Dict[str, Any]:
+        """
+        Returns the company profile dict for a symbol.
+        """
+
+
+class YFinanceProvider(MarketDataProvider):
+    """Live Yahoo Finance backend."""
+
+    name = "yfinance"
+
+    def get_quote(self, symbol: str) -> Dict[str, float]:
+        # fast_info is suitable for realtime prices
+        info = yf.Ticker(symbol).fast_info
+        return {"last_price": info.last_price, "previous_close": info.previous_close}
+
+    def download(
+        self,
+        symbols: List[str],
+        period: Optional[str] = None,
+        start: Optional[str] = None,
+    ) -> pd.DataFrame:
+        kwargs = {"start": start} if start else {"period": period or "1mo"}
+        return yf.download(
+            symbols,
+            interval="1d",
+            group_by="ticker",
+            auto_adjust=False,
+            progress=False,
+            threads=True,
+            **kwargs,
+        )
+
+    def get_news(self, symbol: str) -> List[Dict[str, Any]]:
+        return yf.Ticker(symbol).news or []
+
+    def get_info(self, symbol: str) -> Dict[str, Any]:
+        return yf.Ticker(symbol).info or {}
+
+
+class ReplayProvider(MarketDataProvider):
+    """
+    Serves quotes, bars, news and info from fixture files.
+
+    Layout under the fixture directory:
+        quotes/<SYMBOL>.json    {"last_price": ..., "previous_close": ...}
+        history/<SYMBOL>.csv    Date index plus OHLCV columns
+        news/<SYMBOL>.json      List of raw news items
+        info/<SYMBOL>.json      Company profile dict
+
+    With record=True every request is forwarded to the upstream provider and
+    the response is written to the matching fixture file before returning.
+    Replayed periods ("5d", "1mo") end at each fixture's last recorded bar
+    rather than today, so a fixture replays the same bars whenever it is used.
+    """
+
+    name = "replay"
+
+    def __init__(self, fixtures_dir: str, record: bool = False, upstream: Optional[MarketDataProvider] = None):
+        self.fixtures_dir = fixtures_dir
+        self.record = record
+        self.upstream = upstream or (YFinanceProvider() if record else None)
+        self._write_lock = threading.Lock()
+
+    # --- Endpoints ---
+
+    def get_quote(self, symbol: str) -> Dict[str, float]:
+        if self.record:
+            data = self.upstream.get_quote(symbol)
+            self._write_json("quotes", symbol, data)
+            return data
+        return self._read_json("quotes", symbol)
+
+    def download(
+        self,
+        symbols: List[str],
+        period: Optional[str] = None,
+        start: Optional[str] = None,
+    ) -> pd.DataFrame:
+        if self.record:
+            frame = self.upstream.download(symbols, period=period, start=start)
+            self._record_bars(frame, symbols)
+            return frame
+
+        frames = {}
+        for symbol in symbols:
+            path = self._path("history", symbol, "csv")
+            if not os.path.exists(path):
+                continue
+            bars = pd.read_csv(path, index_col=0, parse_dates=True)
+            if start:
+                begin = pd.Timestamp(start)
+            else:
+                # A period counts back from the last recorded bar, so old fixtures replay the same
+                last = bars.index.max() if len(bars) else pd.Timestamp.today()
+                begin = pd.Timestamp(period_start(period or "1mo", today=last.date()))
+            frames[symbol] = bars[bars.index >= begin].reindex(columns=OHLCV_COLUMNS)
+
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, axis=1)
+
+    def get_news(self, symbol: str) -> List[Dict[str, Any]]:
+        if self.record:
+            items = self.upstream.get_news(symbol)
+            self._write_json("news", symbol, items)
+            return items
+        return self._read_json("news", symbol)
+
+    def get_info(self, symbol: str) -> Dict[str, Any]:
+        if self.record:
+            info = self.upstream.get_info(symbol)
+            self._write_json("info", symbol, info)
+            return info
+        return self._read_json("info", symbol)
+
+    # --- Fixture files ---
+
+    def _path(self, kind: str, symbol: str, ext: str) -> str:
+        return os.path.join(self.fixtures_dir, kind, f"{quote(symbol.upper(), safe='')}.{ext}")
+
+    def _read_json(self, kind: str, symbol: str) -> Any:
+        path = self._path(kind, symbol, "json")
+        if not os.path.exists(path):
+            raise FixtureNotFoundError(f"No {kind} fixture for {symbol.upper()}")
+        with open(path) as f:
+            return json.load(f)
+
+    def _write_json(self, kind: str, symbol: str, data: Any) -> None:
+        path = self._path(kind, symbol, "json")
+        with self._write_lock:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                json.dump(data, f, indent=2, default=str)
+
+    def _record_bars(self, frame: pd.DataFrame, symbols: List[str]) -> None:
+        for symbol, bars in split_download(frame, symbols).items():
+            if bars.empty:
+                continue
+            path = self._path("history", symbol, "csv")
+            with self._write_lock:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                if os.path.exists(path):
+                    stored = pd.read_csv(path, index_col=0, parse_dates=True)
+                    bars = pd.concat([stored[~stored.index.isin(bars.index)], bars]).sort_index()
+                bars.to_csv(path, index_label="Date")
+
+
+# Global provider instance (lazy initialization)
+_provider = None
+_provider_lock = threading.Lock()
+
+
+def create_provider(kind: Optional[str] = None) -> MarketDataProvider:
+    """
+    Builds the provider named by kind or MARKET_DATA_PROVIDER.
+    """
+    kind = (kind or os.getenv("MARKET_DATA_PROVIDER", "yfinance")).lower()
+    fixtures_dir = os.getenv("MARKET_DATA_FIXTURES_DIR", "./data/fixtures/market")
+
+    if kind == "yfinance":
+        return YFinanceProvider()
+    if kind == "replay":
+        return ReplayProvider(fixtures_dir)
+    if kind == "record":
+        return ReplayProvider(fixtures_dir, record=True)
+    raise ValueError(f"Unknown market data provider: {kind}")
+
+
+def get_provider() -> MarketDataProvider:
+    """
+    Get or create the process-wide market data provider, wrapped with
+    deadlines and a circuit breaker (see app.tools.resilience) and the shared
+    request rate limit (see app.tools.rate_limiter).
+    """
+    global _provider
+    if _provider is None:
+        with _provider_lock:
+            if _provider is None:
+                from app.tools.rate_limiter import rate_limit_scheduler, with_rate_limit
+                from app.tools.resilience import with_resilience
+
+                # Waiting for a token happens outside the deadline, so throttling never trips the
+                # breaker; hedged duplicates are paid from the same bucket inside the wrapper
+                scheduler = rate_limit_scheduler()
+                resilient = with_resilience(create_provider(), hedge_scheduler=scheduler)
+                _provider = with_rate_limit(resilient, scheduler) if scheduler else resilient
+    return _provider
+
+
+def set_provider(provider: Optional[MarketDataProvider]) -> None:
+    """
+    Replaces the process-wide provider (None resets to the configured default).
+    """
+    global _provider
+    with _provider_lock:
+        _provider = provider
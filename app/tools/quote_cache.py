@@ -0,0 +1,208 @@
+"""
+Process-wide quote cache shared by every agent and Streamlit page.
+
+Entries are fresh for ``ttl`` seconds. After that they are stale: the old
+value is still returned immediately while a single background refresh runs,
+until ``stale_ttl`` more seconds have passed and the entry is treated as a
+miss. The cache is bounded and evicts least-recently-used entries.
+
+Configuration (environment variables):
+    QUOTE_CACHE_TTL        Seconds a quote is fresh (default 60)
+    QUOTE_CACHE_STALE_TTL  Extra seconds a stale quote may be served (default 900)
+    QUOTE_CACHE_MAX_SIZE   Maximum number of cached entries (default 1024)
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+FetchMany = Callable[[List[Hashable]], Dict[Hashable, Any]]
+
+
+@dataclass
+class _Entry:
+    value: Any
+    stored_at: float
+    ttl: float
+
+
+def _is_cacheable(value: Any) -> bool:
+    """Failed lookups (None or error dicts) are never cached."""
+    if value is None:
+        return False
+    if isinstance(value, dict) and "error" in value:
+        return False
+    return True
+
+
+class QuoteCache:
+    """Thread-safe TTL + LRU cache with stale-while-revalidate refreshes."""
+
+    def __init__(
+        self,
+        ttl: Optional[float] = None,
+        max_size: Optional[int] = None,
+        stale_ttl: Optional[float] = None,
+    ):
+        self.ttl = ttl if ttl is not None else float(os.getenv("QUOTE_CACHE_TTL", "60"))
+        self.stale_ttl = (
+            stale_ttl if stale_ttl is not None else float(os.getenv("QUOTE_CACHE_STALE_TTL", "900"))
+        )
+        self.max_size = max_size if max_size is not None else int(os.getenv("QUOTE_CACHE_MAX_SIZE", "1024"))
+
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._refreshing: set = set()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # --- Basic operations ---
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Returns a fresh value or None. Does not trigger refreshes.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry.stored_at >= entry.ttl:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry.value
+
+    def peek(self, key: Hashable) -> Optional[Any]:
+        """
+        Returns the last stored value regardless of age, without touching stats.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry.value if entry else None
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Stores a value and evicts the least recently used entries if full.
+        """
+        with self._lock:
+            self._entries[key] = _Entry(value, time.monotonic(), self.ttl if ttl is None else ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._refreshing.clear()
+            self.hits = self.stale_hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns hit/miss counters and current size.
+        """
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+            }
+
+    # --- Read-through helpers ---
+
+    def get_or_fetch(self, key: Hashable, fetch: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        """
+        Returns the cached value for key, calling fetch() on a miss.
+        """
+        return self.get_many_or_fetch([key], lambda keys: {key: fetch()}, ttl=ttl).get(key)
+
+    def get_many_or_fetch(
+        self, keys: List[Hashable], fetch_many: FetchMany, ttl: Optional[float] = None
+    ) -> Dict[Hashable, Any]:
+        """
+        Resolves many keys at once.
+
+        Fresh and stale entries are served from the cache. All misses are
+        passed to a single fetch_many(missing_keys) call, and all stale keys
+        are refreshed together by one background fetch_many call. Fetched
+        values are stored with ttl (default: the cache TTL).
+        """
+        results: Dict[Hashable, Any] = {}
+        missing: List[Hashable] = []
+        to_refresh: List[Hashable] = []
+        now = time.monotonic()
+
+        with self._lock:
+            for key in dict.fromkeys(keys):
+                entry = self._entries.get(key)
+                age = now - entry.stored_at if entry else None
+
+                if entry is not None and age < entry.ttl:
+                    self.hits += 1
+                    self._entries.move_to_end(key)
+                    results[key] = entry.value
+                elif entry is not None and age < entry.ttl + self.stale_ttl:
+                    self.stale_hits += 1
+                    self._entries.move_to_end(key)
+                    results[key] = entry.value
+                    if key not in self._refreshing:
+                        self._refreshing.add(key)
+                        to_refresh.append(key)
+                else:
+                    self.misses += 1
+                    missing.append(key)
+
+        if to_refresh:
+            threading.Thread(
+                target=self._refresh,
+                args=(to_refresh, fetch_many, ttl),
+                name="quote-cache-refresh",
+                daemon=True,
+            ).start()
+
+        if missing:
+            fetched = fetch_many(missing)
+            self._store_many(fetched, ttl)
+            for key in missing:
+                results[key] = fetched.get(key)
+
+        return results
+
+    def _store_many(self, values: Dict[Hashable, Any], ttl: Optional[float] = None) -> None:
+        for key, value in values.items():
+            if _is_cacheable(value):
+                self.set(key, value, ttl)
+
+    def _refresh(self, keys: List[Hashable], fetch_many: FetchMany, ttl: Optional[float] = None) -> None:
+        try:
+            self._store_many(fetch_many(keys), ttl)
+        except Exception as e:
+            print(f"Background quote refresh failed: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.difference_update(keys)
+
+
+# Global cache instance (lazy initialization)
+_quote_cache = None
+_quote_cache_lock = threading.Lock()
+
+
+def get_quote_cache() -> QuoteCache:
+    """Get or create the process-wide quote cache."""
+    global _quote_cache
+    if _quote_cache is None:
+        with _quote_cache_lock:
+            if _quote_cache is None:
+                _quote_cache = QuoteCache()
+    return _quote_cache
@@ -0,0 +1,213 @@
+"""
+Token-bucket rate limiting for outbound market data requests.
+
+The news agent, the market agent, the Streamlit pages and the background
+warmers all call Yahoo Finance independently. Bursts from all of them at once
+get throttled (HTTP 429), which stalls every user. Every provider call now
+takes tokens from one process-wide bucket that refills at a steady rate, so
+bursts are smoothed instead of hitting the upstream limit.
+
+When callers have to wait, they are served by priority, then arrival order:
+
+    INTERACTIVE   chat turns (the default)
+    PAGE          Streamlit page refreshes
+    BACKGROUND    pre-warmers and bulk warm-up scripts
+
+The priority of a call is taken from the surrounding ``request_priority``
+block, so code that does not care keeps running as INTERACTIVE.
+
+Configuration (environment variables):
+    MARKET_DATA_RATE            Requests per second, 0 disables rate limiting (default 5)
+    MARKET_DATA_BURST           Bucket size, i.e. requests allowed back to back (default 10)
+    MARKET_DATA_RATE_MAX_WAIT   Seconds a call may wait for a token before failing (default 30)
+"""
+
+import contextvars
+import heapq
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from enum import IntEnum
+from typing import Any, Dict, Iterator, List, Optional
+
+import pandas as pd
+
+from app.tools.providers import MarketDataProvider
+
+
+class Priority(IntEnum):
+    """Lower values are served first."""
+
+    INTERACTIVE = 0
+    PAGE = 1
+    BACKGROUND = 2
+
+
+class RateLimitTimeout(TimeoutError):
+    """Raised when a call waits longer than max_wait for a token."""
+
+
+_current_priority: contextvars.ContextVar = contextvars.ContextVar(
+    "market_data_priority", default=Priority.INTERACTIVE
+)
+
+
+def current_priority() -> Priority:
+    return _current_priority.get()
+
+
+@contextmanager
+def request_priority(priority: Priority) -> Iterator[None]:
+    """
+    Runs market data calls made inside the block at the given priority.
+
+    The priority is a context variable: it follows asyncio tasks and
+    asyncio.to_thread, but plain threads and executor workers start at
+    INTERACTIVE and must set it themselves.
+    """
+    token = _current_priority.set(Priority(priority))
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+class TokenBucketScheduler:
+    """Thread-safe token bucket that hands out tokens by priority, then FIFO."""
+
+    def __init__(self, rate: float, burst: float, max_wait: Optional[float] = None):
+        self.rate = rate
+        self.burst = max(burst, 1.0)
+        self.max_wait = max_wait
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._waiters: List[tuple] = []
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+
+        self.granted = 0
+        self.waited = 0
+        self.timeouts = 0
+
+    def acquire(self, cost: float = 1.0, priority: Optional[Priority] = None, timeout: Optional[float] = None) -> float:
+        """
+        Blocks until ``cost`` tokens are available and it is this caller's turn.
+
+        Returns the seconds spent waiting. Raises RateLimitTimeout if that
+        would exceed ``timeout`` (default max_wait).
+        """
+        cost = min(cost, self.burst)
+        priority = current_priority() if priority is None else priority
+        timeout = self.max_wait if timeout is None else timeout
+        start = time.monotonic()
+        ticket = (int(priority), next(self._counter))
+        blocked = False
+
+        with self._cond:
+            heapq.heappush(self._waiters, ticket)
+            try:
+                while True:
+                    self._refill()
+                    if self._waiters[0] == ticket and self._tokens >= cost:
+                        heapq.heappop(self._waiters)
+                        self._tokens -= cost
+                        self.granted += 1
+                        if blocked:
+                            self.waited += 1
+                        return time.monotonic() - start
+
+                    # The head of the queue sleeps until its tokens have refilled;
+                    # everyone else sleeps until the head has been served
+                    delay = (cost - self._tokens) / self.rate if self._waiters[0] == ticket else None
+                    if timeout is not None:
+                        remaining = timeout - (time.monotonic() - start)
+                        if remaining <= 0:
+                            self.timeouts += 1
+                            raise RateLimitTimeout(f"No market data request slot within {timeout:g}s")
+                        delay = remaining if delay is None else min(delay, remaining)
+                    blocked = True
+                    self._cond.wait(delay)
+            finally:
+                if ticket in self._waiters:
+                    self._waiters.remove(ticket)
+                    heapq.heapify(self._waiters)
+                self._cond.notify_all()
+
+    def try_acquire(self, cost: float = 1.0) -> bool:
+        """
+        Takes ``cost`` tokens only if they are available now and nobody is
+        waiting; never blocks. Used for optional extra requests (hedges).
+        """
+        cost = min(cost, self.burst)
+        with self._cond:
+            self._refill()
+            if self._waiters or self._tokens < cost:
+                return False
+            self._tokens -= cost
+            self.granted += 1
+            return True
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+
+class RateLimitedProvider(MarketDataProvider):
+    """Takes a token from the scheduler before every call to another provider."""
+
+    def __init__(self, inner: MarketDataProvider, scheduler: TokenBucketScheduler):
+        self.inner = inner
+        self.name = inner.name
+        self.scheduler = scheduler
+
+    def get_quote(self, symbol: str) -> Dict[str, float]:
+        self.scheduler.acquire()
+        return self.inner.get_quote(symbol)
+
+    def download(
+        self,
+        symbols: List[str],
+        period: Optional[str] = None,
+        start: Optional[str] = None,
+    ) -> pd.DataFrame:
+        # yf.download issues one request per symbol, so a batch costs one token per symbol
+        self.scheduler.acquire(cost=max(len(symbols), 1))
+        return self.inner.download(symbols, period=period, start=start)
+
+    def get_news(self, symbol: str) -> List[Dict[str, Any]]:
+        self.scheduler.acquire()
+        return self.inner.get_news(symbol)
+
+    def get_info(self, symbol: str) -> Dict[str, Any]:
+        self.scheduler.acquire()
+        return self.inner.get_info(symbol)
+
+
+def rate_limit_scheduler() -> Optional[TokenBucketScheduler]:
+    """
+    The token bucket configured by MARKET_DATA_RATE (None when it is 0).
+    """
+    rate = float(os.getenv("MARKET_DATA_RATE", "5"))
+    if rate <= 0:
+        return None
+    return TokenBucketScheduler(
+        rate=rate,
+        burst=float(os.getenv("MARKET_DATA_BURST", "10")),
+        max_wait=float(os.getenv("MARKET_DATA_RATE_MAX_WAIT", "30")),
+    )
+
+
+def with_rate_limit(
+    provider: MarketDataProvider, scheduler: Optional[TokenBucketScheduler] = None
+) -> MarketDataProvider:
+    """
+    Wraps a provider in RateLimitedProvider (with its own bucket unless one
+    is given), unless MARKET_DATA_RATE is 0.
+    """
+    scheduler = scheduler or rate_limit_scheduler()
+    if scheduler is None:
+        return provider
+    return RateLimitedProvider(provider, scheduler)
@@ -0,0 +1,199 @@
+"""
+Deadlines, hedged requests and a circuit breaker for market data calls.
+
+ResilientProvider wraps another MarketDataProvider:
+
+- Every call gets a deadline. A call that has not answered by then raises
+  MarketDataTimeout instead of blocking the agent turn.
+- Optionally, a call still running after a hedge delay gets one duplicate
+  request. Whichever answers first wins, which cuts the tail latency of a
+  single slow request. The duplicate is an extra upstream request, so it
+  takes its tokens from the rate limiter's bucket; when none are free right
+  away the hedge is skipped rather than queued.
+- Consecutive failures open a circuit breaker. While it is open, calls fail
+  immediately with CircuitOpenError instead of each waiting for its own
+  timeout. After a cool-down, one trial call is let through to probe recovery.
+
+Callers in MarketDataTool fall back to the last cached value when a call fails.
+
+Configuration (environment variables):
+    MARKET_DATA_TIMEOUT             Per-call deadline in seconds, 0 disables the wrapper (default 10)
+    MARKET_DATA_HEDGE_DELAY         Seconds before a hedged duplicate request, 0 disables hedging (default 0)
+    MARKET_DATA_BREAKER_THRESHOLD   Consecutive failures that open the breaker (default 5)
+    MARKET_DATA_BREAKER_RESET       Seconds the breaker stays open before a trial call (default 30)
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional
+
+import pandas as pd
+
+from app.tools.providers import MarketDataProvider
+from app.tools.rate_limiter import TokenBucketScheduler
+
+
+class MarketDataTimeout(TimeoutError):
+    """Raised when a market data call misses its deadline."""
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised without calling the backend while the circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """Closed -> open after repeated failures -> half-open trial -> closed."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.rejected = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """
+        Returns True if a call may proceed. Once the cool-down has passed, a
+        single trial call is allowed while the breaker is half-open.
+        """
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+
+class ResilientProvider(MarketDataProvider):
+    """Applies deadlines, hedging and a circuit breaker to another provider."""
+
+    # Bad symbols and missing fixtures are answers, not signs of an unhealthy backend
+    NON_FAILURES = (LookupError,)
+
+    def __init__(
+        self,
+        inner: MarketDataProvider,
+        timeout: Optional[float] = None,
+        hedge_delay: Optional[float] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        max_workers: int = 16,
+        hedge_scheduler: Optional[TokenBucketScheduler] = None,
+    ):
+        self.inner = inner
+        # Bucket the hedged duplicates are paid from (the first request pays outside this wrapper)
+        self.hedge_scheduler = hedge_scheduler
+        self.name = inner.name
+        self.timeout = timeout if timeout is not None else float(os.getenv("MARKET_DATA_TIMEOUT", "10"))
+        self.hedge_delay = (
+            hedge_delay
+            if hedge_delay is not None
+            else float(os.getenv("MARKET_DATA_HEDGE_DELAY", "0"))
+        )
+        self.breaker = breaker or CircuitBreaker(
+            failure_threshold=int(os.getenv("MARKET_DATA_BREAKER_THRESHOLD", "5")),
+            reset_timeout=float(os.getenv("MARKET_DATA_BREAKER_RESET", "30")),
+        )
+        # Timed-out calls cannot be cancelled; they finish in the background and are discarded
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="market-data")
+        self.timeouts = 0
+        self.hedges = 0
+        self.hedges_skipped = 0
+
+    # --- Endpoints ---
+
+    def get_quote(self, symbol: str) -> Dict[str, float]:
+        return self._call(self.inner.get_quote, symbol)
+
+    def download(
+        self,
+        symbols: List[str],
+        period: Optional[str] = None,
+        start: Optional[str] = None,
+    ) -> pd.DataFrame:
+        return self._call(self.inner.download, symbols, period=period, start=start, _cost=max(len(symbols), 1))
+
+    def get_news(self, symbol: str) -> List[Dict[str, Any]]:
+        return self._call(self.inner.get_news, symbol)
+
+    def get_info(self, symbol: str) -> Dict[str, Any]:
+        return self._call(self.inner.get_info, symbol)
+
+    # --- Internals ---
+
+    def _call(self, fn: Callable, *args, _cost: float = 1.0, **kwargs) -> Any:
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"{self.name} circuit breaker is open")
+
+        deadline = time.monotonic() + self.timeout
+        pending = [self._executor.submit(fn, *args, **kwargs)]
+        hedged = self.hedge_delay <= 0
+        error: Optional[BaseException] = None
+
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            done, _ = wait(
+                pending,
+                timeout=remaining if hedged else min(remaining, self.hedge_delay),
+                return_when=FIRST_COMPLETED,
+            )
+            for future in done:
+                pending.remove(future)
+                if future.exception() is None:
+                    self.breaker.record_success()
+                    return future.result()
+                error = future.exception()
+
+            if not done and not hedged:
+                # Still waiting after the hedge delay: race a duplicate request if the bucket allows it
+                hedged = True
+                if self.hedge_scheduler is None or self.hedge_scheduler.try_acquire(_cost):
+                    self.hedges += 1
+                    pending.append(self._executor.submit(fn, *args, **kwargs))
+                else:
+                    self.hedges_skipped += 1
+
+        if pending:
+            self.timeouts += 1
+            error = MarketDataTimeout(f"{self.name} call did not finish within {self.timeout:g}s")
+
+        if isinstance(error, self.NON_FAILURES):
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure()
+        raise error
+
+
+def with_resilience(
+    provider: MarketDataProvider, hedge_scheduler: Optional[TokenBucketScheduler] = None
+) -> MarketDataProvider:
+    """
+    Wraps a provider in ResilientProvider unless MARKET_DATA_TIMEOUT is 0.
+    Hedged requests take their tokens from `hedge_scheduler` when given.
+    """
+    if float(os.getenv("MARKET_DATA_TIMEOUT", "10")) <= 0:
+        return provider
+    return ResilientProvider(provider, hedge_scheduler=hedge_scheduler)
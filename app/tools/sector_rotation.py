@@ -0,0 +1,113 @@
+"""
+Sector rotation analytics over the price matrix.
+
+Ranks sector ETFs by trailing return and by relative strength against a
+benchmark (SPY by default) over several horizons, and places each sector in a
+rotation quadrant. Everything is computed from one [dates, symbols] close
+array, so all sectors and horizons come from the same bulk history load
+instead of one download per sector and window.
+
+Horizons (counted on each symbol's own bars, so a symbol that also trades
+on days others do not, like crypto, still gets 5 of its trading days for 1w):
+    1w     5 bars
+    1m     21 bars
+    3m     63 bars
+    ytd    since the symbol's last close of the previous calendar year
+
+Result columns, per horizon h:
+    ret_h      Total price return, in percent
+    rs_h       Relative strength: (1 + ret) / (1 + benchmark ret) - 1, in percent
+    rank_h     1 = strongest relative strength
+plus ``quadrant``, from 3-month relative strength (trend) and 1-month
+relative strength (momentum):
+    Leading      beating the benchmark on both
+    Weakening    ahead over 3 months, behind over the last month
+    Improving    behind over 3 months, ahead over the last month
+    Lagging      behind on both
+"""
+
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from app.tools.indicators import right_align
+
+ROTATION_WINDOWS = {"1w": 5, "1m": 21, "3m": 63}
+ROTATION_HORIZONS = list(ROTATION_WINDOWS) + ["ytd"]
+QUADRANTS = ["Leading", "Weakening", "Improving", "Lagging"]
+
+
+def forward_fill(values: np.ndarray) -> np.ndarray:
+    """
+    Replaces each NaN with the last value above it in its column (leading NaNs stay).
+    """
+    values = np.asarray(values, dtype=np.float64)
+    rows = np.arange(len(values)).reshape(-1, *([1] * (values.ndim - 1)))
+    last_valid = np.maximum.accumulate(np.where(np.isnan(values), 0, rows), axis=0)
+    return np.take_along_axis(values, np.broadcast_to(last_valid, values.shape), axis=0)
+
+
+def trailing_returns(close: np.ndarray, dates: pd.DatetimeIndex) -> Dict[str, np.ndarray]:
+    """
+    Returns {horizon: percent return per column} for every ROTATION_HORIZONS entry.
+
+    Bar windows count each column's own bars (NaNs skipped). Horizons a
+    column is too short for are NaN.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    n_cols = close.shape[1:]
+    if len(close) == 0:
+        return {h: np.full(n_cols, np.nan) for h in ROTATION_HORIZONS}
+
+    # Each column's own bars, right-aligned: row -1 is its last close
+    own = right_align(close)
+    last = own[-1]
+    bases = {
+        h: own[-1 - window] if len(own) > window else np.full(n_cols, np.nan)
+        for h, window in ROTATION_WINDOWS.items()
+    }
+    # The YTD base is each column's last close before January 1st of the latest bar's year
+    year_start = pd.Timestamp(year=dates[-1].year, month=1, day=1)
+    row = int(dates.searchsorted(year_start, side="left")) - 1
+    bases["ytd"] = forward_fill(close)[row] if row >= 0 else np.full(n_cols, np.nan)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return {horizon: (last / bases[horizon] - 1) * 100 for horizon in ROTATION_HORIZONS}
+
+
+def compute_sector_rotation(
+    close: np.ndarray,
+    dates: pd.DatetimeIndex,
+    symbols: List[str],
+    benchmark: np.ndarray,
+) -> pd.DataFrame:
+    """
+    Builds the rotation table for a [dates, symbols] close array and the
+    benchmark's closes on the same dates. One row per symbol, in order.
+    """
+    index = pd.Index([s.upper() for s in symbols], name="symbol")
+    sector_returns = trailing_returns(close, dates)
+    benchmark_returns = trailing_returns(np.asarray(benchmark, dtype=np.float64).reshape(-1, 1), dates)
+
+    table = {}
+    for horizon in ROTATION_HORIZONS:
+        table[f"ret_{horizon}"] = sector_returns[horizon]
+    for horizon in ROTATION_HORIZONS:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rs = ((1 + sector_returns[horizon] / 100) / (1 + benchmark_returns[horizon] / 100) - 1) * 100
+        table[f"rs_{horizon}"] = rs
+    frame = pd.DataFrame(table, index=index)
+
+    for horizon in ROTATION_HORIZONS:
+        frame[f"rank_{horizon}"] = frame[f"rs_{horizon}"].rank(ascending=False, method="min").astype("Int64")
+
+    trend = frame["rs_3m"].to_numpy() > 0
+    momentum = frame["rs_1m"].to_numpy() > 0
+    quadrant = np.select(
+        [trend & momentum, trend & ~momentum, ~trend & momentum],
+        QUADRANTS[:3],
+        default=QUADRANTS[3],
+    )
+    frame["quadrant"] = np.where(frame[["rs_1m", "rs_3m"]].isna().any(axis=1), None, quadrant)
+    return frame
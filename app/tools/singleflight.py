@@ -0,0 +1,95 @@
+"""
+Single-flight request coalescing.
+
+Streamlit serves every session from one process, so many users asking the
+same question at the same moment would each fetch the same symbols. A
+SingleFlight group makes concurrent callers for the same key wait on the one
+call that is already in flight instead of issuing their own.
+"""
+
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, List
+
+
+class SingleFlight:
+    """Deduplicates concurrent calls that share a key."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+        self.coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        Runs fn() unless a call for key is already running, in which case
+        waits for that call and returns its result (or raises its error).
+        """
+        return self.do_many([key], lambda keys: {key: fn()})[key]
+
+    def do_many(
+        self,
+        keys: List[Hashable],
+        fn_many: Callable[[List[Hashable]], Dict[Hashable, Any]],
+    ) -> Dict[Hashable, Any]:
+        """
+        Batch version of do().
+
+        Keys already in flight are awaited. All remaining keys are claimed by
+        this caller and resolved with a single fn_many(claimed_keys) call.
+        """
+        claimed: Dict[Hashable, Future] = {}
+        waiting: Dict[Hashable, Future] = {}
+
+        with self._lock:
+            for key in dict.fromkeys(keys):
+                future = self._calls.get(key)
+                if future is not None:
+                    waiting[key] = future
+                    self.coalesced += 1
+                else:
+                    future = Future()
+                    self._calls[key] = future
+                    claimed[key] = future
+
+        results: Dict[Hashable, Any] = {}
+
+        if claimed:
+            try:
+                fetched = fn_many(list(claimed))
+            except BaseException as e:
+                for future in claimed.values():
+                    future.set_exception(e)
+                raise
+            else:
+                for key, future in claimed.items():
+                    results[key] = fetched.get(key)
+                    future.set_result(results[key])
+            finally:
+                with self._lock:
+                    for key in claimed:
+                        self._calls.pop(key, None)
+
+        for key, future in waiting.items():
+            results[key] = future.result()
+
+        return results
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+
+# Global single-flight group (lazy initialization)
+_single_flight = None
+_single_flight_lock = threading.Lock()
+
+
+def get_single_flight() -> SingleFlight:
+    """Get or create the process-wide single-flight group."""
+    global _single_flight
+    if _single_flight is None:
+        with _single_flight_lock:
+            if _single_flight is None:
+                _single_flight = SingleFlight()
+    return _single_flight
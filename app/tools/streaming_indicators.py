@@ -0,0 +1,401 @@
+"""
+Incremental indicator state.
+
+app.tools.indicators recomputes every window from a year of bars on each
+request. The objects here instead keep running state (ring buffers, running
+sums, the last EMA and RSI averages) for a whole symbol universe, and each new
+bar updates every symbol in O(1) with a few vector operations. A NaN in a
+bar means "no bar for this symbol" and leaves its state unchanged.
+
+IndicatorState bundles the indicators shown in technical analysis.
+IndicatorStateStore persists it next to the price matrix, commits each
+finished bar once, and treats the newest matrix row as provisional (it may be
+a partial intraday bar), so a refresh costs one bar update on a copy of the
+state instead of a full recomputation. The state covers the symbols its
+caller asks for, so other symbols entering or leaving the shared matrix do
+not reset it.
+
+Configuration (environment variables):
+    INDICATOR_STATE_DIR    Directory for the persisted state (default ./data/history/indicators)
+"""
+
+import copy
+import os
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.tools.price_matrix import MatrixSnapshot
+
+STREAMING_COLUMNS = [
+    "price",
+    "ma20",
+    "ma50",
+    "ema12",
+    "ema26",
+    "macd",
+    "macd_signal",
+    "macd_hist",
+    "rsi14",
+    "volatility20",
+    "bb_upper",
+    "bb_lower",
+    "bb_pct_b",
+]
+
+
+class StreamingIndicator(ABC):
+    """Base class: state is a set of NumPy arrays named in ``_state``."""
+
+    _state: tuple = ()
+
+    def state(self) -> Dict[str, np.ndarray]:
+        return {name: getattr(self, name) for name in self._state}
+
+    def load_state(self, arrays: Dict[str, np.ndarray]) -> None:
+        for name in self._state:
+            setattr(self, name, np.array(arrays[name]))
+
+    @abstractmethod
+    def update(self, values: np.ndarray) -> None:
+        """Applies one value per symbol (NaN leaves that symbol unchanged)."""
+
+    @property
+    @abstractmethod
+    def value(self) -> np.ndarray:
+        """The current value per symbol (NaN until enough values were seen)."""
+
+
+class RollingMean(StreamingIndicator):
+    """Mean of each symbol's last ``window`` values, from a ring buffer and a running sum."""
+
+    _state = ("buffer", "pos", "count", "total")
+
+    def __init__(self, window: int, n_symbols: int):
+        self.window = window
+        self.buffer = np.zeros((window, n_symbols))
+        self.pos = np.zeros(n_symbols, dtype=np.int64)
+        self.count = np.zeros(n_symbols, dtype=np.int64)
+        self.total = np.zeros(n_symbols)
+
+    def update(self, values: np.ndarray) -> None:
+        cols, new, old = self._push(values)
+        self.total[cols] += new - old
+        self._resum(cols)
+
+    @property
+    def value(self) -> np.ndarray:
+        return np.where(self.count >= self.window, self.total / self.window, np.nan)
+
+    def _push(self, values: np.ndarray):
+        """Writes the new values into each symbol's ring; returns (columns, new, replaced)."""
+        cols = np.flatnonzero(~np.isnan(values))
+        pos = self.pos[cols]
+        new = values[cols]
+        old = self.buffer[pos, cols]
+        self.buffer[pos, cols] = new
+        self.pos[cols] = (pos + 1) % self.window
+        self.count[cols] = np.minimum(self.count[cols] + 1, self.window)
+        return cols, new, old
+
+    def _resum(self, cols: np.ndarray) -> np.ndarray:
+        # Re-add a column once per lap of its ring, so rounding error never builds up
+        wrapped = cols[self.pos[cols] == 0]
+        if wrapped.size:
+            self.total[wrapped] = self.buffer[:, wrapped].sum(axis=0)
+        return wrapped
+
+
+class RollingStd(RollingMean):
+    """Sample standard deviation (ddof=1) of each symbol's last ``window`` values."""
+
+    _state = RollingMean._state + ("total_sq",)
+
+    def __init__(self, window: int, n_symbols: int):
+        super().__init__(window, n_symbols)
+        self.total_sq = np.zeros(n_symbols)
+
+    def update(self, values: np.ndarray) -> None:
+        cols, new, old = self._push(values)
+        self.total[cols] += new - old
+        self.total_sq[cols] += new * new - old * old
+        wrapped = self._resum(cols)
+        if wrapped.size:
+            self.total_sq[wrapped] = np.square(self.buffer[:, wrapped]).sum(axis=0)
+
+    @property
+    def value(self) -> np.ndarray:
+        n = self.window
+        variance = (self.total_sq - self.total * self.total / n) / (n - 1)
+        return np.where(self.count >= n, np.sqrt(np.maximum(variance, 0.0)), np.nan)
+
+
+class EMA(StreamingIndicator):
+    """Exponential moving average (pandas ewm(span, adjust=False)), seeded with the first value."""
+
+    _state = ("current",)
+
+    def __init__(self, span: int, n_symbols: int):
+        self.alpha = 2.0 / (span + 1)
+        self.current = np.full(n_symbols, np.nan)
+
+    def update(self, values: np.ndarray) -> None:
+        blended = self.alpha * values + (1 - self.alpha) * self.current
+        seeded = np.where(np.isnan(self.current), values, blended)
+        self.current = np.where(np.isnan(values), self.current, seeded)
+
+    @property
+    def value(self) -> np.ndarray:
+        return self.current
+
+
+class WilderRSI(StreamingIndicator):
+    """
+    RSI with Wilder smoothing: the first ``period`` changes are averaged, then
+    avg = (avg * (period - 1) + change) / period (as indicators.rsi).
+    """
+
+    _state = ("previous", "avg_gain", "avg_loss", "count")
+
+    def __init__(self, period: int, n_symbols: int):
+        self.period = period
+        self.previous = np.full(n_symbols, np.nan)
+        self.avg_gain = np.zeros(n_symbols)
+        self.avg_loss = np.zeros(n_symbols)
+        self.count = np.zeros(n_symbols, dtype=np.int64)
+
+    def update(self, values: np.ndarray) -> None:
+        cols = np.flatnonzero(~np.isnan(values) & ~np.isnan(self.previous))
+        change = values[cols] - self.previous[cols]
+        gain, loss = np.maximum(change, 0.0), np.maximum(-change, 0.0)
+
+        count = self.count[cols] + 1
+        # Running mean while seeding, Wilder smoothing afterwards
+        weight = np.where(count <= self.period, 1.0 / count, 1.0 / self.period)
+        self.avg_gain[cols] += (gain - self.avg_gain[cols]) * weight
+        self.avg_loss[cols] += (loss - self.avg_loss[cols]) * weight
+        self.count[cols] = count
+
+        self.previous = np.where(np.isnan(values), self.previous, values)
+
+    @property
+    def value(self) -> np.ndarray:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rsi = 100 - 100 / (1 + self.avg_gain / self.avg_loss)
+        return np.where(self.count >= self.period, rsi, np.nan)
+
+
+class IndicatorState:
+    """Running technical indicators for a fixed list of symbols."""
+
+    def __init__(self, symbols: List[str]):
+        self.symbols = [s.upper() for s in symbols]
+        self.last_date: Optional[pd.Timestamp] = None
+        n = len(self.symbols)
+        self.indicators: Dict[str, StreamingIndicator] = {
+            "ma20": RollingMean(20, n),
+            "ma50": RollingMean(50, n),
+            "std20": RollingStd(20, n),
+            "ema12": EMA(12, n),
+            "ema26": EMA(26, n),
+            "macd_signal": EMA(9, n),
+            "rsi14": WilderRSI(14, n),
+            "return_std20": RollingStd(20, n),
+        }
+        self.price = np.full(n, np.nan)
+
+    def update(self, closes: np.ndarray, date: Optional[pd.Timestamp] = None) -> None:
+        """
+        Applies one bar of closes (one value per symbol, NaN for no bar).
+        """
+        closes = np.asarray(closes, dtype=np.float64)
+        ind = self.indicators
+        with np.errstate(divide="ignore", invalid="ignore"):
+            returns = closes / self.price - 1
+
+        for name in ("ma20", "ma50", "std20", "ema12", "ema26", "rsi14"):
+            ind[name].update(closes)
+        macd = ind["ema12"].value - ind["ema26"].value
+        ind["macd_signal"].update(np.where(np.isnan(closes), np.nan, macd))
+        ind["return_std20"].update(returns)
+
+        self.price = np.where(np.isnan(closes), self.price, closes)
+        if date is not None:
+            self.last_date = pd.Timestamp(date)
+
+    def update_many(self, closes: np.ndarray, dates: Optional[pd.DatetimeIndex] = None) -> None:
+        """Applies consecutive bars from a [dates, symbols] array."""
+        for t in range(len(closes)):
+            self.update(closes[t], dates[t] if dates is not None else None)
+
+    def table(self) -> pd.DataFrame:
+        """
+        Current values, one row per symbol with STREAMING_COLUMNS.
+        """
+        ind = self.indicators
+        ma20 = ind["ma20"].value
+        std20 = ind["std20"].value
+        macd = ind["ema12"].value - ind["ema26"].value
+        signal = ind["macd_signal"].value
+        bb_upper, bb_lower = ma20 + 2 * std20, ma20 - 2 * std20
+        with np.errstate(divide="ignore", invalid="ignore"):
+            bb_pct_b = (self.price - bb_lower) / (bb_upper - bb_lower)
+
+        table = {
+            "price": self.price,
+            "ma20": ma20,
+            "ma50": ind["ma50"].value,
+            "ema12": ind["ema12"].value,
+            "ema26": ind["ema26"].value,
+            "macd": macd,
+            "macd_signal": signal,
+            "macd_hist": macd - signal,
+            "rsi14": ind["rsi14"].value,
+            "volatility20": ind["return_std20"].value * 100,
+            "bb_upper": bb_upper,
+            "bb_lower": bb_lower,
+            "bb_pct_b": bb_pct_b,
+        }
+        return pd.DataFrame(table, index=pd.Index(self.symbols, name="symbol"), columns=STREAMING_COLUMNS)
+
+    def copy(self) -> "IndicatorState":
+        return copy.deepcopy(self)
+
+    @classmethod
+    def join(cls, states: List["IndicatorState"], symbols: List[str]) -> "IndicatorState":
+        """
+        A state for `symbols` whose columns are copied from the given states
+        (the first state holding a symbol wins); no bars are replayed.
+        """
+        joined = cls(symbols)
+        joined.last_date = states[0].last_date if states else None
+        claimed = set()
+        for state in states:
+            pairs = [
+                (t, state.symbols.index(symbol))
+                for t, symbol in enumerate(joined.symbols)
+                if symbol in state.symbols and symbol not in claimed
+            ]
+            if not pairs:
+                continue
+            claimed.update(joined.symbols[t] for t, _ in pairs)
+            targets, columns = (list(side) for side in zip(*pairs))
+            for name, indicator in joined.indicators.items():
+                arrays = indicator.state()
+                for field, array in state.indicators[name].state().items():
+                    arrays[field][..., targets] = array[..., columns]
+                indicator.load_state(arrays)
+            joined.price[targets] = state.price[columns]
+        return joined
+
+    # --- Persistence ---
+
+    def save(self, path: str) -> None:
+        arrays = {
+            f"{name}.{field}": array
+            for name, indicator in self.indicators.items()
+            for field, array in indicator.state().items()
+        }
+        arrays["price"] = self.price
+        arrays["symbols"] = np.array(self.symbols, dtype=str)
+        arrays["last_date"] = np.array(self.last_date.strftime("%Y-%m-%d") if self.last_date is not None else "")
+
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(tmp_path, **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "IndicatorState":
+        with np.load(path) as data:
+            state = cls(list(data["symbols"]))
+            for name, indicator in state.indicators.items():
+                indicator.load_state({field: data[f"{name}.{field}"] for field in indicator._state})
+            state.price = np.array(data["price"])
+            last_date = str(data["last_date"])
+        state.last_date = pd.Timestamp(last_date) if last_date else None
+        return state
+
+
+class IndicatorStateStore:
+    """Keeps a persisted IndicatorState in step with the price matrix."""
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or os.getenv("INDICATOR_STATE_DIR", "./data/history/indicators")
+        self._path = os.path.join(self.directory, "state.npz")
+        self._lock = threading.Lock()
+        self._state: Optional[IndicatorState] = None
+        os.makedirs(self.directory, exist_ok=True)
+
+    def sync(self, matrix: MatrixSnapshot, symbols: Optional[List[str]] = None) -> IndicatorState:
+        """
+        Commits every finished matrix row newer than the stored state for
+        `symbols` (every matrix symbol by default) and returns a copy with the
+        newest (provisional) row applied on top. Symbols the matrix does not
+        hold are left out.
+
+        The state follows its own symbol list, not the matrix's universe: a
+        symbol added to the list is replayed on its own and joined to the
+        existing columns, a dropped one is just removed. The state is rebuilt
+        from the whole matrix only when it no longer lines up with the matrix
+        dates.
+        """
+        symbols = [s for s in dict.fromkeys(s.upper() for s in (matrix.symbols if symbols is None else symbols)) if s in matrix]
+        closes = matrix.matrix("close", symbols)
+        dates = matrix.dates
+
+        with self._lock:
+            state = self._state or self._load()
+            if state is None or not self._lines_up(state, dates):
+                state = IndicatorState(symbols)
+            elif state.symbols != symbols:
+                state = self._resize(state, symbols, matrix)
+
+            # Every row but the last is a finished bar
+            start = 0 if state.last_date is None else dates.searchsorted(state.last_date, side="right")
+            finished = max(len(dates) - 1, 0)
+            if start < finished:
+                state.update_many(closes[start:finished], dates[start:finished])
+            if start < finished or state is not self._state:
+                state.save(self._path)
+            self._state = state
+
+            current = state.copy()
+        if len(dates):
+            current.update(closes[-1], dates[-1])
+        return current
+
+    def _resize(self, state: IndicatorState, symbols: List[str], matrix: MatrixSnapshot) -> IndicatorState:
+        """The state for `symbols`: kept columns are copied, added ones replayed up to the state's last bar."""
+        added = IndicatorState([s for s in symbols if s not in state.symbols])
+        if added.symbols and state.last_date is not None:
+            upto = matrix.dates.searchsorted(state.last_date, side="right")
+            added.update_many(matrix.matrix("close", added.symbols)[:upto], matrix.dates[:upto])
+        return IndicatorState.join([state, added], symbols)
+
+    def _lines_up(self, state: IndicatorState, dates: pd.DatetimeIndex) -> bool:
+        # The state's last bar must be inside the matrix, otherwise bars would be skipped
+        return state.last_date is None or (len(dates) > 0 and dates[0] <= state.last_date and state.last_date in dates)
+
+    def _load(self) -> Optional[IndicatorState]:
+        try:
+            return IndicatorState.load(self._path)
+        except (OSError, ValueError, KeyError):
+            return None
+
+
+# Global store instance (lazy initialization)
+_indicator_state_store = None
+_indicator_state_store_lock = threading.Lock()
+
+
+def get_indicator_state_store() -> IndicatorStateStore:
+    """Get or create the process-wide indicator state store."""
+    global _indicator_state_store
+    if _indicator_state_store is None:
+        with _indicator_state_store_lock:
+            if _indicator_state_store is None:
+                _indicator_state_store = IndicatorStateStore()
+    return _indicator_state_store
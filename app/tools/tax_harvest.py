@@ -0,0 +1,121 @@
+"""
+Tax-loss harvesting scanner.
+
+Values every open tax lot at current prices, keeps the lots trading below
+cost and ranks them by the tax a sale would save: the loss times the
+short- or long-term rate, depending on the lot's holding period.
+
+Selling at a loss is a wash sale if shares of the same symbol were bought
+within 30 days before or after the sale. Only purchases still held count as
+replacements, and the scan assumes every candidate is sold together, so
+candidates are not each other's replacements. Every replacement purchase is
+one (symbol, date) key in a single sorted array. For each candidate the
+purchases inside its window are found with two binary searches
+(np.searchsorted), so the check costs O(log n) per lot however long the
+history is.
+
+Configuration (environment variables):
+    TAX_SHORT_TERM_RATE    Rate applied to short-term losses (default 0.24)
+    TAX_LONG_TERM_RATE     Rate applied to long-term losses (default 0.15)
+"""
+
+import os
+from datetime import date, timedelta
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.tools.tax_lots import Lots, Sale, compute_gains
+
+WASH_SALE_DAYS = 30
+
+# Room for every day number since 1970 in the combined (symbol, day) key
+_DAY_SPAN = 1 << 20
+
+
+def wash_sale_windows(
+    lots: Lots,
+    candidates: np.ndarray,
+    sale_date: date,
+    days: int = WASH_SALE_DAYS,
+    replacements: Optional[np.ndarray] = None,
+):
+    """
+    For each candidate lot index, the indices of the other lots of the same
+    symbol bought within `days` of `sale_date`. `replacements` is a boolean
+    mask of the lots that count as purchases (all lots by default).
+
+    Returns a list of index arrays, one per candidate.
+    """
+    _, codes = np.unique(lots.symbols, return_inverse=True)
+    pool = np.arange(len(lots)) if replacements is None else np.nonzero(replacements)[0]
+    keys = codes[pool].astype(np.int64) * _DAY_SPAN + lots.acquired[pool].astype(np.int64)
+    by_key = np.argsort(keys, kind="stable")
+    order = pool[by_key]
+    sorted_keys = keys[by_key]
+
+    day = np.datetime64(sale_date, "D").astype(np.int64)
+    base = codes[candidates].astype(np.int64) * _DAY_SPAN
+    low = np.searchsorted(sorted_keys, base + (day - days), side="left")
+    high = np.searchsorted(sorted_keys, base + (day + days), side="right")
+
+    return [order[lo:hi][order[lo:hi] != lot] for lot, lo, hi in zip(candidates, low, high)]
+
+
+def scan_harvest(
+    lots: Lots,
+    sales: Iterable[Sale],
+    prices: Dict[str, float],
+    as_of: Optional[date] = None,
+    method: str = "SPECIFIC",
+    short_term_rate: Optional[float] = None,
+    long_term_rate: Optional[float] = None,
+) -> pd.DataFrame:
+    """
+    Open lots with an unrealized loss, ranked by estimated tax saved (highest first).
+
+    Columns: lot_id, symbol, acquired, remaining, price, current_price, loss
+    (negative), long_term, tax_saved, wash_sale (bool), wash_sale_lots (ids
+    of the purchases in the window) and clear_on (first day a sale would be
+    outside every conflicting purchase's window; None without conflicts).
+    Sales decide which lots are still open, under the given cost basis method
+    (SPECIFIC: the lots each sale was recorded against). Lots bought after
+    `as_of` are not candidates but still count as purchases; sold-out lots
+    and the other candidates do not.
+    """
+    as_of = as_of or date.today()
+    if short_term_rate is None:
+        short_term_rate = float(os.getenv("TAX_SHORT_TERM_RATE", "0.24"))
+    if long_term_rate is None:
+        long_term_rate = float(os.getenv("TAX_LONG_TERM_RATE", "0.15"))
+
+    gains = compute_gains(lots, sales, prices, method=method, as_of=as_of).lots
+    loss = (gains["unrealized_short"] + gains["unrealized_long"]).to_numpy()
+    held = lots.acquired <= np.datetime64(as_of, "D")
+    still_open = gains["remaining"].to_numpy() > 0
+    is_candidate = still_open & (loss < 0) & held
+    candidates = np.nonzero(is_candidate)[0]
+
+    long_term = gains["long_term"].to_numpy()[candidates]
+    conflicts = wash_sale_windows(lots, candidates, as_of, replacements=still_open & ~is_candidate)
+    clear_on = [
+        (lots.acquired[c].max().astype(object) + timedelta(days=WASH_SALE_DAYS + 1)) if len(c) else None
+        for c in conflicts
+    ]
+
+    result = pd.DataFrame({
+        "lot_id": lots.ids[candidates],
+        "symbol": lots.symbols[candidates],
+        "acquired": lots.acquired[candidates],
+        "remaining": gains["remaining"].to_numpy()[candidates],
+        "price": lots.price[candidates],
+        "current_price": gains["current_price"].to_numpy()[candidates],
+        "loss": loss[candidates],
+        "long_term": long_term,
+        "tax_saved": -loss[candidates] * np.where(long_term, long_term_rate, short_term_rate),
+        "wash_sale": [len(c) > 0 for c in conflicts],
+        "wash_sale_lots": [lots.ids[c].tolist() for c in conflicts],
+        "clear_on": clear_on,
+    })
+    return result.sort_values(["tax_saved", "lot_id"], ascending=[False, True], ignore_index=True)
@@ -0,0 +1,402 @@
+"""
+Tax lots and realized / unrealized capital gains.
+
+Every purchase is a lot (acquisition date, shares, cost per share) in the
+tax_lots table; sales are recorded in tax_lot_sales. A sale relieves shares
+from the symbol's open lots in the order the cost basis method gives:
+
+    FIFO      oldest lots first
+    LIFO      newest lots first
+    HIFO      highest cost per share first
+    SPECIFIC  the lot named on the sale, by id and/or acquisition date
+              (sales naming neither fall back to FIFO)
+
+Lots are held as NumPy arrays, one element per lot. Relieving a sale, the
+holding period test and the gain arithmetic are array operations over all
+lots, so only the sales are looped over (in date order, since each depends
+on what earlier sales left). Gains are short-term when the lot was held one
+year or less, long-term otherwise.
+
+The ledger records every sale against the lots it relieved, so the SPECIFIC
+report is the book as it was actually sold; the other methods replay the same
+sales as a comparison.
+
+Configuration (environment variables):
+    TAX_LOT_METHOD    Relief method for sales that name no lot (default FIFO)
+"""
+
+import os
+import threading
+from dataclasses import dataclass
+from datetime import date
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.database import Base, LotSale, PortfolioItem, SessionLocal, TaxLot, engine
+
+METHODS = ("FIFO", "LIFO", "HIFO", "SPECIFIC")
+
+# Shares left below this count as zero (float dust from partial sales)
+_EPSILON = 1e-9
+
+
+@dataclass
+class Lots:
+    """All lots as parallel arrays."""
+
+    ids: np.ndarray        # int64
+    symbols: np.ndarray    # str
+    acquired: np.ndarray   # datetime64[D]
+    quantity: np.ndarray   # shares bought
+    price: np.ndarray      # cost per share
+
+    @classmethod
+    def from_records(cls, records: Iterable) -> "Lots":
+        """Builds the arrays from TaxLot rows (or any objects with the same attributes)."""
+        records = list(records)
+        return cls(
+            ids=np.array([r.id for r in records], dtype=np.int64),
+            symbols=np.array([r.symbol.upper() for r in records], dtype=str),
+            acquired=np.array([r.acquired_on for r in records], dtype="datetime64[D]"),
+            quantity=np.array([r.quantity for r in records], dtype=np.float64),
+            price=np.array([r.price for r in records], dtype=np.float64),
+        )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+@dataclass
+class Sale:
+    symbol: str
+    sold_on: date
+    quantity: float
+    price: float
+    lot_id: Optional[int] = None
+    acquired_on: Optional[date] = None  # acquisition date of the lot sold
+
+
+@dataclass
+class GainsReport:
+    """Per-lot gains under one cost basis method."""
+
+    method: str
+    as_of: date
+    lots: pd.DataFrame  # one row per lot, see compute_gains
+
+    def totals(self) -> Dict[str, float]:
+        """Realized and unrealized gains, short- and long-term."""
+        return {
+            column: float(self.lots[column].sum())
+            for column in ("realized_short", "realized_long", "unrealized_short", "unrealized_long")
+        }
+
+    def by_symbol(self) -> pd.DataFrame:
+        """Shares, cost basis, market value and gains per symbol."""
+        columns = ["remaining", "cost_basis", "market_value", "realized_short", "realized_long",
+                   "unrealized_short", "unrealized_long"]
+        return self.lots.groupby("symbol")[columns].sum(min_count=1)
+
+
+def default_method() -> str:
+    """Relief method for sales that name no lot (TAX_LOT_METHOD, default FIFO)."""
+    method = os.getenv("TAX_LOT_METHOD", "FIFO").upper()
+    if method not in METHODS:
+        raise ValueError(f"Unknown cost basis method {method!r}; expected one of {', '.join(METHODS)}")
+    return method
+
+
+def is_long_term(acquired: np.ndarray, on) -> np.ndarray:
+    """
+    Whether lots acquired on the given dates were held more than one year
+    on `on` (a date or an array of dates): sold after the anniversary.
+    """
+    acquired = np.asarray(acquired, dtype="datetime64[D]")
+    on = np.broadcast_to(np.asarray(on, dtype="datetime64[D]"), acquired.shape)
+
+    def year_and_day(days):
+        years = days.astype("datetime64[Y]")
+        months = days.astype("datetime64[M]")
+        month = (months - years.astype("datetime64[M]")).astype(np.int64)
+        day = (days - months.astype("datetime64[D]")).astype(np.int64)
+        # Month and day as one comparable number
+        return years.astype(np.int64), month * 32 + day
+
+    acquired_year, acquired_day = year_and_day(acquired)
+    on_year, on_day = year_and_day(on)
+    years_held = on_year - acquired_year
+    return (years_held > 1) | ((years_held == 1) & (on_day > acquired_day))
+
+
+def relief_order(lots: Lots, method: str) -> np.ndarray:
+    """Lot indices in the order a sale relieves them (ties broken by acquisition date, then id)."""
+    method = method.upper()
+    if method in ("FIFO", "SPECIFIC"):
+        return np.lexsort((lots.ids, lots.acquired))
+    if method == "LIFO":
+        return np.lexsort((-lots.ids, -lots.acquired.astype(np.int64)))
+    if method == "HIFO":
+        return np.lexsort((lots.ids, lots.acquired, -lots.price))
+    raise ValueError(f"Unknown cost basis method {method!r}; expected one of {', '.join(METHODS)}")
+
+
+def _relieve(lots: Lots, remaining: np.ndarray, order: np.ndarray, sale: Sale) -> np.ndarray:
+    """Shares taken from each lot (array over all lots) to fill one sale."""
+    if sale.lot_id is not None or sale.acquired_on is not None:
+        return _relieve_specific(lots, remaining, order, sale)
+
+    take = np.zeros(len(lots))
+    sold_on = np.datetime64(sale.sold_on, "D")
+    # Open lots of the symbol that existed on the sale date, in relief order
+    candidates = order[
+        (lots.symbols[order] == sale.symbol.upper())
+        & (remaining[order] > _EPSILON)
+        & (lots.acquired[order] <= sold_on)
+    ]
+    available = remaining[candidates]
+    before = np.cumsum(available) - available
+    if available.sum() < sale.quantity - _EPSILON:
+        raise ValueError(
+            f"Sale of {sale.quantity:g} {sale.symbol.upper()} on {sale.sold_on} exceeds the {available.sum():g} shares held"
+        )
+    take[candidates] = np.clip(sale.quantity - before, 0.0, available)
+    return take
+
+
+def _relieve_specific(lots: Lots, remaining: np.ndarray, order: np.ndarray, sale: Sale) -> np.ndarray:
+    """Shares taken to fill a sale naming its lot by id and/or acquisition date."""
+    symbol = sale.symbol.upper()
+    label = f"Lot {sale.lot_id}" if sale.lot_id is not None else f"{symbol} lot acquired on {sale.acquired_on}"
+
+    matches = order[lots.symbols[order] == symbol]
+    if sale.lot_id is not None:
+        if not np.any(lots.ids == sale.lot_id):
+            raise ValueError(f"Lot {sale.lot_id} does not exist")
+        matches = matches[lots.ids[matches] == sale.lot_id]
+        if matches.size == 0:
+            raise ValueError(f"Lot {sale.lot_id} is not a {symbol} lot")
+    if sale.acquired_on is not None:
+        matches = matches[lots.acquired[matches] == np.datetime64(sale.acquired_on, "D")]
+        if matches.size == 0:
+            raise ValueError(f"{label} does not exist" if sale.lot_id is None
+                             else f"Lot {sale.lot_id} was not acquired on {sale.acquired_on}")
+    if np.any(lots.acquired[matches] > np.datetime64(sale.sold_on, "D")):
+        raise ValueError(f"{label} was acquired after the sale on {sale.sold_on}")
+
+    # Several lots bought the same day are relieved in the method's order
+    available = remaining[matches]
+    if available.sum() < sale.quantity - _EPSILON:
+        raise ValueError(f"{label} has only {available.sum():g} shares left")
+    take = np.zeros(len(lots))
+    take[matches] = np.clip(sale.quantity - (np.cumsum(available) - available), 0.0, available)
+    return take
+
+
+def compute_gains(
+    lots: Lots,
+    sales: Iterable[Sale],
+    prices: Dict[str, float],
+    method: str = "FIFO",
+    as_of: Optional[date] = None,
+    year: Optional[int] = None,
+) -> GainsReport:
+    """
+    Replays the sales against the lots under a cost basis method and values
+    what is left at the given prices.
+
+    Realized gains count sales in `year` only (all sales if None); every sale
+    still relieves its lots. Lots of symbols without a price have no
+    unrealized gain.
+    """
+    method = method.upper()
+    as_of = as_of or date.today()
+    order = relief_order(lots, method)
+
+    remaining = lots.quantity.copy()
+    realized_short = np.zeros(len(lots))
+    realized_long = np.zeros(len(lots))
+
+    for sale in sorted(sales, key=lambda s: s.sold_on):
+        if method != "SPECIFIC":
+            sale = Sale(sale.symbol, sale.sold_on, sale.quantity, sale.price)
+        take = _relieve(lots, remaining, order, sale)
+        remaining -= take
+        if year is not None and sale.sold_on.year != year:
+            continue
+        gain = take * (sale.price - lots.price)
+        long_term = is_long_term(lots.acquired, sale.sold_on)
+        realized_short += np.where(long_term, 0.0, gain)
+        realized_long += np.where(long_term, gain, 0.0)
+
+    remaining[remaining < _EPSILON] = 0.0
+    current = pd.Series(prices, dtype=np.float64).rename(index=str.upper).reindex(lots.symbols).to_numpy()
+    cost_basis = remaining * lots.price
+    market_value = remaining * current
+    unrealized = market_value - cost_basis
+    long_term = is_long_term(lots.acquired, as_of)
+
+    frame = pd.DataFrame({
+        "lot_id": lots.ids,
+        "symbol": lots.symbols,
+        "acquired": lots.acquired,
+        "quantity": lots.quantity,
+        "remaining": remaining,
+        "price": lots.price,
+        "current_price": current,
+        "cost_basis": cost_basis,
+        "market_value": market_value,
+        "long_term": long_term,
+        "realized_short": realized_short,
+        "realized_long": realized_long,
+        "unrealized_short": np.where(long_term, 0.0, unrealized),
+        "unrealized_long": np.where(long_term, unrealized, 0.0),
+    })
+    # A lot without a price has no unrealized gain rather than NaN
+    frame[["unrealized_short", "unrealized_long"]] = frame[["unrealized_short", "unrealized_long"]].fillna(0.0)
+    return GainsReport(method=method, as_of=as_of, lots=frame)
+
+
+class TaxLotLedger:
+    """Tax lots and sales stored in the app database."""
+
+    def __init__(self, session_factory: Optional[Callable] = None):
+        self.session_factory = session_factory or SessionLocal
+        if session_factory is None:
+            Base.metadata.create_all(
+                bind=engine, tables=[PortfolioItem.__table__, TaxLot.__table__, LotSale.__table__]
+            )
+
+    def add_lot(self, symbol: str, quantity: float, price: float, acquired_on: Optional[date] = None) -> int:
+        db = self.session_factory()
+        try:
+            lot = TaxLot(symbol=symbol.upper(), quantity=quantity, price=price, acquired_on=acquired_on or date.today())
+            db.add(lot)
+            db.commit()
+            return lot.id
+        finally:
+            db.close()
+
+    def record_sale(
+        self,
+        symbol: str,
+        quantity: float,
+        price: float,
+        sold_on: Optional[date] = None,
+        lot_id: Optional[int] = None,
+        method: Optional[str] = None,
+        acquired_on: Optional[date] = None,
+    ) -> List[int]:
+        """
+        Records a sale and returns the ids of its tax_lot_sales rows.
+
+        A sale naming lot_id and/or acquired_on relieves that lot (ValueError
+        when it does not exist). Otherwise the shares come from
+        the open lots in `method` order (TAX_LOT_METHOD by default), with one
+        row per lot relieved. Raises ValueError when the shares are not open.
+        """
+        symbol = symbol.upper()
+        sold_on = sold_on or date.today()
+        lots, remaining = self._open_shares()
+        order = relief_order(lots, method or default_method())
+        take = _relieve(lots, remaining, order, Sale(symbol, sold_on, quantity, price, lot_id, acquired_on))
+
+        db = self.session_factory()
+        try:
+            rows = [
+                LotSale(symbol=symbol, quantity=float(take[i]), price=price, sold_on=sold_on, lot_id=int(lots.ids[i]))
+                for i in order[take[order] > 0]
+            ]
+            db.add_all(rows)
+            db.commit()
+            return [row.id for row in rows]
+        finally:
+            db.close()
+
+    def backfill_holdings(self) -> List[int]:
+        """
+        Adds a lot for the portfolio_items shares the open lots do not cover
+        (holdings added before the ledger existed). The lot costs the holding's
+        average price and is dated today, as the purchase date is unknown;
+        holdings without a cost are skipped. Returns the new lot ids.
+        """
+        lots, remaining = self._open_shares()
+        held = pd.Series(remaining, index=lots.symbols, dtype=np.float64).groupby(level=0).sum()
+
+        db = self.session_factory()
+        try:
+            added = []
+            for item in db.query(PortfolioItem).order_by(PortfolioItem.id).all():
+                symbol = item.symbol.upper()
+                missing = (item.quantity or 0.0) - held.get(symbol, 0.0)
+                held[symbol] = max(held.get(symbol, 0.0) - (item.quantity or 0.0), 0.0)
+                if missing <= _EPSILON:
+                    continue
+                if not item.avg_price or item.avg_price <= 0:
+                    print(f"Tax lot backfill skipped {symbol}: no cost basis recorded")
+                    continue
+                lot = TaxLot(symbol=symbol, quantity=missing, price=item.avg_price, acquired_on=date.today())
+                db.add(lot)
+                db.flush()
+                added.append(lot.id)
+            db.commit()
+            return added
+        finally:
+            db.close()
+
+    def open_quantity(self, symbol: str) -> float:
+        """Shares of `symbol` the open lots still hold."""
+        lots, remaining = self._open_shares()
+        return float(remaining[lots.symbols == symbol.upper()].sum())
+
+    def _open_shares(self) -> Tuple[Lots, np.ndarray]:
+        """All lots and the shares each still holds after the recorded sales."""
+        lots = self.lots()
+        return lots, compute_gains(lots, self.sales(), {}, method="SPECIFIC").lots["remaining"].to_numpy()
+
+    def lots(self) -> Lots:
+        db = self.session_factory()
+        try:
+            return Lots.from_records(db.query(TaxLot).order_by(TaxLot.id).all())
+        finally:
+            db.close()
+
+    def sales(self) -> List[Sale]:
+        db = self.session_factory()
+        try:
+            return [
+                Sale(row.symbol, row.sold_on, row.quantity, row.price, row.lot_id)
+                for row in db.query(LotSale).order_by(LotSale.sold_on, LotSale.id).all()
+            ]
+        finally:
+            db.close()
+
+    def gains(
+        self,
+        prices: Dict[str, float],
+        method: str = "FIFO",
+        as_of: Optional[date] = None,
+        year: Optional[int] = None,
+    ) -> GainsReport:
+        return compute_gains(self.lots(), self.sales(), prices, method=method, as_of=as_of, year=year)
+
+
+# Global ledger instance (lazy initialization)
+_ledger = None
+_ledger_lock = threading.Lock()
+
+
+def get_ledger() -> TaxLotLedger:
+    """Get or create the app database's ledger; existing holdings are backfilled on first use."""
+    global _ledger
+    if _ledger is None:
+        with _ledger_lock:
+            if _ledger is None:
+                ledger = TaxLotLedger()
+                try:
+                    ledger.backfill_holdings()
+                except Exception as e:
+                    print(f"Tax lot backfill failed: {e}")
+                _ledger = ledger
+    return _ledger
@@ -24,6 +24,7 @@ from app.agent.goal_agent import GoalPlanningAgent
 from app.agent.market_agent import MarketAnalysisAgent
 from app.agent.news_agent import NewsSynthesizerAgent
 from app.agent.tax_agent import TaxEducationAgent
+from app.tools.market_snapshot import market_snapshot
 
 
 # Define the possible intents/agents
@@ -246,8 +247,26 @@ class FinancialWorkflow:
             "context": context
         }
 
-        result = self.graph.invoke(initial_state)
-        return result
+        with market_snapshot():
+            return self.graph.invoke(initial_state)
+
+    async def ainvoke(self, query: str, context: str = None, messages: List[dict] = None) -> dict:
+        """
+        Async version of invoke() for callers that already run an event loop.
+
+        Agent nodes run on worker threads, so market data lookups made through
+        the async client can overlap across concurrent requests.
+        """
+        initial_state = {
+            "query": query,
+            "messages": messages or [{"role": "user", "content": query}],
+            "intent": None,
+            "response": None,
+            "context": context
+        }
+
+        with market_snapshot():
+            return await self.graph.ainvoke(initial_state)
 
 
 # Global workflow instance (lazy initialization)
@@ -28,6 +28,7 @@ from app.agent.goal_agent import GoalPlanningAgent
 from app.agent.market_agent import MarketAnalysisAgent
 from app.agent.news_agent import NewsSynthesizerAgent
 from app.agent.tax_agent import TaxEducationAgent
+from app.tools.market_snapshot import market_snapshot
 
 tracer = trace.get_tracer(__name__)
 
@@ -395,7 +396,9 @@ class OrchestratorWorkflow:
             "orchestrator_reasoning": "",
         }
 
-        result = self.graph.invoke(initial_state)
+        # Agents planned for this query share one market snapshot
+        with market_snapshot():
+            result = self.graph.invoke(initial_state)
 
         return {
             "response": result.get("final_response", "I could not process your request."),
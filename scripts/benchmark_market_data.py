@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Latency benchmark for the market data layer.
+
+Run once against Yahoo with --provider record to capture fixtures, then with
+--provider replay (the default) for deterministic, offline numbers.
+
+    python scripts/benchmark_market_data.py --provider record
+    python scripts/benchmark_market_data.py --iterations 50
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+INDICES = ["^GSPC", "^DJI", "^IXIC", "^RUT", "^VIX"]
+SECTORS = ["XLK", "XLV", "XLF", "XLE", "XLY", "XLP", "XLI", "XLB", "XLU", "XLRE", "XLC"]
+HISTORY_SYMBOLS = ["SPY", "AAPL", "MSFT", "NVDA"]
+
+
+def _summarize(name, samples):
+    samples_ms = sorted(s * 1000 for s in samples)
+    p95 = samples_ms[min(len(samples_ms) - 1, int(len(samples_ms) * 0.95))]
+    print(
+        f"{name:<28} n={len(samples_ms):<4} "
+        f"p50={statistics.median(samples_ms):8.2f}ms  p95={p95:8.2f}ms  max={samples_ms[-1]:8.2f}ms"
+    )
+
+
+def _time(fn, iterations):
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark FinnIE market data lookups")
+    parser.add_argument("--provider", default="replay", choices=["replay", "record", "yfinance"])
+    parser.add_argument("--fixtures", default=os.getenv("MARKET_DATA_FIXTURES_DIR", "./data/fixtures/market"))
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    # Isolated history store so every run starts cold
+    os.environ["HISTORY_STORE_DIR"] = tempfile.mkdtemp(prefix="finnie-bench-")
+    os.environ["MARKET_DATA_FIXTURES_DIR"] = args.fixtures
+
+    from app.tools.market_data import MarketDataTool
+    from app.tools.providers import create_provider, set_provider
+    from app.tools.quote_cache import get_quote_cache
+
+    set_provider(create_provider(args.provider))
+    tool = MarketDataTool()
+    cache = get_quote_cache()
+
+    print(f"Provider: {args.provider}  Fixtures: {args.fixtures}")
+    print("=" * 80)
+
+    def cold_quotes():
+        cache.clear()
+        tool.get_stock_prices(INDICES + SECTORS)
+
+    _summarize("quotes 16 symbols (cold)", _time(cold_quotes, args.iterations))
+    _summarize("quotes 16 symbols (cached)", _time(lambda: tool.get_stock_prices(INDICES + SECTORS), args.iterations))
+    _summarize("history 1y x4 (first)", _time(lambda: tool.get_histories(HISTORY_SYMBOLS, period="1y"), 1))
+    _summarize("history 1y x4 (stored)", _time(lambda: tool.get_histories(HISTORY_SYMBOLS, period="1y"), args.iterations))
+
+    print("=" * 80)
+    print(f"Cache stats: {cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
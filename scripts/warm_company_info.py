@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Bulk warm-up for the persistent company profile cache.
+
+Fetches and stores company profiles so later get_company_info() calls are
+served from the database.
+
+    python scripts/warm_company_info.py AAPL MSFT NVDA
+    python scripts/warm_company_info.py --portfolio --file symbols.txt
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Warm the FinnIE company profile cache")
+    parser.add_argument("symbols", nargs="*", help="Symbols to warm")
+    parser.add_argument("--file", help="File with one symbol per line")
+    parser.add_argument("--portfolio", action="store_true", help="Include symbols held in the portfolio")
+    parser.add_argument("--force", action="store_true", help="Refetch even if the stored profile is fresh")
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    from app.tools.company_info import get_company_info_cache
+    from app.tools.prewarmer import portfolio_symbols
+
+    symbols = list(args.symbols)
+    if args.file:
+        with open(args.file) as f:
+            symbols += [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    if args.portfolio:
+        symbols += portfolio_symbols()
+
+    if not symbols:
+        parser.error("no symbols given (pass symbols, --file or --portfolio)")
+
+    start = time.perf_counter()
+    results = get_company_info_cache().warm(symbols, max_workers=args.workers, force=args.force)
+    elapsed = time.perf_counter() - start
+
+    failed = [s for s, ok in results.items() if not ok]
+    print(f"Warmed {len(results) - len(failed)}/{len(results)} company profiles in {elapsed:.1f}s")
+    if failed:
+        print(f"Failed: {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -18,6 +18,90 @@ os.environ["OLLAMA_BASE_URL"] = "http://localhost:11434"
 os.environ["EMBEDDING_MODEL"] = "nomic-embed-text"
 
 
+@pytest.fixture(autouse=True)
+def reset_quote_cache():
+    """Start every test with an empty process-wide quote cache."""
+    try:
+        from app.tools.quote_cache import get_quote_cache
+    except ImportError:
+        yield
+        return
+    get_quote_cache().clear()
+    yield
+    get_quote_cache().clear()
+
+
+@pytest.fixture
+def db_engine(tmp_path):
+    """A SQLAlchemy engine for a fresh SQLite app database with every table created."""
+    from sqlalchemy import create_engine
+    from app.database import Base
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db_session_factory(db_engine):
+    """Session factory bound to the temp app database (for stores that take session_factory)."""
+    from sqlalchemy.orm import sessionmaker
+
+    return sessionmaker(bind=db_engine)
+
+
+@pytest.fixture
+def make_lots():
+    """Builds tax lot arrays from (id, symbol, acquired_on, quantity, price) tuples."""
+    from types import SimpleNamespace
+    from app.tools.tax_lots import Lots
+
+    def build(rows):
+        return Lots.from_records(
+            SimpleNamespace(id=lot_id, symbol=symbol, acquired_on=acquired_on, quantity=quantity, price=price)
+            for lot_id, symbol, acquired_on, quantity, price in rows
+        )
+
+    return build
+
+
+@pytest.fixture
+def batch_frame():
+    """Builds a frame shaped like yf.download(..., group_by="ticker") from three closes per symbol."""
+    import pandas as pd
+
+    def build(closes_by_symbol):
+        dates = pd.date_range("2024-01-01", periods=3, freq="D")
+        columns = pd.MultiIndex.from_product([list(closes_by_symbol), ["Open", "Close"]])
+        frame = pd.DataFrame(index=dates, columns=columns, dtype=float)
+        for symbol, closes in closes_by_symbol.items():
+            frame[(symbol, "Close")] = closes
+            frame[(symbol, "Open")] = closes
+        return frame
+
+    return build
+
+
+@pytest.fixture
+def ohlcv_frame():
+    """Builds a group_by="ticker" OHLCV frame for the given symbols and dates."""
+    import pandas as pd
+
+    def build(symbols, dates, base=100.0):
+        index = pd.DatetimeIndex(pd.to_datetime(dates))
+        columns = pd.MultiIndex.from_product([symbols, ["Open", "High", "Low", "Close", "Volume"]])
+        frame = pd.DataFrame(index=index, columns=columns, dtype=float)
+        for i, symbol in enumerate(symbols):
+            closes = [base + i + n for n in range(len(index))]
+            for field in ["Open", "High", "Low", "Close"]:
+                frame[(symbol, field)] = closes
+            frame[(symbol, "Volume")] = 1000.0
+        return frame
+
+    return build
+
+
 @pytest.fixture
 def mock_openai_response():
     """Mock OpenAI API response."""
@@ -0,0 +1,19 @@
+"""
+Unit test configuration: keep the app's on-disk stores out of ./data.
+
+app.database binds its engine to DATABASE_PATH at import time, so the
+variables are set here, before any test module imports app code.
+"""
+
+import atexit
+import os
+import shutil
+import tempfile
+
+_DATA_DIR = tempfile.mkdtemp(prefix="finnie-tests-")
+atexit.register(shutil.rmtree, _DATA_DIR, ignore_errors=True)
+
+os.environ["DATABASE_PATH"] = os.path.join(_DATA_DIR, "portfolio.db")
+os.environ["HISTORY_STORE_DIR"] = os.path.join(_DATA_DIR, "history")
+os.environ["PRICE_MATRIX_DIR"] = os.path.join(_DATA_DIR, "history", "matrix")
+os.environ["INDICATOR_STATE_DIR"] = os.path.join(_DATA_DIR, "history", "indicators")
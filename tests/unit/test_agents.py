@@ -169,6 +169,89 @@ class TestPortfolioAgent:
 
         assert "couldn't identify" in response.lower() or "try" in response.lower()
 
+    @requires_app_imports
+    def test_diversification_report(self):
+        """Diversification questions report beta, volatility and correlation from the risk engine."""
+        import numpy as np
+        from app.agent.portfolio_agent import PortfolioAgent
+        from app.tools.portfolio_risk import compute_risk_matrices
+
+        rng = np.random.default_rng(0)
+        market = 100 * np.cumprod(1 + rng.normal(0, 0.01, 120))
+        closes = np.column_stack([market * 1.5, market * (1 + rng.normal(0, 0.02, 120))])
+        risk = compute_risk_matrices(closes, ["AAPL", "XOM"], market)
+
+        session = MagicMock()
+        session.query.return_value.all.return_value = [
+            MagicMock(symbol="AAPL", quantity=10, avg_price=100.0),
+            MagicMock(symbol="XOM", quantity=5, avg_price=100.0),
+        ]
+        agent = PortfolioAgent()
+        agent.market_tool = MagicMock()
+        agent.market_tool.get_stock_prices.return_value = {"AAPL": {"last_price": 150.0}, "XOM": {"error": "down"}}
+        agent.market_tool.get_risk_matrices.return_value = risk
+
+        with patch("app.agent.portfolio_agent.get_db", return_value=iter([session])):
+            response = agent.process_query("How diversified is my portfolio?")
+
+        agent.market_tool.get_risk_matrices.assert_called_once_with(["AAPL", "XOM"], benchmark="SPY", period="1y")
+        assert "Beta vs S&P 500" in response
+        # Weights are market value, with cost basis for holdings without a quote: 1500 vs 500
+        assert "| AAPL | 75.0% |" in response
+        assert "**Most correlated**: AAPL/XOM" in response
+
+    @requires_app_imports
+    def test_risk_report_skips_holdings_without_history(self):
+        """A holding with no price history is named in the report instead of voiding it."""
+        import numpy as np
+        from app.agent.portfolio_agent import PortfolioAgent
+        from app.tools.portfolio_risk import compute_risk_matrices
+
+        rng = np.random.default_rng(0)
+        market = 100 * np.cumprod(1 + rng.normal(0, 0.01, 120))
+        closes = np.column_stack([market * 1.5, np.full(120, np.nan)])
+        risk = compute_risk_matrices(closes, ["AAPL", "NEWCO"], market)
+
+        session = MagicMock()
+        session.query.return_value.all.return_value = [
+            MagicMock(symbol="AAPL", quantity=10, avg_price=100.0),
+            MagicMock(symbol="NEWCO", quantity=5, avg_price=100.0),
+        ]
+        agent = PortfolioAgent()
+        agent.market_tool = MagicMock()
+        agent.market_tool.get_stock_prices.return_value = {"AAPL": {"last_price": 150.0}}
+        agent.market_tool.get_risk_matrices.return_value = risk
+
+        with patch("app.agent.portfolio_agent.get_db", return_value=iter([session])):
+            response = agent.process_query("How diversified is my portfolio?")
+
+        assert "119 trading days" in response
+        assert "Not enough price history to include: NEWCO" in response
+        assert "| AAPL | 100.0% |" in response
+
+    @requires_app_imports
+    def test_add_and_sell_keep_tax_lots_in_step(self, db_session_factory):
+        """Chat trades go to the ledger: buys add lots, sells relieve them, no quote means no trade."""
+        from app.agent.portfolio_agent import PortfolioAgent
+        from app.tools.holdings import HoldingsBook
+        from app.tools.tax_lots import TaxLotLedger
+
+        agent = PortfolioAgent()
+        agent.market_tool = MagicMock()
+        agent.market_tool.get_stock_price.side_effect = lambda s: {"last_price": 150.0} if s == "AAPL" else None
+        agent._book = HoldingsBook(TaxLotLedger(session_factory=db_session_factory))
+        ledger = agent._book.ledger
+
+        assert "Successfully added" in agent.process_query("Add 10 shares of AAPL at $100")
+        agent.process_query("Add 10 AAPL")
+        assert "couldn't get a price" in agent.process_query("Add 5 XYZ")
+        assert "5 shares left" in agent.process_query("Sell 15 AAPL using LIFO")
+
+        assert ledger.lots().price.tolist() == [100.0, 150.0]
+        assert [(s.lot_id, s.quantity, s.price) for s in ledger.sales()] == [(2, 10, 150.0), (1, 5, 150.0)]
+        assert "Error selling" in agent.process_query("Sell 6 AAPL")
+        assert len(ledger.sales()) == 2
+
 
 class TestMarketAgent:
     """Tests for the Market Analysis Agent."""
@@ -223,6 +306,84 @@ class TestMarketAgent:
         assert "Healthcare" in agent.sectors
         assert "Financials" in agent.sectors
 
+    @requires_app_imports
+    def test_extract_multiple_tickers(self):
+        """Every ticker or company named in a query is extracted, in order."""
+        from app.agent.market_agent import MarketAnalysisAgent
+
+        agent = MarketAnalysisAgent()
+
+        assert agent._extract_tickers("technical analysis for AAPL, MSFT and NVDA") == ["AAPL", "MSFT", "NVDA"]
+        assert agent._extract_tickers("Compare Tesla vs AMD technicals") == ["TSLA", "AMD"]
+        assert agent._extract_ticker("show me rsi for aapl") == "AAPL"
+
+    @requires_app_imports
+    def test_lowercase_query_words_are_not_tickers(self):
+        """Lower-case words only count as tickers when they are known symbols or $-prefixed."""
+        from app.agent.market_agent import MarketAnalysisAgent
+
+        agent = MarketAnalysisAgent()
+
+        assert agent._extract_tickers("what is the price of apple") == ["AAPL"]
+        assert agent._extract_tickers("how are nvda and xle doing") == ["NVDA", "XLE"]
+        assert agent._extract_tickers("technicals for $pltr please") == ["PLTR"]
+        assert agent._extract_tickers("is it a good time to buy") == []
+        assert agent._extract_tickers("is ms a buy or should i hold o") == []
+        assert agent._extract_tickers("compare CAT and cat food makers") == ["CAT"]
+
+    @requires_app_imports
+    def test_multi_ticker_technical_analysis(self):
+        """Several tickers are analyzed with one indicator call and shown in one table."""
+        import numpy as np
+        import pandas as pd
+        from app.agent.market_agent import MarketAnalysisAgent
+        from app.tools.indicators import INDICATOR_COLUMNS
+
+        table = pd.DataFrame(np.nan, index=pd.Index(["AAPL", "MSFT", "NOPE"], name="symbol"), columns=INDICATOR_COLUMNS)
+        table.loc["AAPL", ["price", "ma20", "ma50", "rsi14", "macd_hist", "volatility20", "range_position"]] = [
+            110.0, 100.0, 100.0, 75.0, 1.0, 1.5, 90.0
+        ]
+        table.loc["MSFT", ["price", "ma20", "ma50", "rsi14", "macd_hist", "volatility20", "range_position"]] = [
+            90.0, 100.0, 100.0, 25.0, -1.0, 2.0, 10.0
+        ]
+
+        agent = MarketAnalysisAgent()
+        agent.market_tool = MagicMock()
+        agent.market_tool.get_indicators.return_value = table
+
+        response = agent.process_query("technical analysis for AAPL, MSFT and NOPE")
+
+        agent.market_tool.get_indicators.assert_called_once_with(["AAPL", "MSFT", "NOPE"], period="1y")
+        assert "| AAPL | $110.00 | +10.0% |" in response
+        assert "*Potentially overbought*: AAPL" in response
+        assert "*Potentially oversold*: MSFT" in response
+        assert "Could not fetch historical data for NOPE" in response
+
+    @requires_app_imports
+    def test_sector_rotation_report(self):
+        """Sector queries include relative strength and rotation phases for every sector."""
+        import pandas as pd
+        from app.agent.market_agent import MarketAnalysisAgent
+
+        agent = MarketAnalysisAgent()
+        symbols = list(agent.sectors.values())
+        table = pd.DataFrame(
+            {
+                "rs_1w": 0.5, "rs_1m": [2.0] + [-1.0] * (len(symbols) - 1), "rs_3m": 1.0, "rs_ytd": 3.0,
+                "quadrant": ["Leading"] + ["Weakening"] * (len(symbols) - 1),
+            },
+            index=pd.Index(symbols, name="symbol"),
+        )
+        agent.market_tool = MagicMock()
+        agent.market_tool.get_stock_prices.return_value = {}
+        agent.market_tool.get_sector_rotation.return_value = table
+
+        response = agent.process_query("Which sectors are showing relative strength?")
+
+        agent.market_tool.get_sector_rotation.assert_called_once_with(symbols, benchmark="SPY")
+        assert "| Technology (XLK) | +0.5% | +2.0% | +1.0% | +3.0% | Leading |" in response
+        assert "**Leading** (outperforming and still gaining): Technology" in response
+
 
 class TestGoalAgent:
     """Tests for the Goal Planning Agent."""
@@ -291,6 +452,151 @@ class TestNewsAgent:
         # Verify agent can be initialized
         assert agent is not None
 
+    @requires_app_imports
+    def test_market_news_fetched_concurrently(self):
+        """Every market ticker is covered, with fetches overlapping instead of running one by one."""
+        import threading
+        import time
+        from app.agent.news_agent import NewsSynthesizerAgent
+        from app.tools.async_market_data import AsyncMarketDataClient
+
+        lock = threading.Lock()
+        active = {"now": 0, "peak": 0}
+
+        def fake_news(symbol):
+            with lock:
+                active["now"] += 1
+                active["peak"] = max(active["peak"], active["now"])
+            time.sleep(0.05)
+            with lock:
+                active["now"] -= 1
+            if symbol == "DIA":
+                raise RuntimeError("down")
+            return [{"title": f"{symbol} headline", "publisher": "Wire", "providerPublishTime": 1700000000}]
+
+        agent = NewsSynthesizerAgent()
+        agent.market_tool = MagicMock()
+        agent.market_tool.get_news.side_effect = fake_news
+        agent.async_client = AsyncMarketDataClient(agent.market_tool, max_concurrency=4)
+        agent._analyze_market_sentiment = MagicMock(return_value=None)
+
+        response = agent.get_market_news()
+
+        assert agent.market_tool.get_news.call_count == len(agent.market_tickers)
+        assert 1 < active["peak"] <= 4
+        assert "NVDA headline" in response
+        assert "DIA headline" not in response
+
+    @requires_app_imports
+    def test_near_duplicate_headlines_not_sent_to_llm(self):
+        """Syndicated copies of a story are collapsed before rendering and before the sentiment call."""
+        from app.agent.news_agent import NewsSynthesizerAgent
+
+        feeds = {
+            "SPY": [{"title": "Stocks rally as inflation cools", "providerPublishTime": 1700000300}],
+            "QQQ": [{"title": "Stocks Rally As Inflation Cools - Reuters", "providerPublishTime": 1700000200}],
+            "AAPL": [{"title": "Apple unveils new iPhone lineup", "providerPublishTime": 1700000100}],
+        }
+        agent = NewsSynthesizerAgent()
+        agent.market_tool = MagicMock()
+        agent.market_tool.get_news.side_effect = lambda symbol: feeds.get(symbol, [])
+        agent.async_client.market_tool = agent.market_tool
+        agent._analyze_market_sentiment = MagicMock(return_value=None)
+
+        response = agent.get_market_news()
+
+        sent = [item["title"] for item in agent._analyze_market_sentiment.call_args.args[0]]
+        assert sent == ["Stocks rally as inflation cools", "Apple unveils new iPhone lineup"]
+        assert "Reuters" not in response
+
+    @requires_app_imports
+    def test_topical_query_answered_from_index(self):
+        """Topic words are not taken for tickers, and the index answers without fetching news."""
+        from app.agent.news_agent import NewsSynthesizerAgent
+
+        agent = NewsSynthesizerAgent()
+        agent.market_tool = MagicMock()
+        agent._news_index = MagicMock()
+        agent._news_index.search.return_value = [
+            {"title": "Chipmakers slide on new export rules", "publisher": "Reuters",
+             "link": "https://x/1", "timestamp": 1700000000, "symbols": ["NVDA", "AMD"]},
+        ]
+        agent._synthesize_news = MagicMock(return_value=None)
+
+        response = agent.process_query("news about chip export rules")
+
+        agent._news_index.search.assert_called_once()
+        agent.market_tool.get_news.assert_not_called()
+        assert "Chipmakers slide on new export rules" in response
+        assert "$NVDA $AMD" in response
+
+    @requires_app_imports
+    def test_lowercase_known_tickers_recognized(self):
+        """Known symbols count in any case; other lower-case words are topics, not tickers."""
+        from app.agent.news_agent import NewsSynthesizerAgent
+
+        agent = NewsSynthesizerAgent()
+
+        assert agent._extract_ticker("news on aapl") == "AAPL"
+        assert agent._extract_ticker("any news for $pltr?") == "PLTR"
+        assert agent._extract_ticker("latest on nvda and amd") == "NVDA"
+        assert agent._extract_ticker("news about chip export rules") is None
+        assert agent._extract_ticker("latest news") is None
+        assert agent._extract_ticker("news on the cat and ge rumors") is None
+        assert agent._extract_ticker("news on $ge") == "GE"
+
+    @requires_app_imports
+    def test_market_sentiment_from_stored_scores(self, db_session_factory):
+        """Headlines are scored in one batch, and a repeat request needs no scoring call."""
+        from app.agent.news_agent import NewsSynthesizerAgent
+        from app.tools.headline_sentiment import HeadlineSentimentStore
+
+        agent = NewsSynthesizerAgent()
+        agent._sentiment_store = HeadlineSentimentStore(session_factory=db_session_factory)
+        agent._score_headlines = MagicMock(return_value=[0.8, -0.4])
+        items = [
+            {"title": "Nvidia surges on record data center sales", "related_symbol": "NVDA"},
+            {"title": "Tesla slips after delivery miss", "related_symbol": "TSLA"},
+        ]
+
+        first = agent._analyze_market_sentiment(items)
+        second = agent._analyze_market_sentiment(items)
+
+        agent._score_headlines.assert_called_once()
+        assert first == second
+        assert first.startswith("Bullish (average +0.20 across 2 headlines")
+        assert "Most positive: $NVDA" in first and "most negative: $TSLA" in first
+
+    @requires_app_imports
+    def test_stock_news_reuses_stored_scores_and_summary(self, db_session_factory):
+        """A repeat stock news request with the same headlines makes no LLM call."""
+        from app.agent.news_agent import NewsSynthesizerAgent
+        from app.tools.headline_sentiment import HeadlineSentimentStore
+
+        agent = NewsSynthesizerAgent()
+        agent.market_tool = MagicMock()
+        agent.market_tool.get_news.return_value = [
+            {"title": "Apple beats on services", "providerPublishTime": 1700000100},
+            {"title": "Apple faces EU fine", "providerPublishTime": 1700000000},
+        ]
+        agent._sentiment_store = HeadlineSentimentStore(session_factory=db_session_factory)
+        agent._score_headlines = MagicMock(return_value=[0.6, -0.2])
+        agent._synthesize_news = MagicMock(return_value="Apple news is mixed.")
+
+        first = agent.get_stock_news("aapl")
+        second = agent.get_stock_news("AAPL")
+
+        assert first == second
+        assert "**Summary**: Apple news is mixed." in first
+        agent._score_headlines.assert_called_once()
+        agent._synthesize_news.assert_called_once()
+
+        agent.market_tool.get_news.return_value.append({"title": "Apple opens new store", "providerPublishTime": 1699999000})
+        agent._score_headlines.return_value = [0.3]
+        agent.get_stock_news("AAPL")
+        assert agent._score_headlines.call_args.args[0] == ["Apple opens new store"]
+        assert agent._synthesize_news.call_count == 2
+
 
 class TestTaxAgent:
     """Tests for the Tax Education Agent."""
@@ -325,3 +631,60 @@ class TestTaxAgent:
         response = agent.process_query("What are the 401k contribution limits?")
 
         assert isinstance(response, str)
+
+    @requires_app_imports
+    @patch("langchain_openai.ChatOpenAI")
+    def test_capital_gains_from_tax_lots(self, mock_llm_class, db_session_factory):
+        """Capital gains answers include the user's lots under the method asked for."""
+        from datetime import date, timedelta
+        from app.agent.tax_agent import TaxEducationAgent
+        from app.tools.tax_lots import TaxLotLedger
+
+        ledger = TaxLotLedger(session_factory=db_session_factory)
+        today = date.today()
+        ledger.add_lot("AAPL", 10, 100.0, today - timedelta(days=800))
+        ledger.add_lot("AAPL", 10, 150.0, today - timedelta(days=1))
+        ledger.record_sale("AAPL", 5, 160.0, today)
+
+        agent = TaxEducationAgent()
+        agent._ledger = ledger
+        agent._market_tool = MagicMock()
+        agent._market_tool.get_stock_prices.return_value = {"AAPL": {"last_price": 170.0}}
+
+        response = agent.process_query("What are my capital gains using HIFO?")
+
+        assert "Capital Gains Tax Guide" in response
+        assert "Your Capital Gains (HIFO)" in response
+        assert "short-term $+50.00, long-term $+0.00" in response
+        assert "| AAPL | 15 |" in response
+        assert "| FIFO | $+0.00 | $+300.00 |" in response
+
+    @requires_app_imports
+    @patch("langchain_openai.ChatOpenAI")
+    def test_tax_loss_harvesting_scan(self, mock_llm_class, db_session_factory):
+        """Harvesting answers rank the user's losing lots and flag wash-sale conflicts."""
+        from datetime import date, timedelta
+        from app.agent.tax_agent import TaxEducationAgent
+        from app.tools.tax_lots import TaxLotLedger
+
+        ledger = TaxLotLedger(session_factory=db_session_factory)
+        today = date.today()
+        ledger.add_lot("TSLA", 10, 300.0, today - timedelta(days=200))
+        ledger.add_lot("NVDA", 5, 150.0, today - timedelta(days=100))
+        ledger.add_lot("NVDA", 1, 100.0, today - timedelta(days=10))
+
+        agent = TaxEducationAgent()
+        agent._ledger = ledger
+        agent._market_tool = MagicMock()
+        agent._market_tool.get_stock_prices.return_value = {
+            "TSLA": {"last_price": 250.0}, "NVDA": {"last_price": 110.0}
+        }
+
+        response = agent.process_query("Any tax loss harvesting opportunities?")
+
+        assert "Wash Sale Rule" in response
+        rows = [line for line in response.splitlines() if line.startswith("| TSLA") or line.startswith("| NVDA")]
+        assert rows[0].startswith("| TSLA") and "Clear" in rows[0]
+        assert "wait until" in rows[1]
+        assert "$-500.00" in rows[0]
+        assert "1 lot(s) blocked by wash-sale windows" in response
@@ -0,0 +1,95 @@
+"""
+Unit tests for the asyncio market data client.
+
+Note: These tests require pandas/yfinance.
+Tests will be skipped if imports fail (e.g., in some local environments).
+"""
+
+import pytest
+import os
+import sys
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+# Check if app imports are available
+_IMPORTS_AVAILABLE = True
+_IMPORT_ERROR = ""
+try:
+    import yfinance
+    import pandas as pd
+except (ImportError, ValueError, Exception) as e:
+    _IMPORTS_AVAILABLE = False
+    _IMPORT_ERROR = str(e)
+
+requires_app_imports = pytest.mark.skipif(
+    not _IMPORTS_AVAILABLE,
+    reason=f"App imports not available: {_IMPORT_ERROR[:100] if _IMPORT_ERROR else 'unknown'}"
+)
+
+
+@requires_app_imports
+class TestAsyncMarketDataClient:
+    """Tests for the asyncio client with bounded concurrency."""
+
+    def test_semaphore_bounds_concurrency(self):
+        """No more than max_concurrency fetches run at the same time."""
+        import threading
+        import time
+        from unittest.mock import MagicMock
+        from app.tools.async_market_data import AsyncMarketDataClient, run_sync
+
+        lock = threading.Lock()
+        active = {"now": 0, "peak": 0}
+
+        def fake_news(symbol):
+            with lock:
+                active["now"] += 1
+                active["peak"] = max(active["peak"], active["now"])
+            time.sleep(0.05)
+            with lock:
+                active["now"] -= 1
+            return [{"title": symbol}]
+
+        tool = MagicMock()
+        tool.get_news.side_effect = fake_news
+        client = AsyncMarketDataClient(market_tool=tool, max_concurrency=2)
+
+        news = run_sync(client.get_news_many(["SPY", "QQQ", "DIA", "AAPL", "MSFT"]))
+
+        assert active["peak"] == 2
+        assert news["AAPL"] == [{"title": "AAPL"}]
+
+    def test_failed_symbol_maps_to_empty_list(self):
+        """One failing news fetch does not fail the whole gather."""
+        from unittest.mock import MagicMock
+        from app.tools.async_market_data import AsyncMarketDataClient, run_sync
+
+        def fake_news(symbol):
+            if symbol == "BAD":
+                raise RuntimeError("down")
+            return [{"title": symbol}]
+
+        tool = MagicMock()
+        tool.get_news.side_effect = fake_news
+        client = AsyncMarketDataClient(market_tool=tool, max_concurrency=4)
+
+        news = run_sync(client.get_news_many(["SPY", "BAD"]))
+
+        assert news == {"SPY": [{"title": "SPY"}], "BAD": []}
+
+    def test_run_sync_refuses_running_loop(self):
+        """run_sync raises instead of blocking an event loop already running in the thread."""
+        import asyncio
+        from app.tools.async_market_data import run_sync
+
+        async def inner():
+            return 7
+
+        async def outer():
+            with pytest.raises(RuntimeError, match="await the coroutine"):
+                run_sync(inner())
+            return await inner()
+
+        assert asyncio.run(outer()) == 7
+        assert run_sync(inner()) == 7
@@ -0,0 +1,136 @@
+"""
+Unit tests for the per-request market data snapshot.
+
+Note: These tests require pandas/yfinance.
+Tests will be skipped if imports fail (e.g., in some local environments).
+"""
+
+import pytest
+import os
+import sys
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+# Check if app imports are available
+_IMPORTS_AVAILABLE = True
+_IMPORT_ERROR = ""
+try:
+    import yfinance
+    import pandas as pd
+except (ImportError, ValueError, Exception) as e:
+    _IMPORTS_AVAILABLE = False
+    _IMPORT_ERROR = str(e)
+
+requires_app_imports = pytest.mark.skipif(
+    not _IMPORTS_AVAILABLE,
+    reason=f"App imports not available: {_IMPORT_ERROR[:100] if _IMPORT_ERROR else 'unknown'}"
+)
+
+
+@requires_app_imports
+class TestMarketSnapshot:
+    """Tests for the per-request market snapshot."""
+
+    def _tool(self, provider):
+        from unittest.mock import MagicMock
+        from app.tools.market_data import MarketDataTool
+        from app.tools.quote_cache import QuoteCache
+        from app.tools.singleflight import SingleFlight
+
+        # The quote cache never serves a hit, so only the snapshot can avoid a fetch
+        calendar = MagicMock()
+        calendar.quote_ttl.return_value = 0
+        return MarketDataTool(
+            cache=QuoteCache(ttl=0, max_size=10, stale_ttl=0),
+            flights=SingleFlight(),
+            history_store=MagicMock(),
+            provider=provider,
+            calendar=calendar,
+        )
+
+    def test_one_fetch_per_symbol_within_a_request(self, batch_frame):
+        """Overview, sector and VIX lookups in one snapshot download each symbol once."""
+        from unittest.mock import MagicMock
+        from app.tools.market_snapshot import market_snapshot
+
+        provider = MagicMock()
+        provider.download.return_value = batch_frame({
+            "^GSPC": [1.0, 2.0, 3.0], "^VIX": [15.0, 16.0, 17.0], "XLK": [4.0, 5.0, 6.0],
+        })
+        tool = self._tool(provider)
+
+        with market_snapshot() as snapshot:
+            tool.get_stock_prices(["^GSPC", "^VIX", "XLK"])
+            tool.get_stock_prices(["^GSPC", "^VIX"])
+            tool.get_stock_prices(["XLK"])
+            vix = tool.get_stock_price("^vix")
+
+        provider.download.assert_called_once()
+        provider.get_quote.assert_not_called()
+        assert vix["last_price"] == 17.0
+        assert snapshot.fetches == 1
+
+    def test_nested_blocks_share_the_snapshot(self):
+        """An inner block (an agent method) reuses the outer request's snapshot."""
+        from unittest.mock import MagicMock
+        from app.tools.market_snapshot import current_snapshot, market_snapshot
+
+        tool = self._tool(MagicMock())
+        tool.history_store.get_history.return_value = pd.DataFrame({"Close": [1.0]})
+
+        with market_snapshot() as outer:
+            tool.get_history("SPY", period="1mo")
+            with market_snapshot() as inner:
+                assert inner is outer
+                tool.get_history("spy", period="1mo")
+            assert current_snapshot() is outer
+        assert current_snapshot() is None
+        tool.history_store.get_history.assert_called_once()
+
+    def test_failed_lookups_are_retried(self):
+        """A quote that failed is fetched again instead of repeating the failure."""
+        from unittest.mock import MagicMock
+        from app.tools.market_snapshot import market_snapshot
+
+        provider = MagicMock()
+        provider.get_quote.side_effect = [Exception("timeout"), {"last_price": 11.0, "previous_close": 10.0}]
+        tool = self._tool(provider)
+
+        with market_snapshot():
+            assert tool.get_stock_price("AAPL") is None
+            assert tool.get_stock_price("AAPL")["last_price"] == 11.0
+            assert tool.get_stock_price("AAPL")["last_price"] == 11.0
+        assert provider.get_quote.call_count == 2
+
+    def test_batch_lookups_retry_failed_entries(self):
+        """get_many refetches only the entries the reuse check rejects."""
+        from app.tools.market_data import _is_quote
+        from app.tools.market_snapshot import MarketSnapshot
+
+        snapshot = MarketSnapshot()
+        calls = []
+
+        def fetch_many(keys):
+            calls.append(list(keys))
+            return {k: ({"error": "timeout"} if k == "MSFT" and len(calls) == 1 else {"last_price": 1.0}) for k in keys}
+
+        first = snapshot.get_many(["AAPL", "MSFT"], fetch_many, reuse=_is_quote)
+        second = snapshot.get_many(["AAPL", "MSFT"], fetch_many, reuse=_is_quote)
+
+        assert "error" in first["MSFT"]
+        assert second["MSFT"] == {"last_price": 1.0}
+        assert calls == [["AAPL", "MSFT"], ["MSFT"]]
+        assert snapshot.hits == 1
+
+    def test_no_snapshot_outside_a_request(self, batch_frame):
+        """Without a block every call goes through the normal cache path."""
+        from unittest.mock import MagicMock
+
+        provider = MagicMock()
+        provider.download.return_value = batch_frame({"SPY": [99.0, 100.0, 101.0]})
+        tool = self._tool(provider)
+
+        tool.get_stock_prices(["SPY"])
+        tool.get_stock_prices(["SPY"])
+        assert provider.download.call_count == 2
@@ -0,0 +1,146 @@
+"""
+Unit tests for portfolio correlation, covariance and beta.
+
+Note: These tests require pandas/yfinance.
+Tests will be skipped if imports fail (e.g., in some local environments).
+"""
+
+import pytest
+from unittest.mock import patch
+import os
+import sys
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+# Check if app imports are available
+_IMPORTS_AVAILABLE = True
+_IMPORT_ERROR = ""
+try:
+    import yfinance
+    import pandas as pd
+except (ImportError, ValueError, Exception) as e:
+    _IMPORTS_AVAILABLE = False
+    _IMPORT_ERROR = str(e)
+
+requires_app_imports = pytest.mark.skipif(
+    not _IMPORTS_AVAILABLE,
+    reason=f"App imports not available: {_IMPORT_ERROR[:100] if _IMPORT_ERROR else 'unknown'}"
+)
+
+
+@requires_app_imports
+class TestPortfolioRisk:
+    """Tests for the correlation, covariance and beta engine."""
+
+    def _closes(self, n=250, seed=11):
+        import numpy as np
+
+        rng = np.random.default_rng(seed)
+        market = rng.normal(0.0005, 0.01, n)
+        returns = np.column_stack([
+            1.2 * market + rng.normal(0, 0.005, n),
+            0.5 * market + rng.normal(0, 0.01, n),
+            rng.normal(0, 0.015, n),
+        ])
+        closes = 100 * np.cumprod(1 + returns, axis=0)
+        benchmark = 100 * np.cumprod(1 + market)
+        return closes, benchmark
+
+    def test_matches_pandas(self):
+        """Correlation, covariance and beta match pandas on the same returns."""
+        import numpy as np
+        from app.tools.portfolio_risk import compute_risk_matrices
+
+        closes, benchmark = self._closes()
+        closes[10, 2] = np.nan   # missing bar: the day is dropped for every symbol
+        risk = compute_risk_matrices(closes, ["a", "b", "c"], benchmark)
+
+        frame = pd.DataFrame(np.column_stack([closes, benchmark]), columns=["A", "B", "C", "SPY"])
+        returns = frame.dropna().pct_change().dropna()
+        assert risk.observations == len(returns)
+        assert np.allclose(risk.correlation, returns[["A", "B", "C"]].corr())
+        assert np.allclose(risk.covariance, returns[["A", "B", "C"]].cov() * 252)
+        expected_beta = returns.cov()["SPY"][["A", "B", "C"]] / returns["SPY"].var()
+        assert np.allclose(risk.beta, expected_beta)
+        assert risk.beta["A"] == pytest.approx(1.2, abs=0.1)
+
+    def test_days_only_other_symbols_traded_are_skipped(self):
+        """Extra calendar rows (e.g. weekend bars of another matrix symbol) do not shrink the sample."""
+        import numpy as np
+        from app.tools.portfolio_risk import compute_risk_matrices
+
+        closes, benchmark = self._closes()
+        dense = compute_risk_matrices(closes, ["A", "B", "C"], benchmark)
+
+        # Two empty rows after every fifth day, as on a union calendar with a 7-day symbol
+        rows = np.repeat(np.arange(len(closes)), np.where(np.arange(len(closes)) % 5 == 4, 3, 1))
+        gaps = np.zeros(len(rows), dtype=bool)
+        gaps[1:] = rows[1:] == rows[:-1]
+        sparse_closes, sparse_benchmark = closes[rows].copy(), benchmark[rows].copy()
+        sparse_closes[gaps], sparse_benchmark[gaps] = np.nan, np.nan
+        sparse = compute_risk_matrices(sparse_closes, ["A", "B", "C"], sparse_benchmark)
+
+        assert sparse.observations == dense.observations == len(closes) - 1
+        assert np.allclose(sparse.covariance, dense.covariance)
+
+    def test_holdings_without_history_are_excluded(self):
+        """A holding with no or too few bars is reported, not allowed to empty the common days."""
+        import numpy as np
+        from app.tools.portfolio_risk import compute_risk_matrices
+
+        closes, benchmark = self._closes()
+        closes[:, 1] = np.nan          # unknown ticker: no bars at all
+        closes[:-10, 2] = np.nan       # recent IPO: ten bars
+        risk = compute_risk_matrices(closes, ["A", "B", "C"], benchmark)
+        alone = compute_risk_matrices(closes[:, :1], ["A"], benchmark)
+
+        assert risk.symbols == ["A"]
+        assert risk.excluded == ["B", "C"]
+        assert risk.observations == len(closes) - 1
+        assert np.allclose(risk.covariance, alone.covariance)
+        assert risk.portfolio({"A": 500.0, "B": 500.0})["beta"] == pytest.approx(risk.beta["A"])
+
+    def test_portfolio_statistics(self):
+        """Weights give portfolio beta, volatility and the diversification ratio."""
+        import numpy as np
+        from app.tools.portfolio_risk import compute_risk_matrices
+
+        closes, benchmark = self._closes()
+        risk = compute_risk_matrices(closes, ["A", "B", "C"], benchmark)
+
+        single = risk.portfolio({"A": 1000.0})
+        assert single["beta"] == pytest.approx(risk.beta["A"])
+        assert single["diversification_ratio"] == pytest.approx(1.0)
+
+        stats = risk.portfolio({"A": 500.0, "B": 250.0, "C": 250.0})
+        w = np.array([0.5, 0.25, 0.25])
+        assert stats["beta"] == pytest.approx(w @ risk.beta.to_numpy())
+        assert stats["volatility"] == pytest.approx(np.sqrt(w @ risk.covariance.to_numpy() @ w) * 100)
+        assert stats["diversification_ratio"] > 1.0
+        assert risk.most_correlated(1)[0][:2] == ("A", "B")
+
+    def test_cached_until_prices_change(self, tmp_path):
+        """The matrices are reused until the price matrix is rebuilt."""
+        from unittest.mock import MagicMock, patch
+        from app.tools.market_data import MarketDataTool
+        from app.tools.portfolio_risk import RiskMatrixCache
+
+        closes, benchmark = self._closes()
+        matrix = MagicMock()
+        matrix.ensure.return_value = matrix
+        matrix.built_at = 1.0
+        matrix.matrix.return_value = closes[:, :2]
+        matrix.column.return_value = benchmark
+        cache = RiskMatrixCache()
+
+        with patch("app.tools.market_data.get_price_matrix", return_value=matrix), \
+                patch("app.tools.market_data.get_risk_matrix_cache", return_value=cache):
+            tool = MarketDataTool(history_store=MagicMock())
+            first = tool.get_risk_matrices(["MSFT", "aapl"])
+            assert tool.get_risk_matrices(["AAPL", "MSFT"]) is first
+            assert first.symbols == ["AAPL", "MSFT"]
+
+            matrix.built_at = 2.0
+            assert tool.get_risk_matrices(["AAPL", "MSFT"]) is not first
+        assert (cache.hits, cache.misses) == (1, 2)
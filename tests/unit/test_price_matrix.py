@@ -0,0 +1,169 @@
+"""
+Unit tests for the memory-mapped date x symbol price matrix.
+
+Note: These tests require pandas/yfinance.
+Tests will be skipped if imports fail (e.g., in some local environments).
+"""
+
+import pytest
+import os
+import sys
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+# Check if app imports are available
+_IMPORTS_AVAILABLE = True
+_IMPORT_ERROR = ""
+try:
+    import yfinance
+    import pandas as pd
+except (ImportError, ValueError, Exception) as e:
+    _IMPORTS_AVAILABLE = False
+    _IMPORT_ERROR = str(e)
+
+requires_app_imports = pytest.mark.skipif(
+    not _IMPORTS_AVAILABLE,
+    reason=f"App imports not available: {_IMPORT_ERROR[:100] if _IMPORT_ERROR else 'unknown'}"
+)
+
+
+@requires_app_imports
+class TestPriceMatrix:
+    """Tests for the memory-mapped date x symbol matrix."""
+
+    def _store(self):
+        from unittest.mock import MagicMock
+
+        today = pd.Timestamp.today().normalize()
+        d1, d2, d3 = today - pd.Timedelta(days=3), today - pd.Timedelta(days=2), today - pd.Timedelta(days=1)
+        aapl = pd.DataFrame(
+            {"Close": [10.0, 11.0, 12.0], "Volume": [100.0, 110.0, 120.0]}, index=pd.DatetimeIndex([d1, d2, d3])
+        )
+        msft = pd.DataFrame({"Close": [20.0, 22.0], "Volume": [200.0, 220.0]}, index=pd.DatetimeIndex([d1, d3]))
+        store = MagicMock()
+        store.get_histories.side_effect = lambda symbols, period: {
+            s: {"AAPL": aapl, "MSFT": msft}.get(s, pd.DataFrame(columns=["Close", "Volume"])) for s in symbols
+        }
+        return store, (d1, d2, d3)
+
+    def test_build_aligns_dates(self, tmp_path):
+        """Symbols share one calendar; missing bars are NaN."""
+        import numpy as np
+        from app.tools.price_matrix import PriceMatrix
+
+        store, (d1, d2, d3) = self._store()
+        matrix = PriceMatrix(directory=str(tmp_path), history_store=store)
+        matrix.build(["aapl", "MSFT"], period="1mo")
+
+        closes = matrix.matrix("close")
+        assert closes.shape == (3, 2)
+        assert matrix.symbols == ["AAPL", "MSFT"]
+        assert np.isnan(closes[1, 1])
+        assert list(matrix.column("MSFT", field="volume", start=str(d3.date()))) == [220.0]
+
+    def test_slices_are_views_of_mapped_file(self, tmp_path):
+        """Full-width ranges and single columns never copy."""
+        import numpy as np
+        from app.tools.price_matrix import PriceMatrix
+
+        store, (d1, d2, d3) = self._store()
+        matrix = PriceMatrix(directory=str(tmp_path), history_store=store)
+        matrix.build(["AAPL", "MSFT"], period="1mo")
+
+        base = matrix.matrix("close")
+        assert isinstance(base, np.memmap)
+        assert np.shares_memory(matrix.matrix("close", start=str(d2.date())), base)
+        assert np.shares_memory(matrix.column("AAPL"), base)
+
+    def test_reload_and_ensure(self, tmp_path):
+        """A new instance maps the files from disk; ensure only rebuilds when needed."""
+        from app.tools.price_matrix import PriceMatrix
+
+        store, _ = self._store()
+        PriceMatrix(directory=str(tmp_path), history_store=store).build(["AAPL"], period="1mo")
+
+        matrix = PriceMatrix(directory=str(tmp_path), history_store=store, refresh_seconds=3600)
+        assert "AAPL" in matrix
+        matrix.ensure(["AAPL"], period="5d")
+        assert store.get_histories.call_count == 1
+
+        matrix.ensure(["MSFT"], period="5d")
+        assert matrix.symbols == ["AAPL", "MSFT"]
+        assert matrix.period == "1mo"
+        assert list(matrix.frame(symbols=["msft"]).columns) == ["MSFT"]
+
+    def test_ensure_ignores_junk_symbols(self, tmp_path):
+        """Invalid tickers and tickers without history stay out and do not force rebuilds."""
+        import numpy as np
+        from app.tools.price_matrix import PriceMatrix
+
+        store, _ = self._store()
+        matrix = PriceMatrix(directory=str(tmp_path), history_store=store, refresh_seconds=3600)
+        snapshot = matrix.ensure(["AAPL", "WHAT", "what's", ""], period="5d")
+
+        assert snapshot.symbols == ["AAPL"]
+        assert np.isnan(snapshot.matrix("close", ["WHAT", "AAPL"])[:, 0]).all()
+        assert np.isnan(snapshot.column("WHAT")).all()
+        assert store.get_histories.call_args.args[0] == ["AAPL", "WHAT"]
+
+        matrix.ensure(["AAPL", "WHAT"], period="5d")
+        assert store.get_histories.call_count == 1
+
+    def test_universe_is_capped_least_recently_used_first(self, tmp_path):
+        """Past max_symbols the symbols requested longest ago are dropped at the next rebuild."""
+        from app.tools.price_matrix import PriceMatrix
+
+        store, _ = self._store()
+        bars = store.get_histories(["AAPL"], "1mo")["AAPL"]
+        store.get_histories.side_effect = lambda symbols, period: {s: bars for s in symbols}
+        matrix = PriceMatrix(directory=str(tmp_path), history_store=store, refresh_seconds=3600, max_symbols=3)
+
+        matrix.ensure(["AAA", "BBB"], period="5d")
+        matrix.ensure(["CCC"], period="5d")
+        matrix.ensure(["AAA"], period="5d")
+        matrix.ensure(["DDD"], period="5d")
+
+        assert matrix.symbols == ["AAA", "CCC", "DDD"]
+
+    def test_snapshot_survives_rebuild(self, tmp_path):
+        """A snapshot taken before a rebuild keeps its own symbols, dates and arrays."""
+        from app.tools.price_matrix import PriceMatrix
+
+        store, _ = self._store()
+        matrix = PriceMatrix(directory=str(tmp_path), history_store=store, refresh_seconds=3600)
+        before = matrix.ensure(["MSFT"], period="5d")
+        after = matrix.ensure(["AAPL"], period="5d")
+
+        assert before.symbols == ["MSFT"] and after.symbols == ["MSFT", "AAPL"]
+        assert before.matrix("close").shape == (len(before.dates), 1)
+        assert list(before.column("MSFT")) == [20.0, 22.0]
+
+
+    def test_rebuild_downloads_outside_the_lock(self, tmp_path):
+        """While a rebuild downloads, held symbols are served and a concurrent miss joins the same build."""
+        import threading
+        from concurrent.futures import ThreadPoolExecutor
+        from app.tools.price_matrix import PriceMatrix
+
+        store, _ = self._store()
+        fetch = store.get_histories.side_effect
+        matrix = PriceMatrix(directory=str(tmp_path), history_store=store, refresh_seconds=3600)
+        matrix.ensure(["AAPL"], period="5d")
+
+        downloading, release = threading.Event(), threading.Event()
+
+        def slow_fetch(symbols, period):
+            downloading.set()
+            release.wait(5)
+            return fetch(symbols, period)
+
+        store.get_histories.side_effect = slow_fetch
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            first = pool.submit(matrix.ensure, ["MSFT"], "5d")
+            assert downloading.wait(5)
+            second = pool.submit(matrix.ensure, ["MSFT"], "5d")
+            assert matrix.ensure(["AAPL"], period="5d").symbols == ["AAPL"]
+            release.set()
+            assert first.result(5).symbols == second.result(5).symbols == ["AAPL", "MSFT"]
+        assert store.get_histories.call_count == 2
@@ -0,0 +1,126 @@
+"""
+Unit tests for the market data providers and offline record/replay.
+
+Note: These tests require pandas/yfinance.
+Tests will be skipped if imports fail (e.g., in some local environments).
+"""
+
+import pytest
+import os
+import sys
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+# Check if app imports are available
+_IMPORTS_AVAILABLE = True
+_IMPORT_ERROR = ""
+try:
+    import yfinance
+    import pandas as pd
+except (ImportError, ValueError, Exception) as e:
+    _IMPORTS_AVAILABLE = False
+    _IMPORT_ERROR = str(e)
+
+requires_app_imports = pytest.mark.skipif(
+    not _IMPORTS_AVAILABLE,
+    reason=f"App imports not available: {_IMPORT_ERROR[:100] if _IMPORT_ERROR else 'unknown'}"
+)
+
+
+@requires_app_imports
+class TestReplayProvider:
+    """Tests for the pluggable provider and the offline record/replay backend."""
+
+    def _upstream(self, ohlcv_frame):
+        from unittest.mock import MagicMock
+
+        today = pd.Timestamp.today().normalize()
+        upstream = MagicMock()
+        upstream.get_quote.return_value = {"last_price": 110.0, "previous_close": 100.0}
+        upstream.get_news.return_value = [{"title": "Apple Reports Strong Earnings"}]
+        upstream.get_info.return_value = {"longBusinessSummary": "Apple designs phones."}
+        upstream.download.return_value = ohlcv_frame(
+            ["AAPL", "MSFT"], [today - pd.Timedelta(days=2), today - pd.Timedelta(days=1)]
+        )
+        return upstream
+
+    def test_record_then_replay(self, tmp_path, ohlcv_frame):
+        """Responses captured in record mode are served offline in replay mode."""
+        from app.tools.providers import ReplayProvider
+
+        recorder = ReplayProvider(str(tmp_path), record=True, upstream=self._upstream(ohlcv_frame))
+        recorder.get_quote("AAPL")
+        recorder.get_news("AAPL")
+        recorder.get_info("AAPL")
+        recorder.download(["AAPL", "MSFT"], period="1mo")
+
+        replay = ReplayProvider(str(tmp_path))
+        assert replay.get_quote("AAPL")["last_price"] == 110.0
+        assert replay.get_news("AAPL")[0]["title"] == "Apple Reports Strong Earnings"
+        assert "Apple" in replay.get_info("AAPL")["longBusinessSummary"]
+
+        frame = replay.download(["AAPL", "MSFT", "NOPE"], period="1mo")
+        assert list(frame["MSFT"]["Close"]) == [101.0, 102.0]
+        assert "NOPE" not in frame.columns.get_level_values(0)
+
+    def test_old_fixtures_replay_their_last_bars(self, tmp_path, ohlcv_frame):
+        """Periods count back from a fixture's last bar, so quotes replay weeks after recording."""
+        from unittest.mock import MagicMock
+        from app.tools.market_data import MarketDataTool
+        from app.tools.providers import ReplayProvider
+        from app.tools.quote_cache import QuoteCache
+        from app.tools.singleflight import SingleFlight
+
+        upstream = MagicMock()
+        upstream.download.return_value = ohlcv_frame(["SPY"], pd.bdate_range("2024-03-01", "2024-03-29"))
+        ReplayProvider(str(tmp_path), record=True, upstream=upstream).download(["SPY"], period="1mo")
+
+        replay = ReplayProvider(str(tmp_path))
+        assert list(replay.download(["SPY"], period="5d")["SPY"].index.day) == [25, 26, 27, 28, 29]
+        tool = MarketDataTool(
+            cache=QuoteCache(ttl=60, max_size=10, stale_ttl=0), flights=SingleFlight(),
+            history_store=MagicMock(), provider=replay,
+        )
+        assert tool.get_stock_prices(["SPY"])["SPY"]["last_price"] == 120.0
+
+    def test_missing_fixture_raises(self, tmp_path):
+        """Replay never falls through to the network."""
+        from app.tools.providers import FixtureNotFoundError, ReplayProvider
+
+        with pytest.raises(FixtureNotFoundError):
+            ReplayProvider(str(tmp_path)).get_quote("AAPL")
+
+    def test_market_data_tool_uses_provider(self, tmp_path, ohlcv_frame):
+        """MarketDataTool quotes and batches resolve through the configured provider."""
+        from app.tools.market_data import MarketDataTool
+        from app.tools.history_store import HistoryStore
+        from app.tools.providers import ReplayProvider
+        from app.tools.quote_cache import QuoteCache
+        from app.tools.singleflight import SingleFlight
+
+        fixtures = tmp_path / "fixtures"
+        recorder = ReplayProvider(str(fixtures), record=True, upstream=self._upstream(ohlcv_frame))
+        recorder.get_quote("AAPL")
+        recorder.download(["AAPL", "MSFT"], period="1mo")
+
+        replay = ReplayProvider(str(fixtures))
+        tool = MarketDataTool(
+            cache=QuoteCache(ttl=60, max_size=10, stale_ttl=0),
+            flights=SingleFlight(),
+            history_store=HistoryStore(directory=str(tmp_path / "history"), flights=SingleFlight(), provider=replay),
+            provider=replay,
+        )
+
+        assert tool.get_stock_price("AAPL")["change_percent"] == pytest.approx(10.0)
+        assert tool.get_stock_prices(["MSFT"])["MSFT"]["last_price"] == 102.0
+        assert list(tool.get_history("AAPL", period="1mo")["Close"]) == [100.0, 101.0]
+
+    def test_create_provider(self):
+        """Provider is selected by name."""
+        from app.tools.providers import ReplayProvider, YFinanceProvider, create_provider
+
+        assert isinstance(create_provider("yfinance"), YFinanceProvider)
+        assert isinstance(create_provider("replay"), ReplayProvider)
+        with pytest.raises(ValueError):
+            create_provider("bloomberg")
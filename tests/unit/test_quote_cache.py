@@ -0,0 +1,120 @@
+"""
+Unit tests for the process-wide TTL/LRU quote cache.
+
+Note: These tests require pandas/yfinance.
+Tests will be skipped if imports fail (e.g., in some local environments).
+"""
+
+import pytest
+from unittest.mock import patch
+import os
+import sys
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+# Check if app imports are available
+_IMPORTS_AVAILABLE = True
+_IMPORT_ERROR = ""
+try:
+    import yfinance
+    import pandas as pd
+except (ImportError, ValueError, Exception) as e:
+    _IMPORTS_AVAILABLE = False
+    _IMPORT_ERROR = str(e)
+
+requires_app_imports = pytest.mark.skipif(
+    not _IMPORTS_AVAILABLE,
+    reason=f"App imports not available: {_IMPORT_ERROR[:100] if _IMPORT_ERROR else 'unknown'}"
+)
+
+
+class TestQuoteCache:
+    """Tests for the process-wide TTL/LRU quote cache."""
+
+    def test_hit_and_miss_counters(self):
+        """Second lookup of the same key is a hit and skips the fetch."""
+        from app.tools.quote_cache import QuoteCache
+
+        cache = QuoteCache(ttl=60, max_size=10, stale_ttl=0)
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            return {"last_price": 1.0}
+
+        assert cache.get_or_fetch("AAPL", fetch) == {"last_price": 1.0}
+        assert cache.get_or_fetch("AAPL", fetch) == {"last_price": 1.0}
+
+        stats = cache.stats()
+        assert len(calls) == 1
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+
+    def test_lru_eviction(self):
+        """The least recently used entry is evicted when the cache is full."""
+        from app.tools.quote_cache import QuoteCache
+
+        cache = QuoteCache(ttl=60, max_size=2, stale_ttl=0)
+        cache.set("A", 1)
+        cache.set("B", 2)
+        cache.get("A")  # A becomes most recently used
+        cache.set("C", 3)
+
+        assert cache.peek("B") is None
+        assert cache.peek("A") == 1
+        assert cache.stats()["evictions"] == 1
+
+    def test_errors_are_not_cached(self):
+        """Error results are returned but not stored."""
+        from app.tools.quote_cache import QuoteCache
+
+        cache = QuoteCache(ttl=60, max_size=10, stale_ttl=0)
+        result = cache.get_many_or_fetch(["BAD"], lambda keys: {"BAD": {"error": "x"}})
+
+        assert result["BAD"] == {"error": "x"}
+        assert cache.peek("BAD") is None
+
+    def test_stale_while_revalidate(self):
+        """Stale values are served immediately while one background refresh runs."""
+        import threading
+        from app.tools.quote_cache import QuoteCache
+
+        cache = QuoteCache(ttl=0, max_size=10, stale_ttl=60)
+        cache.set("AAPL", "old")
+
+        release = threading.Event()
+        refreshed = threading.Event()
+        calls = []
+
+        def fetch_many(keys):
+            calls.append(list(keys))
+            release.wait(5)
+            refreshed.set()
+            return {key: "new" for key in keys}
+
+        assert cache.get_many_or_fetch(["AAPL"], fetch_many) == {"AAPL": "old"}
+        assert cache.get_many_or_fetch(["AAPL"], fetch_many) == {"AAPL": "old"}
+        release.set()
+        assert refreshed.wait(5)
+
+        assert calls == [["AAPL"]]
+        assert cache.stats()["stale_hits"] == 2
+
+    @requires_app_imports
+    @patch("yfinance.download")
+    def test_batch_fetches_only_misses(self, mock_download, batch_frame):
+        """Symbols already cached are not downloaded again."""
+        mock_download.return_value = batch_frame({"MSFT": [1.0, 1.0, 2.0]})
+
+        from app.tools.market_data import MarketDataTool
+        from app.tools.quote_cache import QuoteCache
+
+        cache = QuoteCache(ttl=60, max_size=10, stale_ttl=0)
+        cache.set(("quote", "AAPL"), {"symbol": "AAPL", "last_price": 5.0})
+
+        quotes = MarketDataTool(cache=cache).get_stock_prices(["AAPL", "MSFT"])
+
+        assert mock_download.call_args[0][0] == ["MSFT"]
+        assert quotes["AAPL"]["last_price"] == 5.0
+        assert quotes["MSFT"]["last_price"] == 2.0
@@ -0,0 +1,112 @@
+"""
+Unit tests for the tax-loss harvesting scanner.
+
+Note: These tests require pandas/yfinance.
+Tests will be skipped if imports fail (e.g., in some local environments).
+"""
+
+import pytest
+from datetime import date
+import os
+import sys
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+# Check if app imports are available
+_IMPORTS_AVAILABLE = True
+_IMPORT_ERROR = ""
+try:
+    import yfinance
+    import pandas as pd
+except (ImportError, ValueError, Exception) as e:
+    _IMPORTS_AVAILABLE = False
+    _IMPORT_ERROR = str(e)
+
+requires_app_imports = pytest.mark.skipif(
+    not _IMPORTS_AVAILABLE,
+    reason=f"App imports not available: {_IMPORT_ERROR[:100] if _IMPORT_ERROR else 'unknown'}"
+)
+
+
+@requires_app_imports
+class TestTaxHarvest:
+    """Tests for the tax-loss harvesting scanner."""
+
+    @pytest.fixture
+    def lots(self, make_lots):
+        return make_lots([
+            (1, "AAPL", date(2023, 1, 10), 10, 200.0),
+            (2, "AAPL", date(2025, 5, 20), 5, 180.0),
+            (3, "TSLA", date(2025, 1, 2), 3, 400.0),
+            (4, "MSFT", date(2024, 1, 2), 4, 300.0),
+            (5, "TSLA", date(2025, 6, 25), 1, 260.0),
+        ])
+
+    def test_ranked_by_tax_saved_with_wash_sales(self, lots):
+        """Losing lots rank by loss times rate; purchases within 30 days either side are flagged."""
+        from app.tools.tax_harvest import scan_harvest
+
+        result = scan_harvest(
+            lots, [], {"AAPL": 150.0, "TSLA": 250.0, "MSFT": 350.0},
+            as_of=date(2025, 6, 1), short_term_rate=0.3, long_term_rate=0.15,
+        )
+
+        assert result["lot_id"].tolist() == [3, 1, 2]
+        assert result["tax_saved"].tolist() == pytest.approx([450 * 0.3, 500 * 0.15, 150 * 0.3])
+        # Lot 3 conflicts with the purchase 24 days later; lots 1 and 2 are harvested together
+        assert result.set_index("lot_id")["wash_sale_lots"].to_dict() == {3: [5], 1: [], 2: []}
+        assert result.set_index("lot_id").loc[3, "clear_on"] == date(2025, 7, 26)
+        assert result.set_index("lot_id").loc[1, "clear_on"] is None
+
+    def test_wash_sales_count_open_replacements_only(self, lots):
+        """A purchase still held conflicts; one already sold does not."""
+        from app.tools.tax_harvest import scan_harvest
+        from app.tools.tax_lots import Sale
+
+        prices = {"AAPL": 190.0, "TSLA": 250.0}
+        result = scan_harvest(lots, [], prices, as_of=date(2025, 6, 1)).set_index("lot_id")
+        # Lot 2 is above cost, so it is kept and is the purchase 12 days before the sale
+        assert result.loc[1, "wash_sale_lots"] == [2]
+        assert result.loc[1, "clear_on"] == date(2025, 6, 20)
+
+        sold = [Sale("AAPL", date(2025, 5, 28), 5, 190.0, lot_id=2), Sale("TSLA", date(2025, 6, 26), 1, 250.0, lot_id=5)]
+        result = scan_harvest(lots, sold, prices, as_of=date(2025, 6, 1)).set_index("lot_id")
+        assert result["wash_sale_lots"].to_dict() == {1: [], 3: []}
+
+    def test_sold_lots_are_not_candidates(self, lots):
+        """Lots already relieved by recorded sales are not offered again."""
+        from app.tools.tax_harvest import scan_harvest
+        from app.tools.tax_lots import Sale
+
+        sales = [Sale("AAPL", date(2025, 5, 25), 10, 160.0)]
+        result = scan_harvest(lots, sales, {"AAPL": 150.0}, as_of=date(2025, 6, 1))
+        assert result["lot_id"].tolist() == [2]
+
+    def test_window_search_matches_brute_force(self):
+        """The sorted search finds exactly the same conflicts as checking every lot."""
+        import numpy as np
+        from app.tools.tax_harvest import wash_sale_windows
+        from app.tools.tax_lots import Lots
+
+        rng = np.random.default_rng(7)
+        n = 3000
+        lots = Lots(
+            ids=np.arange(n, dtype=np.int64),
+            symbols=rng.choice(["AAPL", "MSFT", "NVDA", "TSLA"], size=n),
+            acquired=np.datetime64("2020-01-01") + rng.integers(0, 2000, size=n),
+            quantity=np.ones(n),
+            price=np.full(n, 100.0),
+        )
+        candidates = np.arange(0, n, 7)
+        sale_day = np.datetime64("2022-06-15")
+
+        found = wash_sale_windows(lots, candidates, date(2022, 6, 15))
+
+        for lot, conflicts in zip(candidates, found):
+            expected = np.nonzero(
+                (lots.symbols == lots.symbols[lot])
+                & (np.abs(lots.acquired - sale_day) <= np.timedelta64(30, "D"))
+                & (np.arange(n) != lot)
+            )[0]
+            assert sorted(conflicts.tolist()) == expected.tolist()